@@ -1,5 +1,12 @@
 __all__ = (
     "swagger_doc",
+    "BinaryHandler",
+    "BinaryStream",
+    "JWTVerifier",
+    "MultipartFormDataHandler",
+    "NDJSONHandler",
+    "NDJSONStream",
+    "OpenTelemetryTracer",
     "RapiDocUiSettings",
     "ReDocUiSettings",
     "RequestValidationFailed",
@@ -9,15 +16,81 @@ __all__ = (
     "SwaggerInfo",
     "SwaggerContact",
     "SwaggerLicense",
+    "SpecRouter",
+    "Tracer",
+    "StreamingMediaTypeHandler",
+    "ValidationBudget",
+    "ValidationWatchdog",
     "ValidatorError",
+    "run_prefork",
     "__version__",
 )
 __version__ = "0.10.0"
 __author__ = "Valetov Konstantin"
 
-from .exceptions import ValidatorError
-from .swagger_docs import SwaggerDocs, swagger_doc
-from .swagger_file import SwaggerFile
-from .swagger_info import SwaggerContact, SwaggerInfo, SwaggerLicense
-from .swagger_route import RequestValidationFailed
-from .ui_settings import RapiDocUiSettings, ReDocUiSettings, SwaggerUiSettings
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+# names are imported from submodules on first access (PEP 562), so importing the package
+# does not load aiohttp, yaml and the UI machinery until they are used
+_LAZY = {
+    "BinaryHandler": ".handlers",
+    "BinaryStream": ".handlers",
+    "JWTVerifier": ".verifiers",
+    "MultipartFormDataHandler": ".handlers",
+    "NDJSONHandler": ".handlers",
+    "NDJSONStream": ".handlers",
+    "OpenTelemetryTracer": ".tracing",
+    "RapiDocUiSettings": ".ui_settings",
+    "ReDocUiSettings": ".ui_settings",
+    "RequestValidationFailed": ".exceptions",
+    "SpecRouter": ".router",
+    "StreamingMediaTypeHandler": ".handlers",
+    "SwaggerContact": ".swagger_info",
+    "SwaggerDocs": ".swagger_docs",
+    "SwaggerFile": ".swagger_file",
+    "SwaggerInfo": ".swagger_info",
+    "SwaggerLicense": ".swagger_info",
+    "SwaggerUiSettings": ".ui_settings",
+    "Tracer": ".tracing",
+    "ValidationBudget": ".validators",
+    "ValidationWatchdog": ".watchdog",
+    "ValidatorError": ".exceptions",
+    "run_prefork": ".prefork",
+    "swagger_doc": ".swagger_docs",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted([*globals(), *_LAZY])
+
+
+if TYPE_CHECKING:
+    from .exceptions import RequestValidationFailed, ValidatorError
+    from .handlers import (
+        BinaryHandler,
+        BinaryStream,
+        MultipartFormDataHandler,
+        NDJSONHandler,
+        NDJSONStream,
+        StreamingMediaTypeHandler,
+    )
+    from .prefork import run_prefork
+    from .router import SpecRouter
+    from .swagger_docs import SwaggerDocs, swagger_doc
+    from .swagger_file import SwaggerFile
+    from .swagger_info import SwaggerContact, SwaggerInfo, SwaggerLicense
+    from .tracing import OpenTelemetryTracer, Tracer
+    from .ui_settings import RapiDocUiSettings, ReDocUiSettings, SwaggerUiSettings
+    from .validators import ValidationBudget
+    from .verifiers import JWTVerifier
+    from .watchdog import ValidationWatchdog
@@ -0,0 +1,90 @@
+import argparse
+import asyncio
+import importlib
+import inspect
+import py_compile
+import sys
+from typing import Any, List, Optional
+
+from aiohttp import web
+
+from .compiler import compile_spec
+from .profiler import StartupProfiler, build_spec_file_app
+
+
+def _load_app(target: str) -> web.Application:
+    """Imports ``module:attribute``, the attribute is an application or a function returning it"""
+    module_name, _, attribute = target.partition(":")
+    module = importlib.import_module(module_name)
+    obj: Any = getattr(module, attribute or "app")
+    if not isinstance(obj, web.Application):
+        obj = obj()
+        if inspect.iscoroutine(obj):
+            obj = asyncio.run(obj)
+    if not isinstance(obj, web.Application):
+        raise Exception(f"{target} is not an aiohttp application")
+    return obj
+
+
+def profile(args: argparse.Namespace) -> None:
+    if (args.spec is None) == (args.app is None):
+        raise SystemExit("either a spec file or --app must be given")
+    if args.app is not None:
+        sys.path.insert(0, "")
+    with StartupProfiler(trace_memory=not args.no_memory) as profiler:
+        if args.spec is not None:
+            build_spec_file_app(args.spec, None if args.ui == "none" else args.ui)
+        else:
+            _load_app(args.app)
+    print(profiler.report(top=args.top))
+
+
+def compile_(args: argparse.Namespace) -> None:
+    source = compile_spec(args.spec)
+    if args.output == "-":
+        sys.stdout.write(source)
+        return
+    with open(args.output, "w") as f:
+        f.write(source)
+    if not args.no_bytecode:
+        py_compile.compile(args.output, doraise=True)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m aiohttp_swagger3")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    parser_profile = commands.add_parser(
+        "profile",
+        help="report time and memory of startup phases",
+        description="Builds an application and reports time and memory of startup phases, "
+        "most expensive operations and schemas.",
+    )
+    parser_profile.add_argument("spec", nargs="?", help="spec file, every operation gets a stub handler")
+    parser_profile.add_argument(
+        "--app", metavar="MODULE:ATTR", help="application or function returning it, i.e. myapi.main:create_app"
+    )
+    parser_profile.add_argument(
+        "--ui", choices=("swagger", "redoc", "rapidoc", "none"), default="swagger", help="UI registered for a spec file"
+    )
+    parser_profile.add_argument("--top", type=int, default=10, help="number of operations and schemas listed")
+    parser_profile.add_argument("--no-memory", action="store_true", help="do not trace memory, it slows down startup")
+    parser_profile.set_defaults(func=profile)
+
+    parser_compile = commands.add_parser(
+        "compile",
+        help="generate a module with validators of a spec file",
+        description="Generates a module with the spec and validators of every operation, "
+        "pass its name to SwaggerFile(compiled=...) to skip parsing and building at startup.",
+    )
+    parser_compile.add_argument("spec", help="spec file")
+    parser_compile.add_argument("-o", "--output", required=True, help="path of the module, - for stdout")
+    parser_compile.add_argument("--no-bytecode", action="store_true", help="do not write the .pyc file")
+    parser_compile.set_defaults(func=compile_)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
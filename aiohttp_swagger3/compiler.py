@@ -0,0 +1,196 @@
+import enum
+import hashlib
+import importlib
+import pprint
+import re
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+import attr
+from aiohttp import hdrs
+
+from . import __version__
+from .context import COMPONENTS
+from .swagger import compile_spec_validator
+from .swagger_route import media_type_validator, resolve_parameter
+from .validators import DiscriminatorObject, Validator, schema_to_validator
+
+FORMAT_VERSION = 2
+
+_HEADER = """\
+# Generated by `python -m aiohttp_swagger3 compile {spec_file}`, do not edit.
+# fmt: off
+# flake8: noqa
+import datetime
+from math import inf, nan
+
+from aiohttp_swagger3.validators import {imports}
+
+SPEC_HASH = {spec_hash!r}
+VERSION = {version!r}
+FORMAT_VERSION = {format_version!r}
+"""
+
+
+def spec_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class _ModuleWriter:
+    """Writes validators as Python expressions, validators equal to a component schema are
+    written once as a local variable of ``_operations()`` and shared"""
+
+    __slots__ = ("lines", "imports", "names", "defined", "_expanded")
+
+    def __init__(self, components: Dict[str, Validator]) -> None:
+        self.lines: List[str] = []
+        # names of classes used by written expressions
+        self.imports: Set[str] = set()
+        self._expanded: Dict[int, str] = {}
+        # expanded expression -> name of the component
+        self.names: Dict[str, str] = {}
+        for i, validator in enumerate(components.values()):
+            self.names.setdefault(self._expand(validator), f"_c{i}")
+        self.defined: Set[str] = set()
+
+    def _value(self, value: Any, write: Callable[[Validator], str]) -> str:
+        if isinstance(value, Validator):
+            return write(value)
+        if isinstance(value, enum.Enum):
+            self.imports.add(type(value).__name__)
+            return f"{type(value).__name__}.{value.name}"
+        if isinstance(value, re.Pattern):
+            return repr(value.pattern)
+        if isinstance(value, DiscriminatorObject):
+            return self._value({"propertyName": value.property_name, "mapping": value.mapping}, write)
+        if isinstance(value, dict):
+            items = ", ".join(f"{self._value(k, write)}: {self._value(v, write)}" for k, v in value.items())
+            return f"{{{items}}}"
+        if isinstance(value, list):
+            return f"[{', '.join(self._value(v, write) for v in value)}]"
+        if isinstance(value, tuple):
+            return f"({''.join(self._value(v, write) + ', ' for v in value)})"
+        if isinstance(value, (set, frozenset)):
+            if not value:
+                return f"{type(value).__name__}()"
+            items = ", ".join(self._value(v, write) for v in sorted(value, key=repr))
+            return f"{{{items}}}" if isinstance(value, set) else f"frozenset({{{items}}})"
+        return repr(value)
+
+    def _call(self, validator: Validator, write: Callable[[Validator], str]) -> str:
+        self.imports.add(type(validator).__name__)
+        args = []
+        for field in attr.fields(type(validator)):
+            if not field.init:
+                continue
+            value = getattr(validator, field.name)
+            if field.default is not attr.NOTHING and type(value) is type(field.default) and value == field.default:
+                continue
+            args.append(f"{field.name}={self._value(value, write)}")
+        return f"{type(validator).__name__}({', '.join(args)})"
+
+    def _expand(self, validator: Validator) -> str:
+        key = id(validator)
+        if key not in self._expanded:
+            self._expanded[key] = self._call(validator, self._expand)
+        return self._expanded[key]
+
+    def write(self, validator: Validator) -> str:
+        name = self.names.get(self._expand(validator))
+        if name is None:
+            return self._call(validator, self.write)
+        if name not in self.defined:
+            self.defined.add(name)
+            self.lines.append(f"    {name} = {self._call(validator, self.write)}")
+        return name
+
+
+def build_validators(spec: Dict) -> Tuple[Dict[str, Validator], Dict[Tuple[str, str], Dict]]:
+    """Builds validators of component schemas and of parameters and bodies of every operation"""
+    components = spec.get("components", {})
+    token = COMPONENTS.set(components)
+    try:
+        component_validators = {
+            f"#/components/schemas/{name}": schema_to_validator({"$ref": f"#/components/schemas/{name}"})
+            for name in components.get("schemas", {})
+        }
+        operations: Dict[Tuple[str, str], Dict] = {}
+        for path, path_item in spec["paths"].items():
+            for method, operation in path_item.items():
+                if method.upper() not in hdrs.METH_ALL:
+                    continue
+                body = operation.get("requestBody", {})
+                operations[(method, path)] = {
+                    "parameters": [
+                        schema_to_validator(resolve_parameter(param, components)["schema"])
+                        for param in operation.get("parameters", [])
+                    ],
+                    "body": {
+                        media_type.lower(): media_type_validator(value)
+                        for media_type, value in body.get("content", {}).items()
+                    },
+                }
+    finally:
+        COMPONENTS.reset(token)
+    return component_validators, operations
+
+
+def compile_spec(spec_file: str) -> str:
+    """Returns the source of a module with validators of every operation of ``spec_file``.
+
+    ``load()`` of the module returns the spec and a function building the validators, it is
+    called by :class:`SwaggerFile` instead of parsing the spec and building validators.
+    String validators bind format functions when they are created, so the function is called
+    when the first route is added.
+    """
+    import yaml
+
+    with open(spec_file, "rb") as f:
+        data = f.read()
+    spec = yaml.safe_load(data)
+    compile_spec_validator()(spec)
+    component_validators, operations = build_validators(spec)
+    writer = _ModuleWriter(component_validators)
+    entries = []
+    for (method, path), operation in operations.items():
+        parameters = ", ".join(writer.write(v) for v in operation["parameters"])
+        body = ", ".join(f"{media_type!r}: {writer.write(v)}" for media_type, v in operation["body"].items())
+        entries.append(f"        ({method!r}, {path!r}): {{'parameters': [{parameters}], 'body': {{{body}}}}},")
+    spec_source = pprint.pformat(spec, indent=1, width=120, sort_dicts=False).replace("\n", "\n" + " " * 16)
+    return "\n".join(
+        [
+            _HEADER.rstrip("\n").format(
+                spec_file=spec_file,
+                imports=", ".join(sorted(writer.imports)),
+                spec_hash=spec_hash(data),
+                version=__version__,
+                format_version=FORMAT_VERSION,
+            ),
+            "",
+            "",
+            "def load():",
+            "    return {",
+            f"        'spec': {spec_source},",
+            "        'operations': _operations,",
+            "    }",
+            "",
+            "",
+            "def _operations():",
+            *writer.lines,
+            "    return {",
+            *entries,
+            "    }",
+            "",
+        ]
+    )
+
+
+def load_compiled(module_name: str, spec_file: str) -> Dict:
+    """Imports a module generated by :func:`compile_spec`, checks that it was built from
+    ``spec_file`` by this version and returns the result of its ``load()``"""
+    module = importlib.import_module(module_name)
+    with open(spec_file, "rb") as f:
+        data = f.read()
+    if module.SPEC_HASH != spec_hash(data) or module.VERSION != __version__ or module.FORMAT_VERSION != FORMAT_VERSION:
+        raise Exception(f"{module_name} is stale, run `python -m aiohttp_swagger3 compile {spec_file}` again")
+    manifest: Dict = module.load()
+    return manifest
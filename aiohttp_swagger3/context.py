@@ -1,5 +1,6 @@
 from contextvars import ContextVar
-from typing import Dict
+from typing import Dict, Optional
 
 COMPONENTS: ContextVar[Dict] = ContextVar("components")
-STRING_FORMATS: ContextVar[Dict] = ContextVar("string_formats")
+# set only while validators are built, String validators bind their format functions from it
+STRING_FORMATS: ContextVar[Optional[Dict]] = ContextVar("string_formats", default=None)
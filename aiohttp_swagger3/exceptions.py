@@ -1,6 +1,7 @@
-from typing import Dict, Union
+from typing import Any, Dict, Union
 
 import attr
+from aiohttp import web
 
 
 @attr.attrs(slots=True, auto_attribs=True)
@@ -10,3 +11,14 @@ class ValidatorError(Exception):
 
 class DiscriminatorValidationError(Exception):
     pass
+
+
+class RequestValidationFailed(web.HTTPBadRequest):
+    """This exception can be caught in a aiohttp middleware.
+
+    :param dict errors: This dict stores validation errors.
+    """
+
+    def __init__(self, errors: Dict, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.errors = errors
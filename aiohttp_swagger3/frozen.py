@@ -0,0 +1,74 @@
+import sys
+from types import MappingProxyType
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from .compiler import spec_hash
+from .swagger import compile_spec_validator
+
+# frozen specs by hash of the content of their files, shared by every SwaggerFile loading them
+_SPECS: Dict[str, Any] = {}
+
+
+class _Interner:
+    """Builds frozen copies of JSON-like values: dicts become ``MappingProxyType``, lists
+    become tuples and strings are interned. Equal subtrees are built once and shared."""
+
+    __slots__ = ("_nodes",)
+
+    def __init__(self) -> None:
+        # key of a subtree -> its frozen copy, children of a key are frozen copies already,
+        # so they are compared by identity
+        self._nodes: Dict[Tuple, Any] = {}
+
+    @staticmethod
+    def _key(value: Any) -> Hashable:
+        if isinstance(value, (MappingProxyType, tuple)):
+            return id(value)
+        # 1, 1.0 and True are equal, but must not be shared
+        return type(value), value
+
+    def freeze(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return sys.intern(value)
+        if isinstance(value, dict):
+            items = tuple((self.freeze(k), self.freeze(v)) for k, v in value.items())
+            key: Tuple = ("dict", *((self._key(k), self._key(v)) for k, v in items))
+            node = self._nodes.get(key)
+            if node is None:
+                node = self._nodes[key] = MappingProxyType(dict(items))
+            return node
+        if isinstance(value, list):
+            frozen = tuple(self.freeze(v) for v in value)
+            key = ("list", *(self._key(v) for v in frozen))
+            node = self._nodes.get(key)
+            if node is None:
+                node = self._nodes[key] = frozen
+            return node
+        return value
+
+
+def freeze(spec: Dict) -> Any:
+    """Returns a frozen copy of ``spec``, equal subtrees of it are shared"""
+    return _Interner().freeze(spec)
+
+
+def load_frozen_spec(spec_file: str, spec: Optional[Dict] = None) -> Any:
+    """Returns the frozen spec of ``spec_file``, it is loaded, validated and frozen once
+    per content of the file and stays cached for the life of the process.
+
+    :param str spec_file: path to swagger file scheme
+    :param dict spec: validated spec of ``spec_file``, i.e. loaded from a compiled module (optional)
+    """
+    with open(spec_file, "rb") as f:
+        data = f.read()
+    key = spec_hash(data)
+    frozen = _SPECS.get(key)
+    if frozen is None:
+        if spec is None:
+            import yaml
+
+            spec = yaml.safe_load(data)
+            # the validator of OpenAPI 3 documents accepts only dicts and lists
+            compile_spec_validator()(spec)
+        frozen = _SPECS[key] = freeze(spec)
+    return frozen
@@ -1,20 +1,482 @@
-from typing import Dict, Tuple
+import abc
+import importlib.util
+import json
+import tempfile
+from typing import IO, Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union, cast
 from urllib.parse import parse_qsl
 
-from aiohttp import web
+import attr
+from aiohttp import BodyPartReader, StreamReader, web
 
-from .validators import ValidatorError
+from .exceptions import RequestValidationFailed
+from .validators import MISSING, Array, Object, String, Validator, ValidatorError
 
+REQUEST_BODY_NAME: str = "body"
 
-async def application_json(request: web.Request) -> Tuple[Dict, bool]:
+
+# decoders of a whole body, they are used by the built-in handlers and
+# when validation of a large body is moved to an executor (i.e. a process pool)
+BodyDecoder = Callable[[bytes, str], Tuple[Any, bool]]
+
+
+def decode_json(data: bytes, charset: str) -> Tuple[Any, bool]:
     try:
-        return await request.json(), False
+        return json.loads(data.decode(charset)), False
     except ValueError as e:
         raise ValidatorError(str(e))
 
 
-async def x_www_form_urlencoded(request: web.Request) -> Tuple[Dict, bool]:
-    data = await request.read()
-    charset = request.charset or "utf-8"
+def decode_x_www_form_urlencoded(data: bytes, charset: str) -> Tuple[Dict, bool]:
     d = parse_qsl(data.rstrip().decode(charset), keep_blank_values=True, encoding=charset)
     return dict(d), True
+
+
+def installed(module: str) -> bool:
+    """Whether an optional dependency can be imported, without importing it"""
+    return importlib.util.find_spec(module) is not None
+
+
+def decode_msgpack(data: bytes, _: str) -> Tuple[Any, bool]:
+    # optional dependencies are imported on the first body
+    import msgpack
+
+    try:
+        # raw=False decodes msgpack str to str and keeps bin as bytes for format: binary
+        return msgpack.unpackb(data, raw=False), False
+    except (ValueError, TypeError) as e:
+        raise ValidatorError(str(e))
+
+
+def decode_cbor(data: bytes, _: str) -> Tuple[Any, bool]:
+    import cbor2
+
+    try:
+        return cbor2.loads(data), False
+    except cbor2.CBORDecodeError as e:
+        raise ValidatorError(str(e))
+
+
+async def application_json(request: web.Request) -> Tuple[Dict, bool]:
+    return decode_json(await request.read(), request.charset or "utf-8")
+
+
+async def x_www_form_urlencoded(request: web.Request) -> Tuple[Dict, bool]:
+    return decode_x_www_form_urlencoded(await request.read(), request.charset or "utf-8")
+
+
+async def application_msgpack(request: web.Request) -> Tuple[Any, bool]:
+    return decode_msgpack(await request.read(), "")
+
+
+async def application_cbor(request: web.Request) -> Tuple[Any, bool]:
+    return decode_cbor(await request.read(), "")
+
+
+BODY_DECODERS: Dict[Callable, BodyDecoder] = {
+    application_json: decode_json,
+    x_www_form_urlencoded: decode_x_www_form_urlencoded,
+    application_msgpack: decode_msgpack,
+    application_cbor: decode_cbor,
+}
+
+
+@attr.attrs(slots=True, frozen=True, eq=False, hash=False, auto_attribs=True)
+class StreamingMediaTypeHandler(abc.ABC):
+    """Base class for media type handlers that validate the request body while reading it.
+
+    Unlike plain handlers, which return a tuple of the parsed value and the raw flag,
+    streaming handlers receive the validator of the media type schema and must return
+    the already validated value or raise :class:`ValidatorError`.
+    """
+
+    @abc.abstractmethod
+    async def __call__(self, request: web.Request, validator: Validator) -> Any:
+        """Reads and validates the body of ``request``"""
+
+    def check_schema(self, validator: Validator) -> None:
+        """Called with the validator of the media type schema when a route is added,
+        raises ``Exception`` if bodies of this schema cannot be handled"""
+
+    def check_metadata(self, request: web.Request, validator: Validator) -> None:
+        """Called before the body is read, i.e. before ``100 Continue`` is sent,
+        raises :class:`ValidatorError` if headers of ``request`` already violate the schema"""
+
+
+def _is_binary(validator: Optional[Validator]) -> bool:
+    return isinstance(validator, String) and validator.format == "binary"
+
+
+def _close_files(values: Dict[str, Any]) -> None:
+    for value in values.values():
+        for item in value if isinstance(value, list) else (value,):
+            if isinstance(item, web.FileField):
+                item.file.close()
+
+
+@attr.attrs(slots=True, frozen=True, eq=False, hash=False, auto_attribs=True, kw_only=True)
+class MultipartFormDataHandler(StreamingMediaTypeHandler):
+    """Streaming handler for ``multipart/form-data``.
+
+    Parts are validated against the property schemas as they arrive, ``format: binary``
+    properties are written to temporary files and passed to the handler as
+    :class:`aiohttp.web.FileField`, so the whole upload is never kept in memory.
+    Non-file parts are kept in memory, their total size is limited like the size
+    of a body read by ``request.post()``, ``413 Request Entity Too Large`` is returned otherwise.
+
+    :param int spool_threshold: size in bytes after which a file part is moved from memory to disk
+    :param int max_field_size: max size in bytes of a non-file part
+    :param int max_fields_size: max total size in bytes of non-file parts,
+                                default ``client_max_size`` of the application
+    :param int max_parts: max number of parts
+    :param int chunk_size: size of chunks read from the request
+    """
+
+    spool_threshold: int = 1024 * 1024
+    max_field_size: int = 1024 * 1024
+    max_fields_size: Optional[int] = None
+    max_parts: int = 1000
+    chunk_size: int = 64 * 1024
+
+    def check_schema(self, validator: Validator) -> None:
+        # parts are streamed by properties, other schemas would need the whole body in memory
+        if not isinstance(validator, Object):
+            raise Exception("schema of a multipart/form-data body must be an object")
+
+    async def __call__(self, request: web.Request, validator: Validator) -> Any:
+        # the schema is an object, see check_schema
+        obj = cast(Object, validator)
+        values: Dict[str, Any] = {}
+        try:
+            await self._read_parts(request, obj, values)
+            return self._finalize(obj, values)
+        except BaseException:
+            _close_files(values)
+            raise
+
+    async def _read_parts(self, request: web.Request, validator: Object, values: Dict[str, Any]) -> None:
+        max_size = request.client_max_size if self.max_fields_size is None else self.max_fields_size
+        # size of non-file parts kept in memory
+        size = 0
+        count = 0
+        reader = await request.multipart()
+        while True:
+            part = await reader.next()
+            if part is None:
+                break
+            count += 1
+            if count > self.max_parts:
+                raise ValidatorError(f"number of parts must be less than {self.max_parts}")
+            if not isinstance(part, BodyPartReader):
+                raise ValidatorError("nested multipart is not supported")
+            name = part.name
+            if name is None:
+                raise ValidatorError("every part must have a name")
+            prop_validator = validator.properties.get(name)
+            if prop_validator is None:
+                if validator.additionalProperties is False:
+                    raise ValidatorError({name: "additional property not allowed"})
+                if isinstance(validator.additionalProperties, Validator):
+                    prop_validator = validator.additionalProperties
+            try:
+                if getattr(prop_validator, "readOnly", False):
+                    raise ValidatorError("property is read-only")
+                if isinstance(prop_validator, Array):
+                    items = values.setdefault(name, [])
+                    if prop_validator.maxItems is not None and len(items) >= prop_validator.maxItems:
+                        raise ValidatorError(f"number or items must be less than {prop_validator.maxItems}")
+                    try:
+                        value, field_size = await self._read_part(part, prop_validator.validator, size, max_size)
+                        items.append(value)
+                    except ValidatorError as e:
+                        raise ValidatorError({len(items): e.error})
+                else:
+                    previous = values.pop(name, None)
+                    if isinstance(previous, web.FileField):
+                        previous.file.close()
+                    values[name], field_size = await self._read_part(part, prop_validator, size, max_size)
+                size += field_size
+            except ValidatorError as e:
+                raise ValidatorError({name: e.error})
+
+    async def _read_part(
+        self, part: BodyPartReader, validator: Optional[Validator], size: int, max_size: int
+    ) -> Tuple[Any, int]:
+        """Value of the part and its size in memory"""
+        if _is_binary(validator) or (validator is None and part.filename is not None):
+            return await self._read_file(part, validator), 0
+        return await self._read_field(part, validator, size, max_size)
+
+    async def _read_file(self, part: BodyPartReader, validator: Optional[Validator]) -> web.FileField:
+        min_length = max_length = None
+        if isinstance(validator, String):
+            min_length, max_length = validator.minLength, validator.maxLength
+        file: IO[bytes] = tempfile.SpooledTemporaryFile(max_size=self.spool_threshold)
+        size = 0
+        try:
+            while True:
+                chunk = await part.read_chunk(self.chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_length is not None and size > max_length:
+                    raise ValidatorError(f"value length should be less than {max_length}")
+                file.write(chunk)
+            if min_length is not None and size < min_length:
+                raise ValidatorError(f"value length should be more than {min_length}")
+        except BaseException:
+            file.close()
+            raise
+        file.seek(0)
+        return web.FileField(
+            name=part.name or "",
+            filename=part.filename or "",
+            file=file,
+            content_type=part.headers.get("Content-Type", "application/octet-stream"),
+            headers=part.headers,
+        )
+
+    async def _read_field(
+        self, part: BodyPartReader, validator: Optional[Validator], size: int, max_size: int
+    ) -> Tuple[Any, int]:
+        max_length = validator.maxLength if isinstance(validator, String) else None
+        chunks: List[bytes] = []
+        field_size = 0
+        while True:
+            chunk = await part.read_chunk(self.chunk_size)
+            if not chunk:
+                break
+            field_size += len(chunk)
+            # utf-8 uses at most 4 bytes per character
+            if max_length is not None and field_size > max_length * 4:
+                raise ValidatorError(f"value length should be less than {max_length}")
+            if field_size > self.max_field_size:
+                raise ValidatorError(f"value length should be less than {self.max_field_size} bytes")
+            if size + field_size > max_size:
+                raise web.HTTPRequestEntityTooLarge(max_size=max_size, actual_size=size + field_size)
+            chunks.append(chunk)
+        value = b"".join(chunks).decode(part.get_charset(default="utf-8"))
+        if validator is None:
+            return value, field_size
+        return validator.validate(value, True), field_size
+
+    def _finalize(self, validator: Object, values: Dict[str, Any]) -> Dict[str, Any]:
+        errors: Dict = {name: "required property" for name in validator.required if name not in values}
+        if errors:
+            raise ValidatorError(errors)
+
+        for name, prop_validator in validator.properties.items():
+            value = values.get(name, MISSING)
+            if value is MISSING:
+                if not isinstance(prop_validator, Array):
+                    try:
+                        default = prop_validator.validate(MISSING, True)
+                    except ValidatorError as e:
+                        errors[name] = e.error
+                        continue
+                    if default is not MISSING:
+                        values[name] = default
+            elif isinstance(prop_validator, Array):
+                if prop_validator.minItems is not None and len(value) < prop_validator.minItems:
+                    errors[name] = f"number or items must be more than {prop_validator.minItems}"
+                elif prop_validator.uniqueItems and not _is_binary(prop_validator.validator):
+                    if len(value) != len(set(value)):
+                        errors[name] = "all items must be unique"
+        if errors:
+            raise ValidatorError(errors)
+
+        if validator.minProperties is not None and len(values) < validator.minProperties:
+            raise ValidatorError(f"number or properties must be more than {validator.minProperties}")
+        if validator.maxProperties is not None and len(values) > validator.maxProperties:
+            raise ValidatorError(f"number or properties must be less than {validator.maxProperties}")
+        return values
+
+
+class BinaryStream:
+    """Request body passed to the handler by :class:`BinaryHandler`.
+
+    It reads directly from ``request.content`` and counts the received bytes,
+    ``maxLength`` and ``minLength`` of the schema are checked while the handler reads the body,
+    :class:`RequestValidationFailed` is raised as soon as a limit is violated.
+    """
+
+    __slots__ = ("_content", "_min_length", "_max_length", "size")
+
+    def __init__(self, content: StreamReader, min_length: Optional[int], max_length: Optional[int]) -> None:
+        self._content = content
+        self._min_length = min_length
+        self._max_length = max_length
+        self.size = 0
+
+    def _fail(self, error: str) -> RequestValidationFailed:
+        errors = {REQUEST_BODY_NAME: error}
+        return RequestValidationFailed(reason=json.dumps(errors), errors=errors)
+
+    def _count(self, data: bytes) -> bytes:
+        if not data:
+            if self._min_length is not None and self.size < self._min_length:
+                raise self._fail(f"value length should be more than {self._min_length}")
+            return data
+        self.size += len(data)
+        if self._max_length is not None and self.size > self._max_length:
+            raise self._fail(f"value length should be less than {self._max_length}")
+        return data
+
+    def at_eof(self) -> bool:
+        return self._content.at_eof()
+
+    async def read(self, n: int = -1) -> bytes:
+        data = self._count(await self._content.read(n))
+        if n < 0:
+            self._count(b"")
+        return data
+
+    async def readany(self) -> bytes:
+        return self._count(await self._content.readany())
+
+    async def iter_chunked(self, n: int) -> AsyncIterator[bytes]:
+        while True:
+            data = await self.read(n)
+            if not data:
+                break
+            yield data
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self.iter_chunked(64 * 1024)
+
+
+@attr.attrs(slots=True, frozen=True, eq=False, hash=False, auto_attribs=True, kw_only=True)
+class BinaryHandler(StreamingMediaTypeHandler):
+    """Handler for ``type: string, format: binary`` bodies, used for ``application/octet-stream`` by default.
+
+    The body is not read before the route handler is called, the handler gets a :class:`BinaryStream`
+    over ``request.content``. Requests with a ``Content-Length`` violating ``minLength``/``maxLength``
+    are rejected without reading the body. Bodies of other schemas are read as a whole and validated
+    as ``bytes``.
+
+    :param int buffer_size: bodies with ``Content-Length`` up to this size are read at once
+                            and passed as a ``memoryview``, default ``0``
+    """
+
+    buffer_size: int = 0
+
+    def check_metadata(self, request: web.Request, validator: Validator) -> None:
+        content_length = request.content_length
+        if content_length is None:
+            return
+        if not _is_binary(validator):
+            # read as a whole, so limited by client_max_size like other bodies
+            if content_length > request.client_max_size:
+                raise web.HTTPRequestEntityTooLarge(max_size=request.client_max_size, actual_size=content_length)
+            return
+        min_length, max_length = cast(String, validator).minLength, cast(String, validator).maxLength
+        if max_length is not None and content_length > max_length:
+            raise ValidatorError(f"value length should be less than {max_length}")
+        if min_length is not None and content_length < min_length:
+            raise ValidatorError(f"value length should be more than {min_length}")
+
+    async def __call__(self, request: web.Request, validator: Validator) -> Union[BinaryStream, memoryview, Any]:
+        if not _is_binary(validator):
+            return validator.validate(await request.read(), True)
+        # only the length of a binary string can be checked, it is not kept in memory
+        self.check_metadata(request, validator)
+        content_length = request.content_length
+        if content_length is not None and content_length <= self.buffer_size:
+            return memoryview(await request.read())
+        string = cast(String, validator)
+        return BinaryStream(request.content, string.minLength, string.maxLength)
+
+
+class NDJSONStream:
+    """Request body passed to the handler by :class:`NDJSONHandler`.
+
+    Asynchronous iterator over validated lines of the body, lines are read and validated
+    only when the handler iterates, so the whole batch is never kept in memory.
+    If ``fail_fast`` is disabled, invalid lines are skipped and their errors are collected
+    in ``errors``, keyed by the line index.
+    """
+
+    __slots__ = ("_content", "_validator", "_min_items", "_max_items", "_handler", "count", "errors")
+
+    def __init__(self, content: StreamReader, validator: Validator, handler: "NDJSONHandler") -> None:
+        self._content = content
+        self._handler = handler
+        self._min_items = self._max_items = None
+        if isinstance(validator, Array):
+            self._min_items, self._max_items = validator.minItems, validator.maxItems
+            validator = validator.validator
+        self._validator = validator
+        self.count = 0
+        self.errors: Dict[int, Any] = {}
+
+    def _fail(self, error: Any) -> RequestValidationFailed:
+        errors = {REQUEST_BODY_NAME: error}
+        return RequestValidationFailed(reason=json.dumps(errors), errors=errors)
+
+    async def _lines(self) -> AsyncIterator[bytes]:
+        max_line_size = self._handler.max_line_size
+        buffer = bytearray()
+        while True:
+            chunk = await self._content.readany()
+            if not chunk:
+                break
+            buffer += chunk
+            start = 0
+            while True:
+                end = buffer.find(b"\n", start)
+                if end == -1:
+                    break
+                if end - start > max_line_size:
+                    break
+                yield bytes(buffer[start:end])
+                start = end + 1
+            del buffer[:start]
+            if len(buffer) > max_line_size:
+                raise self._fail({self.count + len(self.errors): f"line length should be less than {max_line_size}"})
+        if buffer:
+            yield bytes(buffer)
+
+    async def _iterate(self) -> AsyncIterator[Any]:
+        async for line in self._lines():
+            if not line.strip():
+                continue
+            index = self.count + len(self.errors)
+            if self._max_items is not None and index >= self._max_items:
+                raise self._fail(f"number or items must be less than {self._max_items}")
+            try:
+                try:
+                    raw_value = json.loads(line)
+                except ValueError as e:
+                    raise ValidatorError(str(e))
+                value = self._validator.validate(raw_value, False)
+            except ValidatorError as e:
+                if self._handler.fail_fast:
+                    raise self._fail({index: e.error})
+                self.errors[index] = e.error
+                continue
+            self.count += 1
+            yield value
+        if self._min_items is not None and self.count + len(self.errors) < self._min_items:
+            raise self._fail(f"number or items must be more than {self._min_items}")
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self._iterate()
+
+
+@attr.attrs(slots=True, frozen=True, eq=False, hash=False, auto_attribs=True, kw_only=True)
+class NDJSONHandler(StreamingMediaTypeHandler):
+    """Streaming handler for ``application/x-ndjson`` (JSON Lines).
+
+    The schema of the media type should be an array, every line is validated against its ``items``,
+    alternatively the schema of a line can be set with ``x-ndjson-item`` in the media type object.
+    The handler receives a :class:`NDJSONStream`.
+
+    :param int max_line_size: max size of a line in bytes
+    :param bool fail_fast: if ``True``, the first invalid line raises :class:`RequestValidationFailed`,
+                           otherwise invalid lines are skipped, default ``True``
+    """
+
+    max_line_size: int = 1024 * 1024
+    fail_fast: bool = True
+
+    async def __call__(self, request: web.Request, validator: Validator) -> NDJSONStream:
+        return NDJSONStream(request.content, validator, self)
@@ -0,0 +1,110 @@
+import gc
+import os
+import signal
+import sys
+import traceback
+from typing import Any, Callable, Dict, Optional, Union
+
+from aiohttp import web
+
+AppFactory = Callable[[], web.Application]
+
+
+def run_prefork(
+    app: Union[web.Application, AppFactory],
+    *,
+    workers: Optional[int] = None,
+    host: str = "0.0.0.0",
+    port: int = 8080,
+    **kwargs: Any,
+) -> None:
+    """Runs ``app`` in ``workers`` forked processes listening on the same port (``SO_REUSEPORT``).
+
+    If an application instance is passed, it is built once in the parent process: the spec
+    is parsed and validated and validators of all routes are created before forking, so workers
+    share this memory with the parent. Objects alive at the moment of forking are moved to the
+    permanent generation with :func:`gc.freeze`, the garbage collector of a worker never touches
+    them and shared memory pages are not copied. For the best effect call :func:`gc.disable`
+    at the start of the program, before the application is built. Specs of ``validation_only``
+    instances are released before forking.
+
+    If a function is passed, it is called in every worker to build its own application.
+
+    Available on POSIX systems only. A worker killed by a signal is restarted,
+    SIGINT and SIGTERM stop all workers.
+
+    :param app: aiohttp's Application instance or a function returning it
+    :param int workers: number of worker processes, default is number of CPUs
+    :param str host: host to listen on, default ``0.0.0.0``
+    :param int port: port to listen on, default ``8080``
+    :param kwargs: other arguments passed to :func:`aiohttp.web.run_app`
+    """
+    if not hasattr(os, "fork"):
+        raise Exception("run_prefork is available on POSIX systems only")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise Exception("number of workers must be positive")
+
+    if isinstance(app, web.Application):
+        from .swagger import Swagger
+
+        for callback in app.on_startup:
+            if getattr(callback, "__func__", None) is Swagger._release_spec_on_startup:
+                callback.__self__.release_spec()  # type: ignore[attr-defined]
+        gc.collect()
+        gc.freeze()
+
+    children: Dict[int, int] = {}
+    stopping = False
+
+    def _stop(signum: int, _: Any) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:  # pragma: no cover
+                pass
+
+    def _spawn(index: int) -> None:
+        pid = os.fork()
+        if pid:
+            children[pid] = index
+            return
+        # worker
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        gc.enable()
+        code = 1
+        try:
+            worker_kwargs = dict(kwargs)
+            if index > 0:
+                worker_kwargs.setdefault("print", None)
+            web.run_app(
+                app if isinstance(app, web.Application) else app(),
+                host=host,
+                port=port,
+                reuse_port=True,
+                **worker_kwargs,
+            )
+            code = 0
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+    for index in range(workers):
+        _spawn(index)
+
+    while children:
+        pid, status = os.wait()
+        index = children.pop(pid)
+        # a worker killed by a signal (i.e. OOM killer) is restarted,
+        # a worker that failed on its own (i.e. port is busy) would fail again
+        if not stopping and os.WIFSIGNALED(status):
+            _spawn(index)
@@ -0,0 +1,185 @@
+import functools
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import attr
+import fastjsonschema
+import yaml
+from aiohttp import hdrs, web
+
+from . import swagger_route, validators
+from .swagger import Swagger
+from .swagger_file import SwaggerFile
+from .swagger_route import SwaggerRoute
+from .ui_settings import RapiDocUiSettings, ReDocUiSettings, SwaggerUiSettings
+
+PHASES = ("yaml load", "meta-schema compile", "spec validation", "validators", "UI registration")
+
+
+@attr.attrs(slots=True, auto_attribs=True)
+class Measurement:
+    calls: int = 0
+    seconds: float = 0.0
+    memory: int = 0
+
+
+class StartupProfiler:
+    """Measures time and memory of startup phases of an application.
+
+    While active, functions called during startup are wrapped: ``yaml.safe_load``,
+    ``fastjsonschema.compile``, the compiled spec validator, building of validators of every
+    operation, ``schema_to_validator`` of every component and registration of UIs.
+    Measurements are inclusive, i.e. an operation includes the components it references.
+    Memory is the size of allocated and not released blocks, traced with :mod:`tracemalloc`.
+
+    .. code-block:: python
+
+        with StartupProfiler() as profiler:
+            app = create_app()
+        print(profiler.report(top=10))
+
+    :param bool trace_memory: measure memory, slows down startup, default ``True``
+    """
+
+    __slots__ = ("trace_memory", "phases", "operations", "schemas", "total", "_active", "_patches", "_started")
+
+    def __init__(self, trace_memory: bool = True) -> None:
+        self.trace_memory = trace_memory
+        self.phases: Dict[str, Measurement] = {name: Measurement() for name in PHASES}
+        self.operations: Dict[str, Measurement] = {}
+        self.schemas: Dict[str, Measurement] = {}
+        self.total = Measurement()
+        # measurements in progress, nested calls of the same measurement are not counted twice
+        self._active: Set[Tuple[int, str]] = set()
+        self._patches: List[Tuple[Any, str, Any]] = []
+        self._started = (0.0, 0)
+
+    def _memory(self) -> int:
+        return tracemalloc.get_traced_memory()[0] if self.trace_memory else 0
+
+    def _measure(self, bucket: Dict[str, Measurement], name: str, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        key = (id(bucket), name)
+        if key in self._active:
+            return fn(*args, **kwargs)
+        self._active.add(key)
+        memory = self._memory()
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            measurement = bucket.setdefault(name, Measurement())
+            measurement.calls += 1
+            measurement.seconds += time.perf_counter() - start
+            measurement.memory += self._memory() - memory
+            self._active.discard(key)
+
+    def _patch(self, obj: Any, name: str, wrapper: Callable[[Callable], Callable]) -> None:
+        original = getattr(obj, name)
+        self._patches.append((obj, name, original))
+        setattr(obj, name, functools.wraps(original)(wrapper(original)))
+
+    def __enter__(self) -> "StartupProfiler":
+        if self.trace_memory:
+            tracemalloc.start()
+
+        def safe_load(fn: Callable) -> Callable:
+            return lambda stream: self._measure(self.phases, "yaml load", fn, stream)
+
+        def compile_(fn: Callable) -> Callable:
+            def wrapper(*args: Any, **kwargs: Any) -> Callable:
+                spec_validate = self._measure(self.phases, "meta-schema compile", fn, *args, **kwargs)
+                return lambda spec: self._measure(self.phases, "spec validation", spec_validate, spec)
+
+            return wrapper
+
+        def register_ui(fn: Callable) -> Callable:
+            return lambda swagger, ui_settings: self._measure(self.phases, "UI registration", fn, swagger, ui_settings)
+
+        def route_init(fn: Callable) -> Callable:
+            def wrapper(route: SwaggerRoute, method: str, path: str, *args: Any, **kwargs: Any) -> None:
+                name = f"{method.upper()} {path}"
+                self._measure(
+                    self.operations,
+                    name,
+                    self._measure,
+                    self.phases,
+                    "validators",
+                    fn,
+                    route,
+                    method,
+                    path,
+                    *args,
+                    **kwargs,
+                )
+
+            return wrapper
+
+        def schema_to_validator(fn: Callable) -> Callable:
+            def wrapper(schema: Dict, **kwargs: Any) -> Any:
+                if "$ref" in schema:
+                    return self._measure(self.schemas, schema["$ref"], fn, schema, **kwargs)
+                return fn(schema, **kwargs)
+
+            return wrapper
+
+        self._patch(yaml, "safe_load", safe_load)
+        self._patch(fastjsonschema, "compile", compile_)
+        self._patch(Swagger, "_register_ui", register_ui)
+        self._patch(SwaggerRoute, "__init__", route_init)
+        # validators call schema_to_validator recursively through the module global
+        self._patch(validators, "schema_to_validator", schema_to_validator)
+        self._patch(swagger_route, "schema_to_validator", schema_to_validator)
+        self._started = (time.perf_counter(), self._memory())
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        start, memory = self._started
+        self.total = Measurement(1, time.perf_counter() - start, self._memory() - memory)
+        for obj, name, original in reversed(self._patches):
+            setattr(obj, name, original)
+        self._patches.clear()
+        if self.trace_memory:
+            tracemalloc.stop()
+
+    def _format(self, name: str, measurement: Measurement) -> str:
+        memory = f"{measurement.memory / 1024:>12.1f}" if self.trace_memory else f"{'-':>12}"
+        return f"{name:<48}{measurement.calls:>8}{measurement.seconds * 1000:>12.2f}{memory}"
+
+    def _table(self, title: str, rows: List[Tuple[str, Measurement]]) -> List[str]:
+        return [f"{title:<48}{'calls':>8}{'ms':>12}{'KiB':>12}", *(self._format(name, m) for name, m in rows)]
+
+    def report(self, top: int = 10) -> str:
+        """Returns the report: phases, ``top`` most expensive operations and schemas"""
+
+        def _top(bucket: Dict[str, Measurement]) -> List[Tuple[str, Measurement]]:
+            return sorted(bucket.items(), key=lambda item: item[1].seconds, reverse=True)[:top]
+
+        lines = self._table("phase", [*self.phases.items(), ("total", self.total)])
+        if self.operations:
+            lines += ["", *self._table(f"top {top} operations", _top(self.operations))]
+        if self.schemas:
+            lines += ["", *self._table(f"top {top} schemas", _top(self.schemas))]
+        return "\n".join(lines)
+
+
+async def _stub_handler(request: web.Request) -> web.StreamResponse:  # pragma: no cover
+    raise web.HTTPNotImplemented()
+
+
+def build_spec_file_app(spec_file: str, ui: Optional[str] = "swagger") -> web.Application:
+    """Builds an application serving every operation of ``spec_file`` with a stub handler"""
+    ui_kwargs: Dict[str, Any] = {}
+    if ui == "swagger":
+        ui_kwargs["swagger_ui_settings"] = SwaggerUiSettings(path="/docs")
+    elif ui == "redoc":
+        ui_kwargs["redoc_ui_settings"] = ReDocUiSettings(path="/docs")
+    elif ui == "rapidoc":
+        ui_kwargs["rapidoc_ui_settings"] = RapiDocUiSettings(path="/docs")
+    app = web.Application()
+    swagger = SwaggerFile(app, spec_file, **ui_kwargs)
+    for path, path_item in swagger.spec["paths"].items():
+        for method in path_item:
+            if method.upper() in hdrs.METH_ALL:
+                swagger.add_route(method.upper(), path, _stub_handler)
+    return app
@@ -0,0 +1,223 @@
+import re
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from aiohttp import web
+from aiohttp.web_urldispatcher import (
+    AbstractResource,
+    DynamicResource,
+    MatchedSubAppResource,
+    PlainResource,
+    UrlMappingMatchInfo,
+)
+
+from .string_formats import sf_uuid_validator
+from .validators import Integer, String, Validator
+
+# a variable of a dynamic resource without a custom regex, i.e. {pet_id}
+_VARIABLE = re.compile(r"^\{[_a-zA-Z][_a-zA-Z0-9]*\}$")
+_PATTERN_GROUP = re.compile(r"\(\?P<\w+>")
+_PATTERN_SEGMENT_GROUP = re.compile(r"\(\?P<\w+>\[\^\{\}/\]\+\)")
+# a {m}, {m,} or {m,n} quantifier, the only braces allowed in regexes of variables
+_QUANTIFIER = re.compile(r"\{\d+(,\d*)?\}")
+# everything int() accepts: surrounding whitespace, a sign and digits separated by underscores
+_INTEGER_SEGMENT = r"\s*[+-]?\d(?:_?\d)*\s*"
+_UUID_SEGMENT = r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+# regexes made by segment_pattern, they never match more than one segment
+_SEGMENT_PATTERNS: Set[str] = set()
+
+
+def _fully_anchored(pattern: str) -> bool:
+    """Whether ``pattern`` is ``^...$`` without other anchors or alternatives outside of groups,
+    so that searching it is the same as matching the whole value against what is between the anchors"""
+    if len(pattern) < 2 or pattern[0] != "^" or pattern[-1] != "$":
+        return False
+    depth = 0
+    escaped = in_class = False
+    for char in pattern[1:-1]:
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char in "^$" or (char == "|" and depth == 0):
+            return False
+    # the closing anchor is escaped, i.e. ^a\$
+    return not escaped and not in_class
+
+
+def segment_pattern(validator: Validator) -> Optional[str]:
+    """Regex of a path variable matching only segments that can be valid for ``validator``
+    of a path parameter, ``None`` if its schema does not narrow a segment down"""
+    pattern: Optional[str] = None
+    if isinstance(validator, Integer):
+        pattern = _INTEGER_SEGMENT
+    elif isinstance(validator, String):
+        if validator.enum is not None:
+            if validator.enum and not any(c in value for value in validator.enum for c in "/{}"):
+                pattern = "(?:{})".format("|".join(re.escape(value) for value in validator.enum))
+        elif validator.format == "uuid" and validator.format_validator is sf_uuid_validator:
+            pattern = _UUID_SEGMENT
+        elif validator.pattern is not None and _fully_anchored(validator.pattern.pattern):
+            regex = validator.pattern.pattern[1:-1]
+            if "{" not in _QUANTIFIER.sub("", regex) and "}" not in _QUANTIFIER.sub("", regex):
+                # the regex may match "/", so it only looks ahead, the segment itself is consumed
+                pattern = f"(?=(?:{regex})(?:/|$))[^/]+"
+    if pattern is None:
+        return None
+    try:
+        re.compile(pattern)
+    except re.error:
+        # i.e. global flags of the schema pattern
+        return None
+    _SEGMENT_PATTERNS.add(pattern)
+    return pattern
+
+
+class _Node:
+    __slots__ = ("static", "variable", "resources")
+
+    def __init__(self) -> None:
+        self.static: Dict[str, "_Node"] = {}
+        self.variable: Optional["_Node"] = None
+        self.resources: List[Tuple[int, AbstractResource]] = []
+
+    def find(self, parts: List[str], i: int) -> Iterator[List[Tuple[int, AbstractResource]]]:
+        """Resources of every path matching ``parts``, segments without a variable go first"""
+        if i == len(parts):
+            if self.resources:
+                yield self.resources
+            return
+        child = self.static.get(parts[i])
+        if child is not None:
+            yield from child.find(parts, i + 1)
+        if self.variable is not None and parts[i]:
+            yield from self.variable.find(parts, i + 1)
+
+
+def _index_key(resource: AbstractResource) -> str:
+    """Key of the resource in the index of aiohttp's router: its path up to the first variable"""
+    key = resource.canonical
+    if "{" in key:
+        key = key.partition("{")[0].rpartition("/")[0]
+    return key.rstrip("/") or "/"
+
+
+def _segments(resource: AbstractResource) -> Optional[List[str]]:
+    """Segments of the path of a dynamic resource if every variable is a whole segment
+    without a custom regex or with one made by ``segment_pattern``, otherwise ``None``"""
+    info = resource.get_info()
+    pattern = info["pattern"].pattern
+    segment_groups = len(_PATTERN_SEGMENT_GROUP.findall(pattern))
+    for typed in _SEGMENT_PATTERNS:
+        segment_groups += pattern.count(f">{typed})")
+    if len(_PATTERN_GROUP.findall(pattern)) != segment_groups:
+        return None
+    segments = info["formatter"][1:].split("/")
+    for segment in segments:
+        if "{" in segment and not _VARIABLE.match(segment):
+            return None
+    return segments
+
+
+class SpecRouter(web.UrlDispatcher):
+    """Router that resolves paths of routes in time independent of their number:
+    plain paths are looked up in a dict and paths whose variables are whole segments,
+    like paths of OpenAPI specs, in a trie of segments. Other resources (static files,
+    sub-applications, variables with a regex) and requests it does not resolve, i.e.
+    ``404 Not Found`` and ``405 Method Not Allowed``, are passed to ``aiohttp.web.UrlDispatcher``. Variables typed
+    by their schemas (``typed_path_params``) are kept in the trie, resources of a path
+    that differ only in types of variables are tried in order of registration.
+
+    Resolution is the same as of ``aiohttp.web.UrlDispatcher``, except that among paths with
+    the same prefix before the first variable a segment without a variable wins regardless
+    of the order of registration, as required by OpenAPI.
+
+    It pays off only when many templated paths share a prefix before their first variable,
+    i.e. ``/api/{version}/...``, which aiohttp resolves by trying them one by one. Plain paths
+    are resolved as fast as by aiohttp and other templated paths slower, see
+    ``python -m benchmarks.routing``.
+
+    The index is built when the application is frozen, on startup::
+
+        app = web.Application(router=SpecRouter())
+        swagger = SwaggerFile(app, "spec.yaml")
+
+    .. warning::
+
+       aiohttp has no other way to replace the router, the ``router`` argument
+       of ``web.Application`` emits ``DeprecationWarning: router argument is deprecated``
+       and may be removed in aiohttp 4
+    """
+
+    __slots__ = ("_plain", "_trie", "_opaque", "_fallback_only")
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._plain: Dict[str, List[Tuple[int, AbstractResource]]] = {}
+        self._trie = _Node()
+        # index key -> position of the first resource with it that is resolved by aiohttp
+        self._opaque: Dict[str, int] = {}
+        self._fallback_only = True
+
+    def freeze(self) -> None:
+        if self.frozen:
+            return
+        super().freeze()
+        for position, resource in enumerate(self.resources()):
+            if isinstance(resource, MatchedSubAppResource):
+                # matched by domain before any path, leave everything to aiohttp
+                return
+            if isinstance(resource, PlainResource):
+                self._plain.setdefault(resource.canonical, []).append((position, resource))
+                continue
+            segments = _segments(resource) if isinstance(resource, DynamicResource) else None
+            if segments is None:
+                self._opaque.setdefault(_index_key(resource), position)
+                continue
+            node = self._trie
+            for segment in segments:
+                if _VARIABLE.match(segment):
+                    if node.variable is None:
+                        node.variable = _Node()
+                    node = node.variable
+                else:
+                    node = node.static.setdefault(segment, _Node())
+            node.resources.append((position, resource))
+        self._fallback_only = False
+
+    def _shadowed(self, path: str, position: int, resource: AbstractResource) -> bool:
+        """Whether aiohttp would try a resource it resolves itself before ``resource``:
+        one with a longer index key matching ``path`` or the same key registered earlier"""
+        key = _index_key(resource)
+        opaque = self._opaque.get(key)
+        if opaque is not None and opaque < position:
+            return True
+        while len(path) > len(key):
+            if path in self._opaque:
+                return True
+            path = path.rpartition("/")[0] or "/"
+        return False
+
+    async def resolve(self, request: web.Request) -> UrlMappingMatchInfo:
+        if self._fallback_only:
+            return await super().resolve(request)
+        # like aiohttp, match the path with "/" inside of variables still quoted
+        path = request.rel_url.path_safe
+        plain = self._plain.get(path)
+        found = iter((plain,)) if plain is not None else self._trie.find(path[1:].split("/"), 0)
+        for candidates in found:
+            if self._opaque and self._shadowed(path, *candidates[0]):
+                break
+            for _, resource in candidates:
+                match_info, _ = await resource.resolve(request)
+                if match_info is not None:
+                    return match_info
+        # aiohttp builds 404 Not Found or 405 Method Not Allowed
+        return await super().resolve(request)
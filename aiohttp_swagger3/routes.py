@@ -1,5 +1,6 @@
 import datetime
 import json
+from types import MappingProxyType
 from typing import Any
 
 from aiohttp import web
@@ -14,6 +15,9 @@ class CustomEncoder(json.JSONEncoder):
     def default(self, obj: Any) -> Any:
         if isinstance(obj, datetime.date):
             return obj.isoformat()
+        if isinstance(obj, MappingProxyType):
+            # frozen spec, see SwaggerFile's frozen
+            return dict(obj)
         return json.JSONEncoder.default(self, obj)
 
 
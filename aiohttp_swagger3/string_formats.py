@@ -2,13 +2,23 @@ import base64
 import ipaddress
 import re
 import uuid
-
-from rfc3339_validator import validate_rfc3339
+from typing import Callable, Optional
 
 from .exceptions import ValidatorError
 
 _EMAIL_REGEX = re.compile(r"[^@]+@[^@]+\.[^@]+")
 _HOSTNAME_REGEX = re.compile(r"(?!-)[a-z0-9-]{1,63}(?<!-)$", re.IGNORECASE)
+_validate_rfc3339: Optional[Callable[[str], bool]] = None
+
+
+def _rfc3339(value: str) -> bool:
+    global _validate_rfc3339
+    if _validate_rfc3339 is None:
+        # imported when the first date or date-time is validated
+        from rfc3339_validator import validate_rfc3339
+
+        _validate_rfc3339 = validate_rfc3339
+    return _validate_rfc3339(value)
 
 
 def sf_uuid_validator(value: str) -> None:
@@ -19,12 +29,12 @@ def sf_uuid_validator(value: str) -> None:
 
 
 def sf_date_validator(value: str) -> None:
-    if not validate_rfc3339(f"{value}T00:00:00Z"):
+    if not _rfc3339(f"{value}T00:00:00Z"):
         raise ValidatorError("value should be date format")
 
 
 def sf_date_time_validator(value: str) -> None:
-    if not validate_rfc3339(value):
+    if not _rfc3339(value):
         raise ValidatorError("value should be datetime format")
 
 
@@ -1,15 +1,42 @@
+import contextlib
 import json
 import pathlib
+import re
 from collections import defaultdict
-from typing import TYPE_CHECKING, Any, Awaitable, Callable, DefaultDict, Dict, Optional, Set, Tuple, Type, Union
+from concurrent.futures import Executor
+from types import MappingProxyType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    DefaultDict,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
-import fastjsonschema
 from aiohttp import hdrs, web
 from aiohttp.abc import AbstractView, StreamResponse
-
-from .context import STRING_FORMATS
-from .handlers import application_json, x_www_form_urlencoded
-from .index_templates import RAPIDOC_UI_TEMPLATE, REDOC_UI_TEMPLATE, SWAGGER_UI_TEMPLATE
+from aiohttp.web_urldispatcher import _default_expect_handler
+
+from . import handlers
+from .context import COMPONENTS, STRING_FORMATS
+from .handlers import (
+    BinaryHandler,
+    MultipartFormDataHandler,
+    NDJSONHandler,
+    StreamingMediaTypeHandler,
+    application_cbor,
+    application_json,
+    application_msgpack,
+    x_www_form_urlencoded,
+)
 from .routes import (
     _RAPIDOC_UI_INDEX_HTML,
     _REDOC_UI_INDEX_HTML,
@@ -30,18 +57,63 @@ from .string_formats import (
     sf_ipv6_validator,
     sf_uuid_validator,
 )
-from .ui_settings import RapiDocUiSettings, ReDocUiSettings, SwaggerUiSettings
+from .tracing import Tracer
+from .validators import ValidationBudget
+from .verifiers import CredentialVerifier
+from .watchdog import ValidationWatchdog
 
 if TYPE_CHECKING:
     from .swagger_route import SwaggerRoute
+    from .ui_settings import RapiDocUiSettings, ReDocUiSettings, SwaggerUiSettings
 
 
 WebHandler = Callable[[web.Request], Awaitable[web.StreamResponse]]
 ExpectHandler = Callable[[web.Request], Awaitable[Optional[StreamResponse]]]
+MediaTypeHandler = Union[Callable[[web.Request], Awaitable[Tuple[Any, bool]]], StreamingMediaTypeHandler]
+
+# a whole segment of a path that is a variable without a regex, i.e. {pet_id}
+_PATH_VARIABLE = re.compile(r"\{([_a-zA-Z][_a-zA-Z0-9]*)\}")
+
+
+def compile_spec_validator() -> Callable[[Dict], Any]:
+    """Compiles the validator of OpenAPI 3 documents"""
+    import fastjsonschema
+
+    base_path = pathlib.Path(__file__).parent
+    with open(base_path / "schema/schema.json") as f:
+        schema = json.load(f)
+    spec_validate: Callable[[Dict], Any] = fastjsonschema.compile(
+        schema, formats={"uri-reference": r"^\w+:(\/?\/?)[^\s]+\Z|^#(\/\w+)+"}
+    )
+    return spec_validate
 
 
 class Swagger(web.UrlDispatcher):
-    __slots__ = ("_app", "validate", "spec", "request_key", "handlers", "spec_validate")
+    __slots__ = (
+        "_app",
+        "validate",
+        "spec",
+        "request_key",
+        "handlers",
+        "spec_validate",
+        "collect_all_credentials",
+        "security_verifiers",
+        "offload_threshold",
+        "offload_executor",
+        "validation_budget",
+        "validation_watchdog",
+        "tracer",
+        "load_compiled_operations",
+        "compiled_operations",
+        "validation_only",
+        "spec_released",
+        "string_formats",
+        "validators_built",
+        "typed_path_params",
+        "typed_paths",
+        "body_last",
+        "validate_expect",
+    )
 
     def __init__(
         self,
@@ -50,19 +122,46 @@ class Swagger(web.UrlDispatcher):
         validate: bool,
         spec: Dict,
         request_key: str,
-        swagger_ui_settings: Optional[SwaggerUiSettings],
-        redoc_ui_settings: Optional[ReDocUiSettings],
-        rapidoc_ui_settings: Optional[RapiDocUiSettings],
+        swagger_ui_settings: Optional["SwaggerUiSettings"],
+        redoc_ui_settings: Optional["ReDocUiSettings"],
+        rapidoc_ui_settings: Optional["RapiDocUiSettings"],
+        collect_all_credentials: bool = False,
+        offload_threshold: Optional[int] = None,
+        offload_executor: Optional[Executor] = None,
+        validation_budget: Optional[ValidationBudget] = None,
+        validation_watchdog: Optional[ValidationWatchdog] = None,
+        tracer: Optional[Tracer] = None,
+        load_compiled_operations: Optional[Callable[[], Dict[Tuple[str, str], Dict]]] = None,
+        validation_only: bool = False,
+        typed_path_params: bool = False,
+        body_last: bool = False,
+        validate_expect: bool = False,
     ) -> None:
         self._app = app
         self.validate = validate
         self.spec = spec
         self.request_key = request_key
-        self.handlers: DefaultDict[str, Dict[str, Callable[[web.Request], Awaitable[Tuple[Any, bool]]]]] = defaultdict(
-            dict
-        )
+        self.collect_all_credentials = collect_all_credentials
+        self.security_verifiers: Dict[str, CredentialVerifier] = {}
+        self.offload_threshold = offload_threshold
+        self.offload_executor = offload_executor
+        self.validation_budget = validation_budget
+        self.validation_watchdog = validation_watchdog
+        self.tracer = tracer
+        self.handlers: DefaultDict[str, Dict[str, MediaTypeHandler]] = defaultdict(dict)
+        self.validation_only = validation_only
+        self.spec_released = False
+        self.string_formats: Dict[str, Callable[[str], None]] = {}
+        self.validators_built = False
+        self.typed_path_params = typed_path_params
+        # path -> path with regexes it was registered with
+        self.typed_paths: Dict[str, str] = {}
+        self.body_last = body_last
+        self.validate_expect = validate_expect
 
         uis = (rapidoc_ui_settings, redoc_ui_settings, swagger_ui_settings)
+        if validation_only and any(ui is not None for ui in uis):
+            raise Exception("UI cannot be served in validation only mode")
         paths: Set[str] = set()
         for ui in uis:
             if ui is None:
@@ -71,23 +170,30 @@ class Swagger(web.UrlDispatcher):
                 raise Exception("cannot bind two UIs on the same path")
             paths.add(ui.path)
 
-        base_path = pathlib.Path(__file__).parent
-        with open(base_path / "schema/schema.json") as f:
-            schema = json.load(f)
-
-        self.spec_validate = fastjsonschema.compile(
-            schema, formats={"uri-reference": r"^\w+:(\/?\/?)[^\s]+\Z|^#(\/\w+)+"}
-        )
-        self.spec_validate(self.spec)
+        self.load_compiled_operations = load_compiled_operations
+        self.compiled_operations: Optional[Dict[Tuple[str, str], Dict]] = None
+        # a frozen spec is validated before it is frozen, once for every instance sharing it
+        if load_compiled_operations is None and not isinstance(spec, MappingProxyType):
+            self.spec_validate = compile_spec_validator()
+            self.spec_validate(self.spec)
 
         for ui in uis:
             if ui is not None:
                 self._register_ui(ui)
+        if validation_only:
+            app.on_startup.append(self._release_spec_on_startup)
 
-        STRING_FORMATS.set({})
         if self.validate:
             self.register_media_type_handler("application/json", application_json)
             self.register_media_type_handler("application/x-www-form-urlencoded", x_www_form_urlencoded)
+            self.register_media_type_handler("multipart/form-data", MultipartFormDataHandler())
+            self.register_media_type_handler("application/octet-stream", BinaryHandler())
+            self.register_media_type_handler("application/x-ndjson", NDJSONHandler())
+            if handlers.installed("msgpack"):
+                self.register_media_type_handler("application/msgpack", application_msgpack)
+                self.register_media_type_handler("application/x-msgpack", application_msgpack)
+            if handlers.installed("cbor2"):
+                self.register_media_type_handler("application/cbor", application_cbor)
 
             self.register_string_format_validator("byte", sf_byte_validator)
             self.register_string_format_validator("date-time", sf_date_time_validator)
@@ -100,7 +206,81 @@ class Swagger(web.UrlDispatcher):
 
         super().__init__()
 
-    def _register_ui(self, ui_settings: Union[SwaggerUiSettings, ReDocUiSettings, RapiDocUiSettings]) -> None:
+    def release_spec(self) -> None:
+        """Drops the spec and everything needed only to build validators of new routes,
+        validators of added routes are kept. Routes cannot be added after that.
+
+        Called on application startup in validation only mode, call it earlier, i.e. before
+        forking workers, to free the memory before they are forked.
+        """
+        self.spec = {}
+        self.load_compiled_operations = None
+        self.compiled_operations = None
+        with contextlib.suppress(AttributeError):
+            # the meta-schema validator is not compiled when validators are loaded ahead of time
+            del self.spec_validate
+        self.spec_released = True
+
+    async def _release_spec_on_startup(self, app: web.Application) -> None:
+        if not self.spec_released:
+            self.release_spec()
+
+    def _check_spec_released(self) -> None:
+        if self.spec_released:
+            raise Exception("routes cannot be added after the spec is released")
+
+    @contextlib.contextmanager
+    def _building_validators(self) -> Iterator[None]:
+        """Context of building validators of a route: components of the spec
+        and string formats of this instance"""
+        self.validators_built = True
+        components_token = COMPONENTS.set(self.spec.get("components", {}))
+        string_formats_token = STRING_FORMATS.set(self.string_formats)
+        try:
+            yield
+        finally:
+            STRING_FORMATS.reset(string_formats_token)
+            COMPONENTS.reset(components_token)
+
+    def _compiled_operation(self, method: str, path: str) -> Optional[Dict]:
+        """Validators of an operation built ahead of time by ``python -m aiohttp_swagger3 compile``,
+        they are created with the first route, when custom string formats are registered"""
+        if self.load_compiled_operations is None:
+            return None
+        if self.compiled_operations is None:
+            self.compiled_operations = self.load_compiled_operations()
+        return self.compiled_operations[(method, path)]
+
+    def _typed_path(self, path: str, routes: List["SwaggerRoute"]) -> str:
+        """``path`` to register in the router, its variables get regexes derived from schemas
+        of the path parameters of ``routes`` if all of them agree on a regex. A route without
+        an operation in the spec, i.e. ``HEAD`` of ``add_get``, gets regexes of the path
+        registered before"""
+        if not self.typed_path_params:
+            return path
+        if not routes:
+            return self.typed_paths.get(path, path)
+        from .router import segment_pattern
+
+        segments = path.split("/")
+        for i, segment in enumerate(segments):
+            match = _PATH_VARIABLE.fullmatch(segment)
+            if match is None:
+                continue
+            patterns = set()
+            for route in routes:
+                validator = next((param.validator for param in route.pp if param.name == match.group(1)), None)
+                patterns.add(None if validator is None else segment_pattern(validator))
+            pattern = patterns.pop() if len(patterns) == 1 else None
+            if pattern is not None:
+                segments[i] = f"{{{match.group(1)}:{pattern}}}"
+        typed_path = self.typed_paths[path] = "/".join(segments)
+        return typed_path
+
+    def _register_ui(self, ui_settings: Union["SwaggerUiSettings", "ReDocUiSettings", "RapiDocUiSettings"]) -> None:
+        from .index_templates import RAPIDOC_UI_TEMPLATE, REDOC_UI_TEMPLATE, SWAGGER_UI_TEMPLATE
+        from .ui_settings import ReDocUiSettings, SwaggerUiSettings
+
         ui_path = ui_settings.path
         if not ui_path.startswith("/"):
             raise Exception("path should start with /")
@@ -146,6 +326,11 @@ class Swagger(web.UrlDispatcher):
         allow_head: bool = True,
         **kwargs: Any,
     ) -> web.AbstractRoute:
+        if allow_head and self.typed_path_params:
+            # HEAD is registered in the resource of GET, with its regexes
+            route = self.add_route(hdrs.METH_GET, path, handler, name=name, **kwargs)
+            self.add_route(hdrs.METH_HEAD, path, handler, name=name, **kwargs)
+            return route
         if allow_head:
             self.add_route(hdrs.METH_HEAD, path, handler, **kwargs)
         return self.add_route(hdrs.METH_GET, path, handler, name=name, **kwargs)
@@ -165,11 +350,7 @@ class Swagger(web.UrlDispatcher):
     def add_view(self, path: str, handler: Type[AbstractView], **kwargs: Any) -> web.AbstractRoute:
         return self.add_route(hdrs.METH_ANY, path, handler, **kwargs)
 
-    def register_media_type_handler(
-        self,
-        media_type: str,
-        handler: Callable[[web.Request], Awaitable[Tuple[Any, bool]]],
-    ) -> None:
+    def register_media_type_handler(self, media_type: str, handler: MediaTypeHandler) -> None:
         """This method allows registering custom handler for a media type
 
         Please, see `example <https://github.com/hh-h/aiohttp-swagger3/blob/master/examples/custom_media_type_handler/main.py>`__
@@ -194,6 +375,10 @@ class Swagger(web.UrlDispatcher):
               swagger.register_media_type_handler("custom/handler", custom_handler)
               swagger.add_post("/r", handler)
 
+        Instead of a function, an instance of :class:`StreamingMediaTypeHandler` can be passed,
+        it receives the validator of the media type schema and validates the body while reading it,
+        i.e. ``multipart/form-data`` is handled by :class:`MultipartFormDataHandler` by default.
+
         :param str media_type: The name of custom string format
         :param handler: The handler function that will be executed for the media type
         """
@@ -205,14 +390,63 @@ class Swagger(web.UrlDispatcher):
 
         Please, see `example <https://github.com/hh-h/aiohttp-swagger3/blob/master/examples/custom_string_format/main.py>`__
 
+        .. warning::
+
+           `register_string_format_validator` must be called before adding routes,
+           validators of routes are bound to string formats when routes are added,
+           an exception is raised otherwise
+
+           ✘
+
+           .. code-block:: python
+
+              swagger = SwaggerDocs(app)
+              swagger.add_post("/r", handler)
+              swagger.register_string_format_validator("custom_format", custom_validator)
+
+           ✔
+
+           .. code-block:: python
+
+              swagger = SwaggerDocs(app)
+              swagger.register_string_format_validator("custom_format", custom_validator)
+              swagger.add_post("/r", handler)
+
         :param str string_format: The name of custom string format
         :param validator: The validator function that should be used for
             validating passed string format
         """
-        sf_validators = STRING_FORMATS.get()
-        sf_validators[string_format] = validator
+        if self.validators_built:
+            raise Exception("string format validators must be registered before routes are added")
+        self.string_formats[string_format] = validator
+
+    def register_security_verifier(
+        self,
+        scheme: str,
+        verifier: Callable[[str], Any],
+        *,
+        ttl: float = 60.0,
+        max_size: int = 1024,
+    ) -> None:
+        """This method allows verifying credentials of a security scheme, i.e. checking JWT signatures
+
+        ``verifier`` is a function or a coroutine function that receives the credential
+        and returns claims or raises :class:`ValidatorError`. Claims are stored in ``request``
+        under the name of the security scheme. Results are cached by the hash of the credential,
+        concurrent requests with the same credential share one call of the verifier.
+
+        .. warning::
+
+           `register_security_verifier` must be called before adding routes that use the scheme
+
+        :param str scheme: The name of security scheme in ``components.securitySchemes``
+        :param verifier: The function that verifies a credential, i.e. :class:`JWTVerifier`
+        :param float ttl: Number of seconds the result is cached for, default ``60``
+        :param int max_size: Maximum number of cached results, default ``1024``
+        """
+        self.security_verifiers[scheme] = CredentialVerifier(verifier, ttl=ttl, max_size=max_size)
 
-    def _get_media_type_handler(self, media_type: str) -> Callable[[web.Request], Awaitable[Tuple[Any, bool]]]:
+    def _get_media_type_handler(self, media_type: str) -> MediaTypeHandler:
         typ, subtype = media_type.split("/")
         if typ not in self.handlers:
             if "*" not in self.handlers:
@@ -223,6 +457,10 @@ class Swagger(web.UrlDispatcher):
                 return self.handlers["*"]["*"]
             return self.handlers["*"][subtype]
         if subtype not in self.handlers[typ]:
+            # structured syntax suffix, i.e. application/vnd.api+json -> application/json
+            _, plus, suffix = subtype.rpartition("+")
+            if plus and suffix in self.handlers[typ]:
+                return self.handlers[typ][suffix]
             if "*" not in self.handlers[typ]:
                 raise Exception(f"register handler for {media_type} first")
             return self.handlers[typ]["*"]
@@ -234,6 +472,14 @@ async def _handle_swagger_call(route: "SwaggerRoute", request: web.Request) -> w
     return await route.handler(**kwargs)
 
 
+async def _handle_swagger_expect(routes: Dict[str, "SwaggerRoute"], request: web.Request) -> None:
+    route = routes.get(request.method.lower())
+    if route is None:
+        await _default_expect_handler(request)
+    else:
+        await route.expect(request)
+
+
 async def _handle_swagger_method_call(view: web.View, route: "SwaggerRoute") -> web.StreamResponse:
     kwargs = await route.parse(view.request)
     return await route.handler(view, **kwargs)
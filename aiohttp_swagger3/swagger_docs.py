@@ -2,18 +2,28 @@ import functools
 import re
 import warnings
 from collections import defaultdict
-from typing import Callable, Dict, Optional, Type, Union
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Type, Union
 
-import fastjsonschema
-import yaml
 from aiohttp import hdrs, web
 from aiohttp.abc import AbstractView
 
 from .routes import _SWAGGER_SPECIFICATION
-from .swagger import ExpectHandler, Swagger, _handle_swagger_call, _handle_swagger_method_call
+from .swagger import (
+    ExpectHandler,
+    Swagger,
+    _handle_swagger_call,
+    _handle_swagger_expect,
+    _handle_swagger_method_call,
+)
 from .swagger_info import SwaggerInfo
 from .swagger_route import SwaggerRoute, _SwaggerHandler
-from .ui_settings import RapiDocUiSettings, ReDocUiSettings, SwaggerUiSettings
+from .tracing import Tracer
+from .validators import ValidationBudget
+from .watchdog import ValidationWatchdog
+
+if TYPE_CHECKING:
+    from .ui_settings import RapiDocUiSettings, ReDocUiSettings, SwaggerUiSettings
 
 _PATH_VAR_REGEX = re.compile(r"{([_a-zA-Z][_a-zA-Z0-9].+?):.+?}(/|$)")
 
@@ -53,6 +63,40 @@ class SwaggerDocs(Swagger):
     :param swagger_ui_settings: class:`SwaggerUiSettings` (optional)
     :param redoc_ui_settings: class:`ReDocUiSettings` (optional)
     :param rapidoc_ui_settings: class:`RapiDocUiSettings` (optional)
+    :param bool collect_all_credentials: if ``True``, every alternative security requirement is checked
+                                         and credentials of all satisfied ones are stored in ``request``,
+                                         otherwise the first satisfied requirement wins, default ``False``
+    :param int offload_threshold: bodies larger than this number of bytes are decoded and validated
+                                  in ``offload_executor`` instead of the event loop, can be overridden
+                                  per route in ``add_route``, default ``None`` (disabled)
+    :param offload_executor: ``concurrent.futures.Executor`` for large bodies, a process pool receives
+                             the raw body, validators are sent once to every worker process, so
+                             they and custom string formats must be picklable, default ``None``
+                             (the default executor of the event loop)
+    :param validation_budget: class:`ValidationBudget`, if set, arrays and objects of request bodies
+                              are validated in slices yielding to the event loop in between (optional)
+    :param validation_watchdog: class:`ValidationWatchdog`, if set, requests whose validation is slow
+                                are reported to the log (optional)
+    :param tracer: class:`Tracer` receiving spans of validation phases, i.e. class:`OpenTelemetryTracer`
+                   (optional)
+    :param bool validation_only: if ``True``, no UI can be registered and the spec is released
+                                 on application startup, only validators of added routes are kept,
+                                 routes cannot be added after that, default ``False``
+    :param bool typed_path_params: if ``True``, variables of paths are registered in the router with
+                                   regexes derived from schemas of path parameters (``integer``, ``enum``,
+                                   anchored ``pattern``, ``format: uuid``), a request whose path does not
+                                   match them gets ``404 Not Found`` instead of ``400 Bad Request``,
+                                   default ``False``
+    :param bool body_last: if ``True``, the request body is validated after all parameters and is not
+                           read when any of them is invalid, errors of the body are reported only for
+                           requests with valid parameters, otherwise all errors are collected,
+                           default ``False``
+    :param bool validate_expect: if ``True``, parameters, ``Content-Type`` and ``Content-Length``
+                                 of a request with ``Expect: 100-continue`` are validated before
+                                 the client is told to send the body. aiohttp runs expect handlers
+                                 before middlewares, so their errors (``400 Bad Request`` with
+                                 :class:`RequestValidationFailed`, ``413 Request Entity Too Large``)
+                                 do not pass through middlewares of the application, default ``False``
     """
 
     __slots__ = ()
@@ -69,9 +113,19 @@ class SwaggerDocs(Swagger):
         description: Optional[str] = None,
         components: Optional[str] = None,
         security: Optional[str] = None,
-        swagger_ui_settings: Optional[SwaggerUiSettings] = None,
-        redoc_ui_settings: Optional[ReDocUiSettings] = None,
-        rapidoc_ui_settings: Optional[RapiDocUiSettings] = None,
+        swagger_ui_settings: Optional["SwaggerUiSettings"] = None,
+        redoc_ui_settings: Optional["ReDocUiSettings"] = None,
+        rapidoc_ui_settings: Optional["RapiDocUiSettings"] = None,
+        collect_all_credentials: bool = False,
+        offload_threshold: Optional[int] = None,
+        offload_executor: Optional[Executor] = None,
+        validation_budget: Optional[ValidationBudget] = None,
+        validation_watchdog: Optional[ValidationWatchdog] = None,
+        tracer: Optional[Tracer] = None,
+        validation_only: bool = False,
+        typed_path_params: bool = False,
+        body_last: bool = False,
+        validate_expect: bool = False,
     ) -> None:
         if info is not None and (title is not None or version is not None or description is not None):
             raise Exception("do not use SwaggerDocs' info with title or version or description")
@@ -106,6 +160,9 @@ class SwaggerDocs(Swagger):
             "paths": defaultdict(lambda: defaultdict(dict)),
         }
 
+        if components or security:
+            import yaml
+
         if components:
             with open(components) as f:
                 spec.update(yaml.safe_load(f))
@@ -122,8 +179,19 @@ class SwaggerDocs(Swagger):
             swagger_ui_settings=swagger_ui_settings,
             redoc_ui_settings=redoc_ui_settings,
             rapidoc_ui_settings=rapidoc_ui_settings,
+            collect_all_credentials=collect_all_credentials,
+            offload_threshold=offload_threshold,
+            offload_executor=offload_executor,
+            validation_budget=validation_budget,
+            validation_watchdog=validation_watchdog,
+            tracer=tracer,
+            validation_only=validation_only,
+            typed_path_params=typed_path_params,
+            body_last=body_last,
+            validate_expect=validate_expect,
         )
-        self._app[_SWAGGER_SPECIFICATION] = self.spec
+        if not validation_only:
+            self._app[_SWAGGER_SPECIFICATION] = self.spec
 
     def _wrap_handler(
         self,
@@ -133,9 +201,14 @@ class SwaggerDocs(Swagger):
         *,
         is_method: bool,
         validate: bool,
+        offload_threshold: Optional[int] = None,
+        routes: Optional[List[SwaggerRoute]] = None,
     ) -> _SwaggerHandler:
         if not handler.__doc__ or "---" not in handler.__doc__:
             return handler
+        import fastjsonschema
+        import yaml
+
         *_, spec = handler.__doc__.split("---")
         method_spec = yaml.safe_load(spec)
         path = _PATH_VAR_REGEX.sub(r"{\1}\2", path)
@@ -148,10 +221,13 @@ class SwaggerDocs(Swagger):
         except fastjsonschema.exceptions.JsonSchemaException as exc:
             fn_name = handler.__name__
             raise Exception(f"Invalid schema for handler '{fn_name}' {method.upper()} {path} - {exc}")
-        self._app[_SWAGGER_SPECIFICATION] = self.spec
+        if not self.validation_only:
+            self._app[_SWAGGER_SPECIFICATION] = self.spec
         if not validate:
             return handler
-        route = SwaggerRoute(method, path, handler, swagger=self)
+        route = SwaggerRoute(method, path, handler, swagger=self, offload_threshold=offload_threshold)
+        if routes is not None:
+            routes.append(route)
         if is_method:
             return functools.partialmethod(_handle_swagger_method_call, route)  # type: ignore
         return functools.partial(_handle_swagger_call, route)
@@ -165,11 +241,14 @@ class SwaggerDocs(Swagger):
         name: Optional[str] = None,
         expect_handler: Optional[ExpectHandler] = None,
         validate: Optional[bool] = None,
+        offload_threshold: Optional[int] = None,
     ) -> web.AbstractRoute:
+        self._check_spec_released()
         if validate is None:
             need_validation: bool = self.validate
         else:
             need_validation = False if not self.validate else validate
+        routes: List[SwaggerRoute] = []
         if isinstance(handler, type) and issubclass(handler, AbstractView):
             for meth in hdrs.METH_ALL:
                 meth = meth.lower()
@@ -184,6 +263,8 @@ class SwaggerDocs(Swagger):
                             handler_,
                             is_method=True,
                             validate=need_validation,
+                            offload_threshold=offload_threshold,
+                            routes=routes,
                         ),
                     )
         else:
@@ -202,6 +283,8 @@ class SwaggerDocs(Swagger):
                         handler,
                         is_method=False,
                         validate=need_validation,
+                        offload_threshold=offload_threshold,
+                        routes=routes,
                     )
             else:
                 handler = self._wrap_handler(
@@ -210,6 +293,11 @@ class SwaggerDocs(Swagger):
                     handler,
                     is_method=False,
                     validate=need_validation,
+                    offload_threshold=offload_threshold,
+                    routes=routes,
                 )
 
+        if expect_handler is None and routes and self.validate_expect:
+            expect_handler = functools.partial(_handle_swagger_expect, {route.method: route for route in routes})
+        path = self._typed_path(path, routes)
         return self._app.router.add_route(method, path, handler, name=name, expect_handler=expect_handler)
@@ -1,14 +1,27 @@
 import functools
-from typing import Optional, Type, Union
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, List, Optional, Type, Union
 
-import yaml
 from aiohttp import hdrs, web
 from aiohttp.abc import AbstractView
 
+from .compiler import load_compiled
+from .frozen import load_frozen_spec
 from .routes import _SWAGGER_SPECIFICATION
-from .swagger import ExpectHandler, Swagger, _handle_swagger_call, _handle_swagger_method_call
+from .swagger import (
+    ExpectHandler,
+    Swagger,
+    _handle_swagger_call,
+    _handle_swagger_expect,
+    _handle_swagger_method_call,
+)
 from .swagger_route import SwaggerRoute, _SwaggerHandler
-from .ui_settings import RapiDocUiSettings, ReDocUiSettings, SwaggerUiSettings
+from .tracing import Tracer
+from .validators import ValidationBudget
+from .watchdog import ValidationWatchdog
+
+if TYPE_CHECKING:
+    from .ui_settings import RapiDocUiSettings, ReDocUiSettings, SwaggerUiSettings
 
 
 class SwaggerFile(Swagger):
@@ -22,6 +35,46 @@ class SwaggerFile(Swagger):
     :param swagger_ui_settings: class:`SwaggerUiSettings` (optional)
     :param redoc_ui_settings: class:`ReDocUiSettings` (optional)
     :param rapidoc_ui_settings: class:`RapiDocUiSettings` (optional)
+    :param bool collect_all_credentials: if ``True``, every alternative security requirement is checked
+                                         and credentials of all satisfied ones are stored in ``request``,
+                                         otherwise the first satisfied requirement wins, default ``False``
+    :param int offload_threshold: bodies larger than this number of bytes are decoded and validated
+                                  in ``offload_executor`` instead of the event loop, can be overridden
+                                  per route in ``add_route``, default ``None`` (disabled)
+    :param offload_executor: ``concurrent.futures.Executor`` for large bodies, a process pool receives
+                             the raw body, validators are sent once to every worker process, so
+                             they and custom string formats must be picklable, default ``None``
+                             (the default executor of the event loop)
+    :param validation_budget: class:`ValidationBudget`, if set, arrays and objects of request bodies
+                              are validated in slices yielding to the event loop in between (optional)
+    :param validation_watchdog: class:`ValidationWatchdog`, if set, requests whose validation is slow
+                                are reported to the log (optional)
+    :param tracer: class:`Tracer` receiving spans of validation phases, i.e. class:`OpenTelemetryTracer`
+                   (optional)
+    :param str compiled: name of a module generated from ``spec_file`` by
+                         ``python -m aiohttp_swagger3 compile``, the spec and validators are loaded
+                         from it instead of being parsed and built at startup (optional)
+    :param bool frozen: if ``True``, the spec is loaded into an immutable representation with interned
+                        strings and shared equal subtrees, it is loaded once per content of ``spec_file``
+                        and shared by every instance, default ``False``
+    :param bool validation_only: if ``True``, no UI can be registered and the spec is released
+                                 on application startup, only validators of added routes are kept,
+                                 routes cannot be added after that, default ``False``
+    :param bool typed_path_params: if ``True``, variables of paths are registered in the router with
+                                   regexes derived from schemas of path parameters (``integer``, ``enum``,
+                                   anchored ``pattern``, ``format: uuid``), a request whose path does not
+                                   match them gets ``404 Not Found`` instead of ``400 Bad Request``,
+                                   default ``False``
+    :param bool body_last: if ``True``, the request body is validated after all parameters and is not
+                           read when any of them is invalid, errors of the body are reported only for
+                           requests with valid parameters, otherwise all errors are collected,
+                           default ``False``
+    :param bool validate_expect: if ``True``, parameters, ``Content-Type`` and ``Content-Length``
+                                 of a request with ``Expect: 100-continue`` are validated before
+                                 the client is told to send the body. aiohttp runs expect handlers
+                                 before middlewares, so their errors (``400 Bad Request`` with
+                                 :class:`RequestValidationFailed`, ``413 Request Entity Too Large``)
+                                 do not pass through middlewares of the application, default ``False``
     """
 
     __slots__ = ()
@@ -33,14 +86,38 @@ class SwaggerFile(Swagger):
         *,
         validate: bool = True,
         request_key: str = "data",
-        swagger_ui_settings: Optional[SwaggerUiSettings] = None,
-        redoc_ui_settings: Optional[ReDocUiSettings] = None,
-        rapidoc_ui_settings: Optional[RapiDocUiSettings] = None,
+        swagger_ui_settings: Optional["SwaggerUiSettings"] = None,
+        redoc_ui_settings: Optional["ReDocUiSettings"] = None,
+        rapidoc_ui_settings: Optional["RapiDocUiSettings"] = None,
+        collect_all_credentials: bool = False,
+        offload_threshold: Optional[int] = None,
+        offload_executor: Optional[Executor] = None,
+        validation_budget: Optional[ValidationBudget] = None,
+        validation_watchdog: Optional[ValidationWatchdog] = None,
+        tracer: Optional[Tracer] = None,
+        compiled: Optional[str] = None,
+        frozen: bool = False,
+        validation_only: bool = False,
+        typed_path_params: bool = False,
+        body_last: bool = False,
+        validate_expect: bool = False,
     ) -> None:
         if not spec_file:
             raise Exception("spec file with swagger schema must be provided")
-        with open(spec_file) as f:
-            spec = yaml.safe_load(f)
+        load_compiled_operations = None
+        if compiled is not None:
+            manifest = load_compiled(compiled, spec_file)
+            spec = manifest["spec"]
+            load_compiled_operations = manifest["operations"]
+            if frozen:
+                spec = load_frozen_spec(spec_file, spec)
+        elif frozen:
+            spec = load_frozen_spec(spec_file)
+        else:
+            import yaml
+
+            with open(spec_file) as f:
+                spec = yaml.safe_load(f)
 
         super().__init__(
             app,
@@ -50,8 +127,20 @@ class SwaggerFile(Swagger):
             swagger_ui_settings=swagger_ui_settings,
             redoc_ui_settings=redoc_ui_settings,
             rapidoc_ui_settings=rapidoc_ui_settings,
+            collect_all_credentials=collect_all_credentials,
+            offload_threshold=offload_threshold,
+            offload_executor=offload_executor,
+            validation_budget=validation_budget,
+            validation_watchdog=validation_watchdog,
+            tracer=tracer,
+            load_compiled_operations=load_compiled_operations,
+            validation_only=validation_only,
+            typed_path_params=typed_path_params,
+            body_last=body_last,
+            validate_expect=validate_expect,
         )
-        self._app[_SWAGGER_SPECIFICATION] = self.spec
+        if not validation_only:
+            self._app[_SWAGGER_SPECIFICATION] = self.spec
 
     def add_route(
         self,
@@ -62,11 +151,14 @@ class SwaggerFile(Swagger):
         name: Optional[str] = None,
         expect_handler: Optional[ExpectHandler] = None,
         validate: Optional[bool] = None,
+        offload_threshold: Optional[int] = None,
     ) -> web.AbstractRoute:
+        self._check_spec_released()
         if validate is None:
             need_validation: bool = self.validate
         else:
             need_validation = False if not self.validate else validate
+        routes: List[SwaggerRoute] = []
         if need_validation and path in self.spec["paths"]:
             if isinstance(handler, type) and issubclass(handler, AbstractView):
                 for meth in hdrs.METH_ALL:
@@ -76,7 +168,8 @@ class SwaggerFile(Swagger):
                     handler_ = getattr(handler, meth, None)
                     if handler_ is None:
                         continue
-                    route = SwaggerRoute(meth, path, handler_, swagger=self)
+                    route = SwaggerRoute(meth, path, handler_, swagger=self, offload_threshold=offload_threshold)
+                    routes.append(route)
                     setattr(
                         handler,
                         meth,
@@ -85,7 +178,11 @@ class SwaggerFile(Swagger):
             else:
                 method_lower = method.lower()
                 if method_lower in self.spec["paths"][path]:
-                    route = SwaggerRoute(method_lower, path, handler, swagger=self)
+                    route = SwaggerRoute(method_lower, path, handler, swagger=self, offload_threshold=offload_threshold)
+                    routes.append(route)
                     handler = functools.partial(_handle_swagger_call, route)
 
+        if expect_handler is None and routes and self.validate_expect:
+            expect_handler = functools.partial(_handle_swagger_expect, {route.method: route for route in routes})
+        path = self._typed_path(path, routes)
         return self._app.router.add_route(method, path, handler, name=name, expect_handler=expect_handler)
@@ -1,28 +1,54 @@
+import asyncio
+import itertools
 import json
+import pickle
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
 from types import FunctionType
-from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, cast
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    MutableMapping,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
 
 import attr
-from aiohttp import web
+from aiohttp import HttpVersion11, hdrs, web
+from aiohttp.web_urldispatcher import _default_expect_handler
 
-from .context import COMPONENTS
-from .swagger import Swagger
-from .validators import MISSING, Validator, ValidatorError, schema_to_validator, security_to_validator
+from .exceptions import RequestValidationFailed
+from .handlers import BODY_DECODERS, REQUEST_BODY_NAME, BodyDecoder, StreamingMediaTypeHandler
+from .swagger import MediaTypeHandler, Swagger
+from .tracing import (
+    ATTR_ERROR_COUNT,
+    ATTR_MEDIA_TYPE,
+    ATTR_METHOD,
+    ATTR_OPERATION_ID,
+    ATTR_ROUTE,
+    SPAN_VALIDATE,
+    Tracer,
+)
+from .validators import MISSING, Array, Validator, ValidatorError, schema_to_validator, security_to_validator
+from .watchdog import describe, slowest_path
 
 _SwaggerHandler = Callable[..., Awaitable[web.StreamResponse]]
+_T = TypeVar("_T")
 
-REQUEST_BODY_NAME: str = "body"
+# key of RequestData of a request whose parameters are validated by the expect handler
+_PARAMETERS_VALIDATED = "AIOHTTP_SWAGGER3_PARAMETERS_VALIDATED"
 
-
-class RequestValidationFailed(web.HTTPBadRequest):
-    """This exception can be caught in a aiohttp middleware.
-
-    :param dict errors: This dict stores validation errors.
-    """
-
-    def __init__(self, errors: Dict, **kwargs: Any) -> None:
-        super().__init__(**kwargs)
-        self.errors = errors
+# upper bound for media types remembered per route after resolving them through wildcards (image/*, */*)
+_MAX_MEDIA_TYPES: int = 64
 
 
 def _get_fn_parameters(fn: _SwaggerHandler) -> Tuple[str, ...]:
@@ -33,11 +59,246 @@ def _get_fn_parameters(fn: _SwaggerHandler) -> Tuple[str, ...]:
     return _get_fn_parameters(func.__closure__[0].cell_contents)
 
 
+def _add_error(errors: Optional[Dict], name: str, error: Any) -> Dict:
+    if errors is None:
+        errors = {}
+    errors[name] = error
+    return errors
+
+
 @attr.attrs(slots=True, auto_attribs=True)
 class Parameter:
     name: str
     validator: Validator
     required: bool
+    # index of the value in RequestData, assigned when all parameters of the route are known
+    slot: int = attr.attrib(default=-1, kw_only=True)
+
+
+class RequestData(MutableMapping[str, Any]):
+    """Validated request data stored in ``request`` under ``request_key``.
+
+    Values of the route parameters are kept in a list by the layout shared by all requests
+    of the route, other values (i.e. credentials) are kept in a dict created on first use.
+    It is not a ``dict``, use ``request["data"].copy()`` to get a copy as a plain dict,
+    i.e. for ``json.dumps``.
+    """
+
+    __slots__ = ("_layout", "_values", "_extra")
+
+    def __init__(self, layout: Dict[str, int]) -> None:
+        self._layout = layout
+        self._values: List[Any] = [MISSING] * len(layout)
+        self._extra: Optional[Dict[str, Any]] = None
+
+    def __getitem__(self, key: str) -> Any:
+        slot = self._layout.get(key)
+        if slot is not None:
+            value = self._values[slot]
+            if value is not MISSING:
+                return value
+        elif self._extra is not None:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        slot = self._layout.get(key)
+        if slot is not None:
+            self._values[slot] = value
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        slot = self._layout.get(key)
+        if slot is not None:
+            if self._values[slot] is MISSING:
+                raise KeyError(key)
+            self._values[slot] = MISSING
+        elif self._extra is not None:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for key, slot in self._layout.items():
+            if self._values[slot] is not MISSING:
+                yield key
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        size = len(self._values) - self._values.count(MISSING)
+        if self._extra is not None:
+            size += len(self._extra)
+        return size
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self)
+
+
+@attr.attrs(slots=True, auto_attribs=True)
+class _Offload:
+    """Decoder and validator of a body validated in an executor, workers look them up by ``key``"""
+
+    key: int
+    decoder: BodyDecoder
+    validator: Validator
+    payload: Optional[bytes] = None
+
+    def pickled(self) -> bytes:
+        if self.payload is None:
+            self.payload = pickle.dumps((self.decoder, self.validator))
+        return self.payload
+
+
+_offload_keys = itertools.count()
+# offloads of routes of this process, threads of an executor and forked workers find them here
+_OFFLOADS: "weakref.WeakValueDictionary[int, _Offload]" = weakref.WeakValueDictionary()
+# decoders and validators a worker process received from the main process
+_RECEIVED: Dict[int, Tuple[BodyDecoder, Validator]] = {}
+
+
+class _NotOffloaded(Exception):
+    """Raised by a worker process that has not received the validator of a key yet"""
+
+
+def _decode_and_validate(key: int, data: bytes, charset: str, payload: Optional[bytes] = None) -> Any:
+    offload = _OFFLOADS.get(key)
+    if offload is not None:
+        decoder, validator = offload.decoder, offload.validator
+    elif key in _RECEIVED:
+        decoder, validator = _RECEIVED[key]
+    elif payload is not None:
+        decoder, validator = _RECEIVED[key] = pickle.loads(payload)
+    else:
+        raise _NotOffloaded(key)
+    value, has_raw = decoder(data, charset)
+    return validator.validate(value, has_raw)
+
+
+@attr.attrs(slots=True, auto_attribs=True)
+class MediaTypeParameter(Parameter):
+    handler: MediaTypeHandler
+    streaming: bool = attr.attrib(init=False)
+    # decoder of the whole body for validation in an executor, only built-in handlers have it
+    decoder: Optional[BodyDecoder] = attr.attrib(init=False)
+    # set if bodies are validated in an executor above offload_threshold
+    offload: Optional[_Offload] = attr.attrib(default=None, init=False)
+
+    @streaming.default
+    def _streaming_default(self) -> bool:
+        return isinstance(self.handler, StreamingMediaTypeHandler)
+
+    @decoder.default
+    def _decoder_default(self) -> Optional[BodyDecoder]:
+        return BODY_DECODERS.get(self.handler)
+
+
+def _query_value(request: web.Request, param: Parameter) -> Any:
+    if param.required:
+        v: Any = request.rel_url.query.getall(param.name)
+    else:
+        v = request.rel_url.query.getall(param.name, MISSING)
+        if v is MISSING:
+            return v
+    return v[0] if len(v) == 1 else v
+
+
+def _header_value(request: web.Request, param: Parameter) -> Any:
+    if param.required:
+        return request.headers.getone(param.name)
+    return request.headers.get(param.name, MISSING)
+
+
+def _path_value(request: web.Request, param: Parameter) -> Any:
+    return request.match_info[param.name]
+
+
+def _cookie_value(request: web.Request, param: Parameter) -> Any:
+    if param.required:
+        return request.cookies[param.name]
+    return request.cookies.get(param.name, MISSING)
+
+
+# phase name -> (SwaggerRoute attribute with parameters, function getting a raw value of a parameter)
+_PARAMETER_PHASES: Dict[str, Tuple[str, Callable[[web.Request, Parameter], Any]]] = {
+    "query": ("qp", _query_value),
+    "header": ("hp", _header_value),
+    "path": ("pp", _path_value),
+    "cookie": ("cp", _cookie_value),
+}
+
+
+def _validate_parameters(
+    params: List[Parameter],
+    get_value: Callable[[web.Request, Parameter], Any],
+    request: web.Request,
+    values: List[Any],
+    errors: Optional[Dict],
+) -> Optional[Dict]:
+    for param in params:
+        try:
+            v = get_value(request, param)
+        except KeyError:
+            errors = _add_error(errors, param.name, "is required")
+            continue
+        try:
+            value = param.validator.validate(v, True)
+        except ValidatorError as e:
+            errors = _add_error(errors, param.name, e.error)
+            continue
+        if value is not MISSING:
+            values[param.slot] = value
+    return errors
+
+
+class _Trace:
+    """State of an instrumented (traced or watched) validation of a request"""
+
+    __slots__ = ("tracer", "span", "body", "waited")
+
+    def __init__(self, tracer: Optional[Tracer]) -> None:
+        self.tracer = tracer
+        # span of the current phase
+        self.span: Any = None
+        # validator, decoded body and raw flag, kept to find the slowest sub-schema
+        self.body: Optional[Tuple[Validator, Any, bool]] = None
+        # seconds of the current phase spent waiting for the body or an executor
+        self.waited = 0.0
+
+    async def wait(self, awaitable: Awaitable[_T]) -> _T:
+        """Awaits reading of the body or an executor, not counted as validation"""
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.waited += time.perf_counter() - start
+
+
+_Phase = Callable[[web.Request, RequestData, Optional[Dict], Optional[_Trace]], Awaitable[Optional[Dict]]]
+
+
+def resolve_parameter(param: Dict, components: Dict) -> Dict:
+    if "$ref" in param:
+        if not components:
+            raise Exception("file with components definitions is missing")
+        # '#/components/parameters/Month'
+        *_, section, obj = param["$ref"].split("/")
+        resolved: Dict = components[section][obj]
+        return resolved
+    return param
+
+
+def media_type_validator(media_type_object: Dict) -> Validator:
+    if "x-ndjson-item" in media_type_object:
+        # schema of a single line of application/x-ndjson body
+        return Array(validator=schema_to_validator(media_type_object["x-ndjson-item"]), uniqueItems=False)
+    return schema_to_validator(media_type_object["schema"])
 
 
 class SwaggerRoute:
@@ -51,12 +312,28 @@ class SwaggerRoute:
         "hp",
         "cp",
         "bp",
+        "bp_wildcards",
         "is_body_required",
         "auth",
         "params",
+        "layout",
+        "kwargs_slots",
+        "offload_threshold",
+        "phases",
+        "parameter_phases",
+        "body_phases",
+        "span_attributes",
     )
 
-    def __init__(self, method: str, path: str, handler: _SwaggerHandler, *, swagger: Swagger) -> None:
+    def __init__(
+        self,
+        method: str,
+        path: str,
+        handler: _SwaggerHandler,
+        *,
+        swagger: Swagger,
+        offload_threshold: Optional[int] = None,
+    ) -> None:
         self.method = method
         self.path = path
         self.handler = handler
@@ -64,9 +341,11 @@ class SwaggerRoute:
         self.pp: List[Parameter] = []
         self.hp: List[Parameter] = []
         self.cp: List[Parameter] = []
-        self.bp: Dict[str, Parameter] = {}
+        self.bp: Dict[str, MediaTypeParameter] = {}
+        self.bp_wildcards = 0
         self.auth: Optional[Parameter] = None
         self._swagger = swagger
+        self.offload_threshold = swagger.offload_threshold if offload_threshold is None else offload_threshold
         method_section = self._swagger.spec["paths"][path][method]
         parameters = method_section.get("parameters")
         body = method_section.get("requestBody")
@@ -74,178 +353,382 @@ class SwaggerRoute:
         method_security = method_section.get("security")
         security = method_security if method_security is not None else self._swagger.spec.get("security", [])
         components = self._swagger.spec.get("components", {})
-        COMPONENTS.set(components)
-        if security:
-            parameter = Parameter("", security_to_validator(security), True)
-            self.auth = parameter
-        if parameters is not None:
-            for param in parameters:
-                if "$ref" in param:
-                    if not components:
-                        raise Exception("file with components definitions is missing")
-                    # '#/components/parameters/Month'
-                    *_, section, obj = param["$ref"].split("/")
-                    param = components[section][obj]
-                parameter = Parameter(
-                    param["name"],
-                    schema_to_validator(param["schema"]),
-                    param.get("required", False),
-                )
-                if param["in"] == "query":
-                    self.qp.append(parameter)
-                elif param["in"] == "path":
-                    self.pp.append(parameter)
-                elif param["in"] == "header":
-                    parameter.name = parameter.name.lower()
-                    self.hp.append(parameter)
-                elif param["in"] == "cookie":
-                    self.cp.append(parameter)
-
-        if body is not None:
-            for media_type, value in body["content"].items():
-                # check that we have handler for media_type
-                self._swagger._get_media_type_handler(media_type)
-                value = body["content"][media_type]
-                self.bp[media_type] = Parameter(
-                    REQUEST_BODY_NAME,
-                    schema_to_validator(value["schema"]),
-                    body.get("required", False),
+        with swagger._building_validators():
+            if security:
+                auth_validator = security_to_validator(
+                    security,
+                    collect_all=self._swagger.collect_all_credentials,
+                    verifiers=self._swagger.security_verifiers,
                 )
+                parameter = Parameter("", auth_validator, True)
+                self.auth = parameter
+            compiled = swagger._compiled_operation(method, path)
+            if parameters is not None:
+                for i, param in enumerate(parameters):
+                    param = resolve_parameter(param, components)
+                    parameter = Parameter(
+                        param["name"],
+                        schema_to_validator(param["schema"]) if compiled is None else compiled["parameters"][i],
+                        param.get("required", False),
+                    )
+                    if param["in"] == "query":
+                        self.qp.append(parameter)
+                    elif param["in"] == "path":
+                        self.pp.append(parameter)
+                    elif param["in"] == "header":
+                        parameter.name = parameter.name.lower()
+                        self.hp.append(parameter)
+                    elif param["in"] == "cookie":
+                        self.cp.append(parameter)
+
+            if body is not None:
+                for media_type, value in body["content"].items():
+                    media_type = media_type.lower()
+                    body_param = MediaTypeParameter(
+                        REQUEST_BODY_NAME,
+                        media_type_validator(value) if compiled is None else compiled["body"][media_type],
+                        body.get("required", False),
+                        self._swagger._get_media_type_handler(media_type),
+                    )
+                    if body_param.streaming:
+                        cast(StreamingMediaTypeHandler, body_param.handler).check_schema(body_param.validator)
+                    elif self.offload_threshold is not None and body_param.decoder is not None:
+                        body_param.offload = self._offload(media_type, body_param.decoder, body_param.validator)
+                    self.bp[media_type] = body_param
+                self.bp_wildcards = sum(media_type.endswith("/*") for media_type in self.bp)
         self.params = set(_get_fn_parameters(self.handler))
+        # every parameter name gets a slot in RequestData, the same name in different
+        # locations shares the slot, the value validated last wins
+        self.layout: Dict[str, int] = {}
+        for parameter in chain(self.qp, self.pp, self.hp, self.cp, self.bp.values()):
+            parameter.slot = self.layout.setdefault(parameter.name, len(self.layout))
+        self.kwargs_slots = tuple((name, slot) for name, slot in self.layout.items() if name in self.params)
+        # order of validation, authorization goes first and fails fast
+        phases: List[Tuple[str, _Phase]] = []
+        if self.auth:
+            phases.append(("auth", self._parse_auth))
+        if self.qp:
+            phases.append(("query", self._parse_query))
+        if self.bp and not swagger.body_last:
+            phases.append(("body", self._parse_body))
+        if self.hp:
+            phases.append(("header", self._parse_headers))
+        if self.pp:
+            phases.append(("path", self._parse_path))
+        if self.cp:
+            phases.append(("cookie", self._parse_cookies))
+        if self.bp and swagger.body_last:
+            phases.append(("body", self._parse_body_if_valid))
+        self.phases: Tuple[Tuple[str, _Phase], ...] = tuple(phases)
+        # phases of the expect handler and the rest of them after the body is sent
+        self.parameter_phases = tuple(phase for phase in phases if phase[0] != "body")
+        self.body_phases = tuple(phase for phase in phases if phase[0] == "body")
+        self.span_attributes: Dict[str, Any] = {
+            ATTR_OPERATION_ID: method_section.get("operationId", ""),
+            ATTR_ROUTE: path,
+            ATTR_METHOD: method.upper(),
+        }
+
+    def _resolve_media_type(self, media_type: str) -> Optional[MediaTypeParameter]:
+        # exact media types are looked up directly in self.bp, here only wildcards
+        # are left, a resolved media type is remembered to skip this on the next request
+        typ, _, _ = media_type.partition("/")
+        param = self.bp.get(f"{typ}/*") or self.bp.get("*/*")
+        if param is not None and len(self.bp) < _MAX_MEDIA_TYPES:
+            self.bp[media_type] = param
+        return param
+
+    async def _validate_body(self, validator: Validator, value: Any, raw: bool) -> Any:
+        budget = self._swagger.validation_budget
+        if budget is None or not validator.cooperative:
+            return validator.validate(value, raw)
+        return await validator.validate_async(value, raw, budget.start())
+
+    def _offload(self, media_type: str, decoder: BodyDecoder, validator: Validator) -> _Offload:
+        offload = _Offload(next(_offload_keys), decoder, validator)
+        _OFFLOADS[offload.key] = offload
+        if isinstance(self._swagger.offload_executor, ProcessPoolExecutor):
+            # fail now rather than on every offloaded request
+            try:
+                offload.pickled()
+            except (pickle.PicklingError, AttributeError, TypeError) as e:
+                raise Exception(f"validator of {media_type} body cannot be sent to offload_executor: {e}")
+        return offload
+
+    async def _decode_body(self, request: web.Request, offload: _Offload, trace: Optional[_Trace]) -> Any:
+        data = await (request.read() if trace is None else trace.wait(request.read()))
+        charset = request.charset or "utf-8"
+        if len(data) <= cast(int, self.offload_threshold):
+            value, has_raw = offload.decoder(data, charset)
+            return await self._validate_body(offload.validator, value, has_raw)
+        # only the key is sent, the validator is sent once to every worker process missing it
+        loop = asyncio.get_running_loop()
+        executor = self._swagger.offload_executor
+        try:
+            future = loop.run_in_executor(executor, _decode_and_validate, offload.key, data, charset)
+            return await (future if trace is None else trace.wait(future))
+        except _NotOffloaded:
+            future = loop.run_in_executor(executor, _decode_and_validate, offload.key, data, charset, offload.pickled())
+            return await (future if trace is None else trace.wait(future))
 
     async def parse(self, request: web.Request) -> Dict:
-        params: Dict = {}
-        if "request" in self.params:
-            params["request"] = request
-        request_key = self._swagger.request_key
-        request[request_key] = {}
-        errors: Dict = {}
-        # check auth
-        if self.auth:
+        data = request.get(_PARAMETERS_VALIDATED)
+        if data is None:
+            data = RequestData(self.layout)
+            phases = self.phases
+        else:
+            # parameters are validated by the expect handler
+            phases = self.body_phases
+        request[self._swagger.request_key] = data
+        errors: Optional[Dict] = None
+        if self._swagger.validation_watchdog is None and self._swagger.tracer is None:
+            for _, phase in phases:
+                errors = await phase(request, data, errors, None)
+        else:
+            errors = await self._parse_instrumented(request, data, phases)
+
+        if errors:
+            raise RequestValidationFailed(reason=json.dumps(errors), errors=errors)
+        values = data._values
+        params: Dict = {"request": request} if "request" in self.params else {}
+        for name, slot in self.kwargs_slots:
+            value = values[slot]
+            if value is not MISSING:
+                params[name] = value
+        return params
+
+    async def expect(self, request: web.Request) -> None:
+        """Expect handler of the route: parameters, ``Content-Type`` and ``Content-Length``
+        of a request with ``Expect: 100-continue`` are validated before the client is told
+        to send the body"""
+        expect = request.headers.get(hdrs.EXPECT, "")
+        if request.version == HttpVersion11 and expect.lower() == "100-continue":
+            data = RequestData(self.layout)
+            errors: Optional[Dict] = None
+            for _, phase in self.parameter_phases:
+                errors = await phase(request, data, errors, None)
+            if self.bp and request.body_exists:
+                errors = self._check_body_metadata(request, errors)
+            if errors:
+                raise RequestValidationFailed(reason=json.dumps(errors), errors=errors)
+            request[_PARAMETERS_VALIDATED] = data
+        await _default_expect_handler(request)
+
+    def _check_body_metadata(self, request: web.Request, errors: Optional[Dict]) -> Optional[Dict]:
+        if "Content-Type" not in request.headers:
+            if next(iter(self.bp.values())).required:
+                errors = _add_error(errors, REQUEST_BODY_NAME, "is required")
+            return errors
+        media_type = request.content_type
+        body_param = self._find_body_parameter(media_type)
+        if body_param is None:
+            return _add_error(errors, REQUEST_BODY_NAME, f"no handler for {media_type}")
+        if body_param.streaming:
+            # streaming handlers are not limited by client_max_size of the application
             try:
-                values = self.auth.validator.validate(request, True)
+                cast(StreamingMediaTypeHandler, body_param.handler).check_metadata(request, body_param.validator)
             except ValidatorError as e:
-                if isinstance(e.error, str):
-                    errors["authorization"] = e.error
-                else:
-                    errors = e.error
-                raise RequestValidationFailed(reason=json.dumps(errors), errors=errors)
+                return _add_error(errors, REQUEST_BODY_NAME, e.error)
+            return errors
+        # only built-in handlers are known to read the whole body, custom ones may stream it
+        size = request.content_length
+        if body_param.decoder is not None and size is not None and size > request.client_max_size:
+            raise web.HTTPRequestEntityTooLarge(max_size=request.client_max_size, actual_size=size)
+        return errors
 
-            for key, value in values.items():
-                request[request_key][key] = value
+    def _find_body_parameter(self, media_type: str) -> Optional[MediaTypeParameter]:
+        body_param = self.bp.get(media_type)
+        if body_param is None and self.bp_wildcards:
+            body_param = self._resolve_media_type(media_type)
+        return body_param
 
-        # query parameters
-        if self.qp:
-            for param in self.qp:
-                if param.required:
-                    try:
-                        v: Any = request.rel_url.query.getall(param.name)
-                    except KeyError:
-                        errors[param.name] = "is required"
-                        continue
-                    if len(v) == 1:
-                        v = v[0]
-                else:
-                    v = request.rel_url.query.getall(param.name, MISSING)
-                    if v != MISSING and len(v) == 1:
-                        v = v[0]
-                try:
-                    value = param.validator.validate(v, True)
-                except ValidatorError as e:
-                    errors[param.name] = e.error
-                    continue
-                if value != MISSING:
-                    request[request_key][param.name] = value
-                    if param.name in self.params:
-                        params[param.name] = value
-        # body parameters
-        if self.bp:
-            if request.body_exists:
-                if "Content-Type" not in request.headers:
-                    if next(iter(self.bp.values())).required:
-                        errors[REQUEST_BODY_NAME] = "is required"
+    async def _parse_auth(
+        self, request: web.Request, data: RequestData, errors: Optional[Dict], trace: Optional[_Trace]
+    ) -> Optional[Dict]:
+        auth = cast(Parameter, self.auth)
+        try:
+            if self._swagger.security_verifiers:
+                credentials = await getattr(auth.validator, "authenticate")(request)
+            else:
+                credentials = auth.validator.validate(request, True)
+        except ValidatorError as e:
+            if isinstance(e.error, str):
+                errors = {"authorization": e.error}
+            else:
+                errors = e.error
+            raise RequestValidationFailed(reason=json.dumps(errors), errors=errors)
+
+        for key, value in credentials.items():
+            data[key] = value
+        return errors
+
+    async def _parse_query(
+        self, request: web.Request, data: RequestData, errors: Optional[Dict], trace: Optional[_Trace]
+    ) -> Optional[Dict]:
+        return _validate_parameters(self.qp, _query_value, request, data._values, errors)
+
+    async def _parse_body_if_valid(
+        self, request: web.Request, data: RequestData, errors: Optional[Dict], trace: Optional[_Trace]
+    ) -> Optional[Dict]:
+        # the body is not read when parameters are invalid
+        if errors:
+            return errors
+        return await self._parse_body(request, data, errors, trace)
+
+    async def _parse_body(
+        self, request: web.Request, data: RequestData, errors: Optional[Dict], trace: Optional[_Trace]
+    ) -> Optional[Dict]:
+        values = data._values
+        if request.body_exists:
+            if "Content-Type" not in request.headers:
+                if next(iter(self.bp.values())).required:
+                    errors = _add_error(errors, REQUEST_BODY_NAME, "is required")
+                return errors
+            media_type = request.content_type
+            body_param = self._find_body_parameter(media_type)
+            if body_param is None:
+                return _add_error(errors, REQUEST_BODY_NAME, f"no handler for {media_type}")
+            try:
+                if body_param.streaming:
+                    streamed = body_param.handler(request, body_param.validator)  # type: ignore
+                    # the body is validated while it is read, it is not timed
+                    value = await (streamed if trace is None else trace.wait(streamed))
+                elif body_param.offload is not None:
+                    value = await self._decode_body(request, body_param.offload, trace)
+                elif trace is None:
+                    v, has_raw = await body_param.handler(request)  # type: ignore
+                    value = await self._validate_body(body_param.validator, v, has_raw)
                 else:
-                    media_type = request.content_type
-                    if media_type not in self.bp:
-                        errors[REQUEST_BODY_NAME] = f"no handler for {media_type}"
-                    else:
-                        handler = self._swagger._get_media_type_handler(media_type)
-                        param = self.bp[media_type]
-                        try:
-                            v, has_raw = await handler(request)
-                        except ValidatorError as e:
-                            errors[param.name] = e.error
-                        else:
-                            try:
-                                value = param.validator.validate(v, has_raw)
-                            except ValidatorError as e:
-                                errors[param.name] = e.error
-                            else:
-                                request[request_key][param.name] = value
-                                if param.name in self.params:
-                                    params[param.name] = value
-
-            elif self.is_body_required:
-                errors[REQUEST_BODY_NAME] = "is required"
+                    value = await self._parse_body_traced(request, body_param, trace)
+            except ValidatorError as e:
+                errors = _add_error(errors, body_param.name, e.error)
+            else:
+                values[body_param.slot] = value
+
+        elif self.is_body_required:
+            errors = _add_error(errors, REQUEST_BODY_NAME, "is required")
+
+        else:
+            values[self.layout[REQUEST_BODY_NAME]] = None
+        return errors
+
+    async def _parse_headers(
+        self, request: web.Request, data: RequestData, errors: Optional[Dict], trace: Optional[_Trace]
+    ) -> Optional[Dict]:
+        return _validate_parameters(self.hp, _header_value, request, data._values, errors)
+
+    async def _parse_path(
+        self, request: web.Request, data: RequestData, errors: Optional[Dict], trace: Optional[_Trace]
+    ) -> Optional[Dict]:
+        return _validate_parameters(self.pp, _path_value, request, data._values, errors)
 
+    async def _parse_cookies(
+        self, request: web.Request, data: RequestData, errors: Optional[Dict], trace: Optional[_Trace]
+    ) -> Optional[Dict]:
+        return _validate_parameters(self.cp, _cookie_value, request, data._values, errors)
+
+    async def _parse_body_traced(self, request: web.Request, body_param: MediaTypeParameter, trace: _Trace) -> Any:
+        if body_param.decoder is not None:
+            # built-in handlers decode the body read here, reading is not validation
+            await trace.wait(request.read())
+        tracer = trace.tracer
+        span = None
+        if tracer is not None:
+            attributes = {**self.span_attributes, ATTR_MEDIA_TYPE: request.content_type}
+            span = tracer.start_span(f"{SPAN_VALIDATE}.body.decode", attributes, trace.span)
+        try:
+            if body_param.decoder is not None:
+                v, has_raw = await body_param.handler(request)  # type: ignore
             else:
-                request[request_key][REQUEST_BODY_NAME] = None
-                if REQUEST_BODY_NAME in self.params:
-                    params[REQUEST_BODY_NAME] = None
+                # a custom handler reads and decodes the body at once, it is not timed
+                v, has_raw = await trace.wait(body_param.handler(request))  # type: ignore
+        except ValidatorError:
+            if tracer is not None:
+                tracer.end_span(span, {ATTR_ERROR_COUNT: 1})
+            raise
+        if tracer is not None:
+            tracer.end_span(span, {ATTR_ERROR_COUNT: 0})
+            span = tracer.start_span(f"{SPAN_VALIDATE}.body.schema", self.span_attributes, trace.span)
+        trace.body = (body_param.validator, v, has_raw)
+        try:
+            value = await self._validate_body(body_param.validator, v, has_raw)
+        except ValidatorError:
+            if tracer is not None:
+                tracer.end_span(span, {ATTR_ERROR_COUNT: 1})
+            raise
+        if tracer is not None:
+            tracer.end_span(span, {ATTR_ERROR_COUNT: 0})
+        return value
 
-        # header parameters
-        if self.hp:
-            for param in self.hp:
-                if param.required:
-                    try:
-                        v = request.headers.getone(param.name)
-                    except KeyError:
-                        errors[param.name] = "is required"
-                        continue
-                else:
-                    v = request.headers.get(param.name, MISSING)
+    async def _parse_instrumented(
+        self, request: web.Request, data: RequestData, phases: Tuple[Tuple[str, _Phase], ...]
+    ) -> Optional[Dict]:
+        watchdog = self._swagger.validation_watchdog
+        tracer = self._swagger.tracer
+        errors: Optional[Dict] = None
+        durations: List[Tuple[str, float]] = []
+        root = None if tracer is None else tracer.start_span(SPAN_VALIDATE, self.span_attributes)
+        trace = _Trace(tracer)
+        try:
+            for name, phase in phases:
+                errors_before = len(errors) if errors else 0
+                error_count = 0
+                if tracer is not None:
+                    trace.span = tracer.start_span(f"{SPAN_VALIDATE}.{name}", self.span_attributes, root)
+                trace.waited = 0.0
+                start = time.perf_counter()
                 try:
-                    value = param.validator.validate(v, True)
-                except ValidatorError as e:
-                    errors[param.name] = e.error
-                    continue
-                if value != MISSING:
-                    request[request_key][param.name] = value
-                    if param.name in self.params:
-                        params[param.name] = value
-        # path parameters
-        if self.pp:
-            for param in self.pp:
-                v = request.match_info[param.name]
-                try:
-                    value = param.validator.validate(v, True)
-                except ValidatorError as e:
-                    errors[param.name] = e.error
-                    continue
-                request[request_key][param.name] = value
-                if param.name in self.params:
-                    params[param.name] = value
-        # cookie parameters
-        if self.cp:
-            for param in self.cp:
-                if param.required:
-                    try:
-                        v = request.cookies[param.name]
-                    except KeyError:
-                        errors[param.name] = "is required"
-                        continue
-                else:
-                    v = request.cookies.get(param.name, MISSING)
+                    errors = await phase(request, data, errors, trace)
+                    error_count = (len(errors) if errors else 0) - errors_before
+                except RequestValidationFailed as e:
+                    errors = e.errors
+                    error_count = len(errors)
+                    raise
+                finally:
+                    durations.append((name, time.perf_counter() - start - trace.waited))
+                    if tracer is not None:
+                        tracer.end_span(trace.span, {ATTR_ERROR_COUNT: error_count})
+        finally:
+            if tracer is not None:
+                tracer.end_span(root, {ATTR_ERROR_COUNT: len(errors) if errors else 0})
+            if watchdog is not None:
+                duration = sum(d for _, d in durations)
+                if watchdog.should_report(duration):
+                    watchdog.report(self._slow_validation_report(request, duration, durations, trace))
+        return errors
+
+    def _slow_validation_report(
+        self, request: web.Request, duration: float, durations: List[Tuple[str, float]], trace: _Trace
+    ) -> Dict[str, Any]:
+        phase, phase_duration = max(durations, key=lambda d: d[1])
+        path: List[Union[str, int]] = [phase]
+        validator: Optional[Validator] = None
+        if phase == "body":
+            if trace.body is not None:
+                validator, value, raw = trace.body
+                sub_path, validator = slowest_path(validator, value, raw)
+                path.extend(sub_path)
+        elif phase in _PARAMETER_PHASES:
+            attr_name, get_value = _PARAMETER_PHASES[phase]
+            slowest = -1.0
+            for param in getattr(self, attr_name):
                 try:
-                    value = param.validator.validate(v, True)
-                except ValidatorError as e:
-                    errors[param.name] = e.error
+                    value = get_value(request, param)
+                except KeyError:
                     continue
-                if value != MISSING:
-                    request[request_key][param.name] = value
-                    if param.name in self.params:
-                        params[param.name] = value
-
-        if errors:
-            raise RequestValidationFailed(reason=json.dumps(errors), errors=errors)
-        return params
+                start = time.perf_counter()
+                sub_path, sub_validator = slowest_path(param.validator, value, True)
+                elapsed = time.perf_counter() - start
+                if elapsed > slowest:
+                    slowest = elapsed
+                    path = [phase, param.name, *sub_path]
+                    validator = sub_validator
+        return {
+            "operation": f"{self.method.upper()} {self.path}",
+            "duration": duration,
+            "phase": phase,
+            "phase_duration": phase_duration,
+            "body_size": request.content_length,
+            "path": "/".join(str(p) for p in path),
+            "validator": "" if validator is None else describe(validator),
+        }
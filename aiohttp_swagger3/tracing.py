@@ -0,0 +1,62 @@
+import abc
+from typing import Any, Dict, Optional
+
+SPAN_VALIDATE = "openapi.validate"
+ATTR_OPERATION_ID = "openapi.operation_id"
+ATTR_ROUTE = "http.route"
+ATTR_METHOD = "http.request.method"
+ATTR_MEDIA_TYPE = "openapi.media_type"
+ATTR_ERROR_COUNT = "openapi.validation.error_count"
+
+
+class Tracer(abc.ABC):
+    """Receives spans of request validation: ``openapi.validate`` for the whole validation
+    and ``openapi.validate.<phase>`` for ``auth``, ``query``, ``body``, ``header``, ``path``
+    and ``cookie``, a body span has ``openapi.validate.body.decode`` and
+    ``openapi.validate.body.schema`` children unless the body is streamed or offloaded.
+
+    Spans are started with ``openapi.operation_id``, ``http.route`` and ``http.request.method``
+    attributes and ended with ``openapi.validation.error_count``.
+    """
+
+    __slots__ = ()
+
+    @abc.abstractmethod
+    def start_span(self, name: str, attributes: Dict[str, Any], parent: Optional[Any] = None) -> Any:
+        """Starts a span, ``parent`` is a span returned by a previous call or ``None``"""
+
+    @abc.abstractmethod
+    def end_span(self, span: Any, attributes: Dict[str, Any]) -> None:
+        """Ends a span returned by :meth:`start_span`"""
+
+
+class OpenTelemetryTracer(Tracer):
+    """:class:`Tracer` creating OpenTelemetry spans, requires ``opentelemetry-api``.
+
+    Spans without a parent are children of the current span, i.e. a span of aiohttp server
+    instrumentation, so validation is shown separately from the handler.
+
+    :param tracer: ``opentelemetry.trace.Tracer``, default is the tracer of the global provider
+    """
+
+    __slots__ = ("_tracer", "_set_span_in_context", "_error")
+
+    def __init__(self, tracer: Optional[Any] = None) -> None:
+        try:
+            from opentelemetry import trace
+            from opentelemetry.trace import Status, StatusCode
+        except ImportError:  # pragma: no cover
+            raise Exception("opentelemetry-api is required for OpenTelemetryTracer")
+        self._tracer = tracer or trace.get_tracer("aiohttp_swagger3")
+        self._set_span_in_context = trace.set_span_in_context
+        self._error = Status(StatusCode.ERROR)
+
+    def start_span(self, name: str, attributes: Dict[str, Any], parent: Optional[Any] = None) -> Any:
+        context = None if parent is None else self._set_span_in_context(parent)
+        return self._tracer.start_span(name, context=context, attributes=attributes)
+
+    def end_span(self, span: Any, attributes: Dict[str, Any]) -> None:
+        span.set_attributes(attributes)
+        if attributes.get(ATTR_ERROR_COUNT):
+            span.set_status(self._error)
+        span.end()
@@ -1,13 +1,16 @@
+import asyncio
 import enum
 import operator
 import re
-from typing import Any, Dict, List, Optional, Pattern, Set, Type, Union
+import time
+from typing import Any, Callable, ClassVar, Dict, FrozenSet, List, Optional, Pattern, Set, Tuple, Type, Union, cast
 
 import attr
 from aiohttp import web
 
 from .context import COMPONENTS, STRING_FORMATS
 from .exceptions import DiscriminatorValidationError, ValidatorError
+from .verifiers import CredentialVerifier
 
 
 class _MissingType:
@@ -23,11 +26,70 @@ class DiscriminatorObject:
     mapping: Dict[str, str]
 
 
+class BudgetCounter:
+    """Counts validated nodes of one value, see :class:`ValidationBudget`."""
+
+    __slots__ = ("_items", "_seconds", "_count", "_deadline")
+
+    def __init__(self, items: Optional[int], seconds: Optional[float]) -> None:
+        self._items = items
+        self._seconds = seconds
+        self._count = 0
+        self._deadline = 0.0 if seconds is None else time.perf_counter() + seconds
+
+    def spend(self) -> bool:
+        """Returns ``True`` if the slice is exhausted and the validation should yield to the event loop."""
+        self._count += 1
+        if self._items is not None and self._count >= self._items:
+            self._count = 0
+            return True
+        if self._seconds is not None:
+            now = time.perf_counter()
+            if now >= self._deadline:
+                self._deadline = now + self._seconds
+                return True
+        return False
+
+    async def pause(self) -> None:
+        await asyncio.sleep(0)
+        if self._seconds is not None:
+            self._deadline = time.perf_counter() + self._seconds
+
+
+@attr.attrs(slots=True, frozen=True, auto_attribs=True, kw_only=True)
+class ValidationBudget:
+    """Slice of cooperative validation of a request body.
+
+    Arrays and objects of the body are validated in slices of ``items`` validated
+    items and properties or ``microseconds``, between slices the validation yields
+    to the event loop, so a huge body does not block other requests.
+
+    :param int items: number of validated items and properties in a slice (optional)
+    :param int microseconds: duration of a slice (optional)
+    """
+
+    items: Optional[int] = None
+    microseconds: Optional[int] = None
+
+    def __attrs_post_init__(self) -> None:
+        if self.items is None and self.microseconds is None:
+            raise Exception("items or microseconds of ValidationBudget must be set")
+
+    def start(self) -> BudgetCounter:
+        return BudgetCounter(self.items, None if self.microseconds is None else self.microseconds / 1_000_000)
+
+
 @attr.attrs(slots=True, frozen=True, auto_attribs=True)
 class Validator:
+    # True if validate_async validates the value in slices
+    cooperative: ClassVar[bool] = False
+
     def validate(self, value: Any, raw: bool) -> Any:
         raise NotImplementedError
 
+    async def validate_async(self, value: Any, raw: bool, budget: BudgetCounter) -> Any:
+        return self.validate(value, raw)
+
 
 class IntegerFormat(enum.Enum):
     Int32 = "int32"
@@ -46,7 +108,7 @@ class Integer(Validator):
     maximum: Optional[int] = None
     exclusiveMinimum: bool = False
     exclusiveMaximum: bool = False
-    enum: Optional[List[int]] = None
+    enum: Optional[List[int]] = attr.attrib(default=None, converter=attr.converters.optional(list))
     nullable: bool = False
     readOnly: bool = False
     default: Optional[int] = None
@@ -104,7 +166,7 @@ class Number(Validator):
     maximum: Optional[float] = None
     exclusiveMinimum: bool = False
     exclusiveMaximum: bool = False
-    enum: Optional[List[float]] = None
+    enum: Optional[List[float]] = attr.attrib(default=None, converter=attr.converters.optional(list))
     nullable: bool = False
     readOnly: bool = False
     default: Optional[float] = None
@@ -169,16 +231,25 @@ class String(Validator):
     format: Optional[str] = None
     minLength: Optional[int] = None
     maxLength: Optional[int] = None
-    enum: Optional[List[str]] = None
+    enum: Optional[List[str]] = attr.attrib(default=None, converter=attr.converters.optional(list))
     nullable: bool = False
     readOnly: bool = False
     default: Optional[str] = None
     enum_set: Optional[Set[str]] = attr.attrib(init=False)
+    format_validator: Optional[Callable[[str], None]] = attr.attrib(init=False)
 
     @enum_set.default
     def _enum_set_default(self) -> Optional[Set[str]]:
         return None if self.enum is None else set(self.enum)
 
+    @format_validator.default
+    def _format_validator_default(self) -> Optional[Callable[[str], None]]:
+        # string formats of the Swagger instance building this validator
+        string_formats = STRING_FORMATS.get()
+        if self.format is None or string_formats is None:
+            return None
+        return string_formats.get(self.format)
+
     def validate(
         self, raw_value: Union[None, str, bytes, _MissingType], raw: bool
     ) -> Union[None, str, bytes, _MissingType]:
@@ -205,10 +276,8 @@ class String(Validator):
         if self.enum_set is not None and value not in self.enum_set:
             raise ValidatorError(f"value should be one of {self.enum}")
 
-        if self.format is not None:
-            string_formats = STRING_FORMATS.get()
-            if isinstance(value, str) and self.format in string_formats:
-                string_formats[self.format](value)
+        if self.format_validator is not None and isinstance(value, str):
+            self.format_validator(value)
 
         if self.pattern and not self.pattern.search(value):
             raise ValidatorError(f"value should match regex pattern '{self.pattern.pattern}'")
@@ -259,6 +328,8 @@ class Array(Validator):
     nullable: bool = False
     readOnly: bool = False
 
+    cooperative: ClassVar[bool] = True
+
     def validate(self, raw_value: Union[None, str, List, _MissingType], raw: bool) -> Union[None, List, _MissingType]:
         is_missing = isinstance(raw_value, _MissingType)
         if not is_missing and self.readOnly:
@@ -293,13 +364,36 @@ class Array(Validator):
         else:
             raise ValidatorError("value should be type of list")
 
+        self._check_items(items)
+        return items
+
+    async def validate_async(
+        self, raw_value: Union[None, str, List, _MissingType], raw: bool, budget: BudgetCounter
+    ) -> Union[None, List, _MissingType]:
+        if not isinstance(raw_value, list) or self.readOnly:
+            return self.validate(raw_value, raw)
+        items = []
+        validator = self.validator
+        for index, value in enumerate(raw_value):
+            try:
+                if validator.cooperative:
+                    items.append(await validator.validate_async(value, raw, budget))
+                else:
+                    items.append(validator.validate(value, raw))
+            except ValidatorError as e:
+                raise ValidatorError({index: e.error})
+            if budget.spend():
+                await budget.pause()
+        self._check_items(items)
+        return items
+
+    def _check_items(self, items: List) -> None:
         if self.minItems is not None and len(items) < self.minItems:
             raise ValidatorError(f"number or items must be more than {self.minItems}")
         if self.maxItems is not None and len(items) > self.maxItems:
             raise ValidatorError(f"number or items must be less than {self.maxItems}")
         if self.uniqueItems and len(items) != len(set(items)):
             raise ValidatorError("all items must be unique")
-        return items
 
 
 def to_discriminator(data: Optional[Dict]) -> Optional[DiscriminatorObject]:
@@ -318,54 +412,129 @@ class Object(Validator):
     nullable: bool = False
     readOnly: bool = False
 
+    cooperative: ClassVar[bool] = True
+
     def validate(self, raw_value: Union[None, Dict, _MissingType], raw: bool) -> Union[None, Dict, _MissingType]:
+        if not self._is_dict(raw_value):
+            return raw_value
+        raw_value = cast(Dict, raw_value)
+        self._check_required(raw_value)
+        # the value is copied only if a property is changed by its validator (i.e. default)
+        value = raw_value
+        errors: Optional[Dict] = None
+        for name, validator in self.properties.items():
+            prop = raw_value.get(name, MISSING)
+            try:
+                val = validator.validate(prop, raw)
+            except ValidatorError as e:
+                if errors is None:
+                    errors = {}
+                errors[name] = e.error
+                continue
+            if val is not prop:
+                if value is raw_value:
+                    value = dict(raw_value)
+                value[name] = val
+        if errors:
+            raise ValidatorError(errors)
+
+        if isinstance(self.additionalProperties, bool):
+            self._check_additional_properties(raw_value)
+        else:
+            for name in raw_value.keys() - self.properties.keys():
+                prop = raw_value[name]
+                val = self.additionalProperties.validate(prop, raw)
+                if val is not prop:
+                    if value is raw_value:
+                        value = dict(raw_value)
+                    value[name] = val
+        self._check_size(value)
+        return value
+
+    async def validate_async(
+        self, raw_value: Union[None, Dict, _MissingType], raw: bool, budget: BudgetCounter
+    ) -> Union[None, Dict, _MissingType]:
+        if not self._is_dict(raw_value):
+            return raw_value
+        raw_value = cast(Dict, raw_value)
+        self._check_required(raw_value)
+        value = raw_value
+        errors: Optional[Dict] = None
+        for name, validator in self.properties.items():
+            prop = raw_value.get(name, MISSING)
+            try:
+                if validator.cooperative:
+                    val = await validator.validate_async(prop, raw, budget)
+                else:
+                    val = validator.validate(prop, raw)
+            except ValidatorError as e:
+                if errors is None:
+                    errors = {}
+                errors[name] = e.error
+                continue
+            if val is not prop:
+                if value is raw_value:
+                    value = dict(raw_value)
+                value[name] = val
+            if budget.spend():
+                await budget.pause()
+        if errors:
+            raise ValidatorError(errors)
+
+        if isinstance(self.additionalProperties, bool):
+            self._check_additional_properties(raw_value)
+        else:
+            validator = self.additionalProperties
+            for name in raw_value.keys() - self.properties.keys():
+                prop = raw_value[name]
+                if validator.cooperative:
+                    val = await validator.validate_async(prop, raw, budget)
+                else:
+                    val = validator.validate(prop, raw)
+                if val is not prop:
+                    if value is raw_value:
+                        value = dict(raw_value)
+                    value[name] = val
+                if budget.spend():
+                    await budget.pause()
+        self._check_size(value)
+        return value
+
+    def _is_dict(self, raw_value: Union[None, Dict, _MissingType]) -> bool:
         is_missing = isinstance(raw_value, _MissingType)
         if not is_missing and self.readOnly:
             raise ValidatorError("property is read-only")
         if raw_value is None:
             if self.nullable:
-                return None
+                return False
             raise ValidatorError("value should be type of dict")
         if not isinstance(raw_value, dict):
             if is_missing:
-                return raw_value
+                return False
             raise ValidatorError("value should be type of dict")
-        value = {}
-        errors: Dict = {}
+        return True
+
+    def _check_required(self, raw_value: Dict) -> None:
+        errors: Optional[Dict] = None
         for name in self.required:
             if name not in raw_value:
+                if errors is None:
+                    errors = {}
                 errors[name] = "required property"
         if errors:
             raise ValidatorError(errors)
 
-        for name, validator in self.properties.items():
-            prop = raw_value.get(name, MISSING)
-            try:
-                val = validator.validate(prop, raw)
-                if val != MISSING:
-                    value[name] = val
-            except ValidatorError as e:
-                errors[name] = e.error
-        if errors:
-            raise ValidatorError(errors)
+    def _check_additional_properties(self, raw_value: Dict) -> None:
+        if not self.additionalProperties:
+            additional_properties = raw_value.keys() - self.properties.keys()
+            if additional_properties:
+                raise ValidatorError({k: "additional property not allowed" for k in additional_properties})
 
-        if isinstance(self.additionalProperties, bool):
-            if not self.additionalProperties:
-                additional_properties = raw_value.keys() - value.keys()
-                if additional_properties:
-                    raise ValidatorError({k: "additional property not allowed" for k in additional_properties})
-            else:
-                for key in raw_value.keys() - value.keys():
-                    value[key] = raw_value[key]
-        else:
-            for name in raw_value.keys() - value.keys():
-                validator = self.additionalProperties
-                value[name] = validator.validate(raw_value[name], raw)
+    def _check_size(self, value: Dict) -> None:
         if self.minProperties is not None and len(value) < self.minProperties:
             raise ValidatorError(f"number or properties must be more than {self.minProperties}")
         if self.maxProperties is not None and len(value) > self.maxProperties:
             raise ValidatorError(f"number or properties must be less than {self.maxProperties}")
-        return value
 
 
 @attr.attrs(slots=True, frozen=True, eq=False, hash=False, auto_attribs=True, kw_only=True)
@@ -466,10 +635,30 @@ class AuthNone(Validator):
     def validate(self, request: web.Request, _: bool) -> Dict[str, str]:
         return {}
 
+    async def authenticate(self, request: web.Request) -> Dict[str, Any]:
+        return {}
+
 
 @attr.attrs(slots=True, frozen=True, eq=False, hash=False, auto_attribs=True)
-class AuthBasic(Validator):
+class AuthScheme(Validator):
+    scheme: str = attr.attrib(default="", kw_only=True)
+    verifier: Optional[CredentialVerifier] = attr.attrib(default=None, kw_only=True)
+
+    async def authenticate(self, request: web.Request) -> Dict[str, Any]:
+        values: Dict[str, Any] = self.validate(request, True)
+        if self.verifier is not None:
+            name = getattr(self, "name")
+            try:
+                values[self.scheme] = await self.verifier.verify(values[name])
+            except ValidatorError as e:
+                raise ValidatorError({name: e.error})
+        return values
+
+
+@attr.attrs(slots=True, frozen=True, eq=False, hash=False, auto_attribs=True)
+class AuthBasic(AuthScheme):
     name: str = "authorization"
+    location: ClassVar[str] = "header"
 
     def validate(self, request: web.Request, _: bool) -> Dict[str, str]:
         try:
@@ -483,8 +672,9 @@ class AuthBasic(Validator):
 
 
 @attr.attrs(slots=True, frozen=True, eq=False, hash=False, auto_attribs=True)
-class AuthBearer(Validator):
+class AuthBearer(AuthScheme):
     name: str = "authorization"
+    location: ClassVar[str] = "header"
 
     def validate(self, request: web.Request, _: bool) -> Dict[str, str]:
         try:
@@ -498,8 +688,9 @@ class AuthBearer(Validator):
 
 
 @attr.attrs(slots=True, frozen=True, eq=False, hash=False, auto_attribs=True)
-class AuthApiKeyHeader(Validator):
+class AuthApiKeyHeader(AuthScheme):
     name: str
+    location: ClassVar[str] = "header"
 
     def validate(self, request: web.Request, _: bool) -> Dict[str, str]:
         try:
@@ -513,8 +704,9 @@ class AuthApiKeyHeader(Validator):
 
 
 @attr.attrs(slots=True, frozen=True, eq=False, hash=False, auto_attribs=True)
-class AuthApiKeyQuery(Validator):
+class AuthApiKeyQuery(AuthScheme):
     name: str
+    location: ClassVar[str] = "query"
 
     def validate(self, request: web.Request, _: bool) -> Dict[str, str]:
         try:
@@ -528,8 +720,9 @@ class AuthApiKeyQuery(Validator):
 
 
 @attr.attrs(slots=True, frozen=True, eq=False, hash=False, auto_attribs=True)
-class AuthApiKeyCookie(Validator):
+class AuthApiKeyCookie(AuthScheme):
     name: str
+    location: ClassVar[str] = "cookie"
 
     def validate(self, request: web.Request, _: bool) -> Dict[str, str]:
         try:
@@ -542,11 +735,94 @@ class AuthApiKeyCookie(Validator):
         return {self.name: value}
 
 
+def _auth_carriers(validator: Validator) -> Tuple[Tuple[str, str], ...]:
+    # (location, name) of every credential the security requirement needs
+    if isinstance(validator, AllOfAuth):
+        return tuple(carrier for v in validator.validators for carrier in _auth_carriers(v))
+    if isinstance(validator, AuthNone):
+        return ()
+    return ((getattr(validator, "location"), getattr(validator, "name")),)
+
+
+def _has_carrier(request: web.Request, location: str, name: str) -> bool:
+    if location == "header":
+        return name in request.headers
+    if location == "query":
+        return name in request.rel_url.query
+    return name in request.cookies
+
+
 @attr.attrs(slots=True, frozen=True, eq=False, hash=False, auto_attribs=True)
 class AnyOfAuth(Validator):
     validators: List[Validator]
+    collect_all: bool = False
+    carriers: Tuple[Tuple[str, str], ...] = attr.attrib(init=False)
+    requirements: List[Tuple[FrozenSet[int], Validator]] = attr.attrib(init=False)
+
+    @carriers.default
+    def _carriers_default(self) -> Tuple[Tuple[str, str], ...]:
+        return tuple(dict.fromkeys(carrier for v in self.validators for carrier in _auth_carriers(v)))
+
+    @requirements.default
+    def _requirements_default(self) -> List[Tuple[FrozenSet[int], Validator]]:
+        index = {carrier: i for i, carrier in enumerate(self.carriers)}
+        requirements = [(frozenset(index[c] for c in _auth_carriers(v)), v) for v in self.validators]
+        # requirements without credentials, i.e. optional security, are checked last
+        # so provided credentials are still stored in request
+        return sorted(requirements, key=lambda r: not r[0])
 
     def validate(self, request: web.Request, raw: bool) -> Dict[str, str]:
+        if self.collect_all:
+            return self._validate_all(request, raw)
+        present = frozenset(i for i, carrier in enumerate(self.carriers) if _has_carrier(request, *carrier))
+        for required, validator in self.requirements:
+            if required <= present:
+                try:
+                    values: Dict[str, str] = validator.validate(request, raw)
+                    return values
+                except ValidatorError:
+                    continue
+        raise ValidatorError("no auth has been provided")
+
+    async def authenticate(self, request: web.Request) -> Dict[str, Any]:
+        if self.collect_all:
+            return await self._authenticate_all(request)
+        present = frozenset(i for i, carrier in enumerate(self.carriers) if _has_carrier(request, *carrier))
+        rejected: Optional[ValidatorError] = None
+        for required, validator in self.requirements:
+            if required <= present:
+                try:
+                    validator.validate(request, True)
+                except ValidatorError:
+                    continue
+                try:
+                    values: Dict[str, Any] = await getattr(validator, "authenticate")(request)
+                    return values
+                except ValidatorError as e:
+                    # well-formed credentials rejected by a verifier
+                    rejected = e
+        raise rejected or ValidatorError("no auth has been provided")
+
+    async def _authenticate_all(self, request: web.Request) -> Dict[str, Any]:
+        values: Dict[str, Any] = {}
+        valid = False
+        rejected: Optional[ValidatorError] = None
+        for validator in self.validators:
+            try:
+                validator.validate(request, True)
+            except ValidatorError:
+                continue
+            try:
+                values.update(await getattr(validator, "authenticate")(request))
+                valid = True
+            except ValidatorError as e:
+                # well-formed credentials rejected by a verifier
+                rejected = e
+        if not valid:
+            raise rejected or ValidatorError("no auth has been provided")
+        return values
+
+    def _validate_all(self, request: web.Request, raw: bool) -> Dict[str, str]:
         values: Dict[str, str] = {}
         valid = False
         for validator in self.validators:
@@ -572,6 +848,12 @@ class AllOfAuth(Validator):
             values.update(validator.validate(request, raw))
         return values
 
+    async def authenticate(self, request: web.Request) -> Dict[str, Any]:
+        values: Dict[str, Any] = {}
+        for validator in self.validators:
+            values.update(await getattr(validator, "authenticate")(request))
+        return values
+
 
 def to_integer(schema: Dict, is_property: bool) -> Integer:
     read_only = schema.get("readOnly", False) if is_property else False
@@ -641,10 +923,10 @@ def to_array(schema: Dict, is_property: bool) -> Array:
 def to_object(schema: Dict, is_property: bool) -> Object:
     properties = {k: schema_to_validator(v, is_property=True) for k, v in schema.get("properties", {}).items()}
     raw_additional_properties = schema.get("additionalProperties", True)
-    if isinstance(raw_additional_properties, dict):
-        additional_properties = schema_to_validator(raw_additional_properties)
+    if isinstance(raw_additional_properties, bool):
+        additional_properties: Union[bool, Validator] = raw_additional_properties
     else:
-        additional_properties = raw_additional_properties
+        additional_properties = schema_to_validator(raw_additional_properties)
 
     required = set(schema.get("required", []))
     for name, validator in properties.items():
@@ -717,60 +999,70 @@ def schema_to_validator(schema: Dict, *, is_property: bool = False) -> Validator
             mapping[obj] = i
             schema_names.add(obj)
     if discriminator is not None and "mapping" in discriminator:
+        # the spec can be shared or frozen, references are normalized in a copy
+        discriminator_mapping = {}
         for key, value in discriminator["mapping"].items():
             if value.startswith("#"):
                 value = value.split("/")[-1]
-                discriminator["mapping"][key] = value
             if value not in schema_names:
                 raise Exception(f"schema '{value}' must be defined in components")
+            discriminator_mapping[key] = value
+        discriminator = {**discriminator, "mapping": discriminator_mapping}
     return cls(
         nullable=schema.get("nullable", False),
         validators=[schema_to_validator(sch) for sch in schema[type_]],
-        discriminator=schema.get("discriminator"),
+        discriminator=discriminator,
         mapping=mapping,
     )
 
 
-def _security_to_validator(sec_name: str, components: Dict) -> Validator:
+def _security_to_validator(sec_name: str, components: Dict, verifiers: Dict[str, CredentialVerifier]) -> Validator:
     if sec_name not in components["securitySchemes"]:
         raise Exception(f"security schema {sec_name} must be defined in components")
     sec_def = components["securitySchemes"][sec_name]
+    verifier = verifiers.get(sec_name)
     if sec_def["type"] == "http":
         if sec_def["scheme"] == "basic":
-            return AuthBasic()
+            return AuthBasic(scheme=sec_name, verifier=verifier)
         if sec_def["scheme"] == "bearer":
-            return AuthBearer()
+            return AuthBearer(scheme=sec_name, verifier=verifier)
         raise Exception(f"Unknown scheme {sec_def['scheme']} in {sec_name}")
     if sec_def["type"] == "apiKey":
         if sec_def["in"] == "header":
-            return AuthApiKeyHeader(name=sec_def["name"].lower())
+            return AuthApiKeyHeader(name=sec_def["name"].lower(), scheme=sec_name, verifier=verifier)
         if sec_def["in"] == "query":
-            return AuthApiKeyQuery(name=sec_def["name"])
+            return AuthApiKeyQuery(name=sec_def["name"], scheme=sec_name, verifier=verifier)
         if sec_def["in"] == "cookie":
-            return AuthApiKeyCookie(name=sec_def["name"])
+            return AuthApiKeyCookie(name=sec_def["name"], scheme=sec_name, verifier=verifier)
         raise Exception(f"Unknown value of in {sec_def['in']} in {sec_name}")
     raise Exception(f"Unsupported auth type {sec_def['type']}")
 
 
-def security_to_validator(schema: List[Dict]) -> Validator:
+def security_to_validator(
+    schema: List[Dict],
+    *,
+    collect_all: bool = False,
+    verifiers: Optional[Dict[str, CredentialVerifier]] = None,
+) -> Validator:
     components = COMPONENTS.get()
     if "securitySchemes" not in components:
         raise Exception("securitySchemes must be defined in components")
+    verifiers = verifiers or {}
     if len(schema) > 1:
         validators = []
         for security in schema:
             if len(security) > 1:
                 validator: Validator = AllOfAuth(
-                    validators=[_security_to_validator(sec_name, components) for sec_name in security]
+                    validators=[_security_to_validator(sec_name, components, verifiers) for sec_name in security]
                 )
             elif len(security) == 1:
-                validator = _security_to_validator(next(iter(security)), components)
+                validator = _security_to_validator(next(iter(security)), components, verifiers)
             else:
                 validator = AuthNone()
             validators.append(validator)
-        return AnyOfAuth(validators=validators)
+        return AnyOfAuth(validators=validators, collect_all=collect_all)
 
     security = schema[0]
     if len(security) == 1:
-        return _security_to_validator(next(iter(security)), components)
-    return AllOfAuth(validators=[_security_to_validator(sec_name, components) for sec_name in security])
+        return _security_to_validator(next(iter(security)), components, verifiers)
+    return AllOfAuth(validators=[_security_to_validator(sec_name, components, verifiers) for sec_name in security])
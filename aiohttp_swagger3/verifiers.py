@@ -0,0 +1,129 @@
+import asyncio
+import hashlib
+import inspect
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from .exceptions import ValidatorError
+
+
+class CredentialVerifier:
+    """Wraps a verifier callback of a security scheme with a TTL cache.
+
+    Results are cached by the sha256 hash of the credential, concurrent verifications
+    of the same credential share one call of the callback.
+    """
+
+    __slots__ = ("_verify", "_ttl", "_max_size", "_cache", "_in_flight")
+
+    def __init__(self, verify: Callable[[str], Any], *, ttl: float, max_size: int) -> None:
+        self._verify = verify
+        self._ttl = ttl
+        self._max_size = max_size
+        # key -> (expires at, claims, error)
+        self._cache: "OrderedDict[bytes, Tuple[float, Any, Any]]" = OrderedDict()
+        self._in_flight: Dict[bytes, "asyncio.Future[Any]"] = {}
+
+    async def verify(self, credential: str) -> Any:
+        key = hashlib.sha256(credential.encode()).digest()
+        entry = self._cache.get(key)
+        if entry is not None:
+            expires_at, claims, error = entry
+            if expires_at > time.monotonic():
+                self._cache.move_to_end(key)
+                if error is not None:
+                    raise ValidatorError(error)
+                return claims
+            del self._cache[key]
+
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._call(key, credential))
+            self._in_flight[key] = future
+        # a cancelled request must not cancel the verification awaited by others
+        return await asyncio.shield(future)
+
+    async def _call(self, key: bytes, credential: str) -> Any:
+        try:
+            try:
+                claims = self._verify(credential)
+                if inspect.isawaitable(claims):
+                    claims = await claims
+            except ValidatorError as e:
+                self._store(key, None, e.error, self._ttl)
+                raise
+            ttl = self._ttl
+            if isinstance(claims, dict) and isinstance(claims.get("exp"), (int, float)):
+                # do not keep expired tokens in the cache
+                ttl = min(ttl, claims["exp"] - time.time())
+            self._store(key, claims, None, ttl)
+            return claims
+        finally:
+            del self._in_flight[key]
+
+    def _store(self, key: bytes, claims: Any, error: Any, ttl: float) -> None:
+        if ttl <= 0 or self._max_size <= 0:
+            return
+        self._cache[key] = (time.monotonic() + ttl, claims, error)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._max_size:
+            self._cache.popitem(last=False)
+
+
+class JWTVerifier:
+    """Verifies JWT bearer tokens against keys from a local JWKS file, requires ``PyJWT[crypto]``.
+
+    The decoded claims of a valid token are stored in ``request``.
+
+    :param str jwks_file: path to a JSON Web Key Set file
+    :param algorithms: allowed signing algorithms, default ``("RS256",)``
+    :param str audience: expected ``aud`` claim (optional)
+    :param str issuer: expected ``iss`` claim (optional)
+    :param float leeway: leeway in seconds for ``exp``/``nbf`` checks, default ``0``
+    """
+
+    __slots__ = ("_jwt", "_keys", "_algorithms", "_audience", "_issuer", "_leeway")
+
+    def __init__(
+        self,
+        jwks_file: str,
+        *,
+        algorithms: Sequence[str] = ("RS256",),
+        audience: Optional[str] = None,
+        issuer: Optional[str] = None,
+        leeway: float = 0,
+    ) -> None:
+        try:
+            import jwt
+        except ImportError:  # pragma: no cover
+            raise Exception("PyJWT is required for JWTVerifier, install aiohttp-swagger3[jwt]")
+        self._jwt = jwt
+        with open(jwks_file) as f:
+            jwk_set = jwt.PyJWKSet.from_dict(json.load(f))
+        self._keys = {key.key_id: key for key in jwk_set.keys}
+        self._algorithms = list(algorithms)
+        self._audience = audience
+        self._issuer = issuer
+        self._leeway = leeway
+
+    def __call__(self, token: str) -> Dict:
+        jwt = self._jwt
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+            if kid not in self._keys:
+                if kid is not None or len(self._keys) != 1:
+                    raise ValidatorError("unknown signing key")
+                kid = next(iter(self._keys))
+            claims: Dict = jwt.decode(
+                token,
+                key=self._keys[kid],
+                algorithms=self._algorithms,
+                audience=self._audience,
+                issuer=self._issuer,
+                leeway=self._leeway,
+            )
+        except jwt.PyJWTError as e:
+            raise ValidatorError(f"invalid token: {e}")
+        return claims
@@ -0,0 +1,122 @@
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .validators import MISSING, AllOf, Array, Discriminator, Object, String, Validator, ValidatorError
+
+_logger = logging.getLogger("aiohttp_swagger3")
+
+PathItem = Union[str, int]
+
+
+class ValidationWatchdog:
+    """Logs a report about requests whose validation took longer than ``threshold`` seconds.
+
+    The report is logged with the ``WARNING`` level, the report dict is available
+    in the ``slow_validation`` attribute of the log record:
+
+    - ``operation`` - method and path of the route
+    - ``duration`` - seconds spent on validation of the request
+    - ``phase`` - the slowest phase: ``auth``, ``query``, ``body``, ``header``, ``path`` or ``cookie``
+    - ``phase_duration`` - seconds spent on the slowest phase
+    - ``body_size`` - ``Content-Length`` of the request
+    - ``path`` - path to the slowest sub-schema, i.e. ``body/items/3/name``
+    - ``validator`` - type of the validator of the slowest sub-schema
+    - ``suppressed`` - number of slow requests not reported because of rate limiting
+
+    Reading the body and waiting for ``offload_executor`` are not counted. Streaming media type
+    handlers validate the body while reading it, so they are not counted at all, for custom
+    media type handlers only validation of the value they return is counted.
+
+    Finding the slowest sub-schema validates the slowest phase again, it is only done
+    for requests which are reported.
+
+    :param float threshold: seconds, default ``0.1``
+    :param float interval: minimal number of seconds between two reports, default ``60``
+    :param logging.Logger logger: logger for reports, default ``aiohttp_swagger3``
+    """
+
+    __slots__ = ("threshold", "interval", "logger", "_next_report", "_suppressed")
+
+    def __init__(
+        self, threshold: float = 0.1, *, interval: float = 60.0, logger: Optional[logging.Logger] = None
+    ) -> None:
+        self.threshold = threshold
+        self.interval = interval
+        self.logger = logger or _logger
+        self._next_report = 0.0
+        self._suppressed = 0
+
+    def should_report(self, duration: float) -> bool:
+        if duration < self.threshold:
+            return False
+        now = time.monotonic()
+        if now < self._next_report:
+            self._suppressed += 1
+            return False
+        self._next_report = now + self.interval
+        return True
+
+    def report(self, report: Dict[str, Any]) -> None:
+        report["suppressed"] = self._suppressed
+        self._suppressed = 0
+        self.logger.warning(
+            "slow validation of %s: %.3fs, phase %s, sub-schema %s (%s)",
+            report["operation"],
+            report["duration"],
+            report["phase"],
+            report["path"],
+            report["validator"],
+            extra={"slow_validation": report},
+        )
+
+
+def _children(validator: Validator, value: Any) -> List[Tuple[PathItem, Validator, Any]]:
+    if isinstance(validator, Array):
+        if isinstance(value, list):
+            return [(i, validator.validator, item) for i, item in enumerate(value)]
+        if isinstance(value, str):
+            return [(i, validator.validator, item) for i, item in enumerate(value.split(","))]
+    elif isinstance(validator, Object):
+        if isinstance(value, dict):
+            children: List[Tuple[PathItem, Validator, Any]] = [
+                (name, prop, value.get(name, MISSING)) for name, prop in validator.properties.items()
+            ]
+            if not isinstance(validator.additionalProperties, bool):
+                children.extend(
+                    (name, validator.additionalProperties, value[name])
+                    for name in value.keys() - validator.properties.keys()
+                )
+            return children
+    elif isinstance(validator, (Discriminator, AllOf)):
+        name = type(validator).__name__
+        keyword = name[0].lower() + name[1:]
+        return [(f"{keyword}[{i}]", sub, value) for i, sub in enumerate(validator.validators)]
+    return []
+
+
+def slowest_path(validator: Validator, value: Any, raw: bool) -> Tuple[List[PathItem], Validator]:
+    """Descends into the slowest item or property on every level of the value."""
+    path: List[PathItem] = []
+    while True:
+        slowest: Optional[Tuple[PathItem, Validator, Any]] = None
+        slowest_duration = -1.0
+        for child in _children(validator, value):
+            start = time.perf_counter()
+            try:
+                child[1].validate(child[2], raw)
+            except ValidatorError:
+                pass
+            duration = time.perf_counter() - start
+            if duration > slowest_duration:
+                slowest, slowest_duration = child, duration
+        if slowest is None:
+            return path, validator
+        key, validator, value = slowest
+        path.append(key)
+
+
+def describe(validator: Validator) -> str:
+    if isinstance(validator, String) and validator.pattern is not None:
+        return f"String pattern '{validator.pattern.pattern}'"
+    return type(validator).__name__
@@ -0,0 +1,134 @@
+"""Memory allocated by SwaggerRoute.parse per request, measured with tracemalloc.
+
+peak bytes - the most memory held at once while a request is parsed
+kept bytes - memory that stays referenced by the request (validated data) after parsing
+
+python -m benchmarks.allocations --requests 1000
+"""
+
+import argparse
+import asyncio
+import json
+import tracemalloc
+from typing import Dict, Tuple
+from unittest import mock
+
+from aiohttp import web
+from aiohttp.streams import StreamReader
+from aiohttp.test_utils import make_mocked_request
+
+from aiohttp_swagger3 import SwaggerDocs
+from aiohttp_swagger3.swagger_route import SwaggerRoute
+
+
+async def handler(request: web.Request, pet_id: int, limit: int, body: Dict, x_request_id: str) -> web.Response:
+    """
+    ---
+    parameters:
+      - name: pet_id
+        in: path
+        required: true
+        schema:
+          type: integer
+      - name: limit
+        in: query
+        schema:
+          type: integer
+          default: 10
+      - name: tags
+        in: query
+        schema:
+          type: array
+          items:
+            type: string
+      - name: x-request-id
+        in: header
+        required: true
+        schema:
+          type: string
+    requestBody:
+      required: true
+      content:
+        application/json:
+          schema:
+            type: object
+            required:
+              - name
+            properties:
+              name:
+                type: string
+              age:
+                type: integer
+                minimum: 0
+
+    responses:
+      '200':
+        description: OK.
+    """
+    return web.Response()
+
+
+def make_route() -> SwaggerRoute:
+    app = web.Application()
+    swagger = SwaggerDocs(app)
+    resource_route = swagger.add_route("POST", "/pets/{pet_id}", handler)
+    route: SwaggerRoute = resource_route.handler.args[0]  # type: ignore
+    return route
+
+
+def make_request(query: str, body: Dict) -> web.Request:
+    data = json.dumps(body).encode()
+    payload = StreamReader(mock.Mock(_reading_paused=False), 2**16, loop=asyncio.get_running_loop())
+    payload.feed_data(data)
+    payload.feed_eof()
+    return make_mocked_request(
+        "POST",
+        f"/pets/1?{query}",
+        headers={"Content-Type": "application/json", "Content-Length": str(len(data)), "X-Request-Id": "abc"},
+        match_info={"pet_id": "1"},
+        payload=payload,
+    )
+
+
+async def measure(route: SwaggerRoute, query: str, body: Dict, requests: int) -> Tuple[float, float]:
+    requests_ = [make_request(query, body) for _ in range(requests)]
+    # aiohttp parses the query, headers and cookies lazily and caches them in the request,
+    # do it outside of the measurement
+    for request in requests_:
+        request.rel_url.query, request.headers, request.cookies, request.content_type, request.body_exists  # noqa: B018
+    peak = retained = 0
+    tracemalloc.start()
+    for request in requests_:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        try:
+            kwargs = await route.parse(request)
+        except web.HTTPBadRequest:
+            kwargs = {}
+        current, peak_ = tracemalloc.get_traced_memory()
+        del kwargs
+        peak += peak_ - before
+        retained += current - before
+    tracemalloc.stop()
+    return peak / requests, retained / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000, help="number of parsed requests per scenario")
+    args = parser.parse_args()
+
+    route = make_route()
+    scenarios = [
+        ("valid", "limit=5&tags=a,b", {"name": "cat", "age": 3}),
+        ("defaults", "", {"name": "cat"}),
+        ("invalid", "limit=x", {"age": -1}),
+    ]
+    print(f"{'scenario':<12}{'peak bytes':>12}{'kept bytes':>12}")
+    for name, query, body in scenarios:
+        peak, retained = asyncio.run(measure(route, query, body, args.requests))
+        print(f"{name:<12}{peak:>12.1f}{retained:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
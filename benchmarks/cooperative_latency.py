@@ -0,0 +1,169 @@
+"""Latency of small requests while a huge JSON array body is validated by the same server:
+inline, cooperatively in slices (ValidationBudget) and in a thread pool (offload_threshold).
+
+Decoding of the JSON body itself still blocks the event loop unless it is offloaded too.
+
+python -m benchmarks.cooperative_latency --size-mb 50
+"""
+
+import argparse
+import asyncio
+import json
+import signal
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import aiohttp
+from aiohttp import web
+
+from aiohttp_swagger3 import SwaggerDocs, ValidationBudget
+
+MODES = ("inline", "items", "microseconds", "offload")
+
+
+async def upload(request: web.Request, body: List[Dict]) -> web.Response:
+    """
+    ---
+    requestBody:
+      required: true
+      content:
+        application/json:
+          schema:
+            type: array
+            items:
+              type: object
+              required: [id, name]
+              properties:
+                id:
+                  type: integer
+                  minimum: 0
+                name:
+                  type: string
+                  maxLength: 64
+                tags:
+                  type: array
+                  items:
+                    type: string
+
+    responses:
+      '200':
+        description: OK.
+    """
+    return web.json_response({"items": len(body)})
+
+
+async def ping(request: web.Request, value: int) -> web.Response:
+    """
+    ---
+    parameters:
+      - name: value
+        in: query
+        required: true
+        schema:
+          type: integer
+
+    responses:
+      '200':
+        description: OK.
+    """
+    return web.json_response({"value": value})
+
+
+def serve(mode: str, port: int) -> None:
+    kwargs: Dict = {}
+    if mode == "items":
+        kwargs["validation_budget"] = ValidationBudget(items=1000)
+    elif mode == "microseconds":
+        kwargs["validation_budget"] = ValidationBudget(microseconds=2000)
+    elif mode == "offload":
+        kwargs["offload_threshold"] = 1024 * 1024
+    app = web.Application(client_max_size=1024**3)
+    swagger = SwaggerDocs(app, **kwargs)
+    swagger.add_post("/upload", upload)
+    swagger.add_get("/ping", ping)
+    web.run_app(app, host="127.0.0.1", port=port, print=None)
+
+
+def make_body(size_mb: int) -> bytes:
+    item = {"id": 0, "name": "item-name", "tags": ["a", "b", "c"]}
+    count = size_mb * 1024 * 1024 // len(json.dumps(item))
+    return json.dumps([{**item, "id": i} for i in range(count)]).encode()
+
+
+async def measure(port: int, body: bytes, interval: float) -> List[float]:
+    latencies: List[float] = []
+    async with aiohttp.ClientSession() as session:
+        url = f"http://127.0.0.1:{port}"
+        upload_task = asyncio.ensure_future(
+            session.post(f"{url}/upload", data=body, headers={"Content-Type": "application/json"})
+        )
+        pings = []
+
+        async def _ping(i: int) -> None:
+            start = time.perf_counter()
+            async with session.get(f"{url}/ping", params={"value": i}) as resp:
+                await resp.read()
+            latencies.append(time.perf_counter() - start)
+
+        i = 0
+        while not upload_task.done():
+            pings.append(asyncio.ensure_future(_ping(i)))
+            i += 1
+            await asyncio.sleep(interval)
+        resp = await upload_task
+        assert resp.status == 200, await resp.text()
+        resp.release()
+        await asyncio.gather(*pings)
+    return latencies
+
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=50, help="size of the JSON array body in MB")
+    parser.add_argument("--interval", type=float, default=0.005, help="seconds between small requests")
+    parser.add_argument("--serve", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    body = make_body(args.size_mb)
+    print(f"{'mode':<14}{'requests':>10}{'p50':>10}{'p99':>10}{'max':>10}")
+    for mode in MODES:
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.cooperative_latency", "--serve", mode, "--port", str(port)]
+        )
+        try:
+            while True:
+                try:
+                    socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                    break
+                except OSError:
+                    time.sleep(0.05)
+            latencies = asyncio.run(measure(port, body, args.interval))
+        finally:
+            proc.send_signal(signal.SIGINT)
+            proc.wait()
+        print(
+            f"{mode:<14}{len(latencies):>10}"
+            f"{percentile(latencies, 0.5) * 1000:>8.1f}ms"
+            f"{percentile(latencies, 0.99) * 1000:>8.1f}ms"
+            f"{max(latencies) * 1000:>8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
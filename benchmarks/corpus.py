@@ -0,0 +1,293 @@
+"""Generates a corpus of requests for every operation of a spec loaded by SwaggerFile,
+to be sent by benchmarks.replay.
+
+Every operation gets a valid request built from its parameters and the JSON or form body,
+schemas of components are followed. Variants of it are derived:
+
+- boundary values of parameters and of top level properties of the body (minimum, maximum,
+  minLength, maxLength, minItems, maxItems, every value of enum, int32 range), valid on
+  the bound and invalid just beyond it
+- every variant of oneOf/anyOf of the body and of its properties, with the discriminator set
+- near-valid requests: a missing required parameter, property or body, a value of a wrong
+  type, an unsupported Content-Type
+
+Every line of the output is a JSON object with the operation, the kind of the variant,
+whether it is expected to pass validation and the request: method, path, query, headers,
+cookies and body. Strings with a pattern get their example, if the schema has none, a
+placeholder is used and the request may fail unexpectedly, replay reports such mismatches.
+
+python -m benchmarks.corpus tests/testdata/petstore.yaml --output corpus.jsonl
+"""
+
+import argparse
+import base64
+import copy
+import json
+import sys
+import urllib.parse
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from aiohttp import web
+
+from aiohttp_swagger3 import SwaggerFile
+from aiohttp_swagger3.swagger_route import resolve_parameter
+
+# values of string formats of the spec
+FORMATS = {
+    "date": "2020-01-31",
+    "date-time": "2020-01-31T12:00:00Z",
+    "email": "user@example.com",
+    "hostname": "example.com",
+    "ipv4": "127.0.0.1",
+    "ipv6": "::1",
+    "uuid": str(uuid.UUID(int=1)),
+    "byte": base64.b64encode(b"corpus").decode(),
+}
+WRONG_TYPE = {"integer": "x", "number": "x", "boolean": "x", "array": 1, "object": 1, "string": 1}
+INT32_MAX = 2**31 - 1
+
+# (kind, value, valid)
+Variant = Tuple[str, Any, bool]
+
+
+class Generator:
+    def __init__(self, spec: Dict) -> None:
+        self.spec = spec
+        self.components = spec.get("components", {})
+
+    def resolve(self, schema: Dict) -> Dict:
+        while "$ref" in schema:
+            # '#/components/schemas/Pet'
+            *_, section, name = schema["$ref"].split("/")
+            schema = self.components[section][name]
+        if "allOf" in schema:
+            merged: Dict[str, Any] = {"type": "object", "properties": {}, "required": []}
+            for sub in schema["allOf"]:
+                sub = self.resolve(sub)
+                merged["properties"].update(sub.get("properties", {}))
+                merged["required"].extend(sub.get("required", []))
+            return merged
+        return schema
+
+    def example(self, schema: Dict, depth: int = 0) -> Any:
+        """A valid value of ``schema``"""
+        schema = self.resolve(schema)
+        for key in ("example", "default"):
+            if key in schema:
+                return copy.deepcopy(schema[key])
+        if "enum" in schema:
+            return schema["enum"][0]
+        for key in ("oneOf", "anyOf"):
+            if key in schema:
+                return self.variants_of(schema, key)[0][1]
+        typ = schema.get("type")
+        if typ == "integer":
+            return self._number(schema, 1)
+        if typ == "number":
+            return self._number(schema, 1.5)
+        if typ == "boolean":
+            return True
+        if typ == "array":
+            item = self.example(schema.get("items", {}), depth + 1)
+            return [item] * max(schema.get("minItems", 1), 1 if depth < 4 else 0)
+        if typ == "object" or "properties" in schema:
+            properties = schema.get("properties", {})
+            required = set(schema.get("required", []))
+            # optional properties are left out of deep objects to keep the corpus finite
+            names = [name for name in properties if name in required or depth < 2]
+            return {name: self.example(properties[name], depth + 1) for name in names}
+        if schema.get("format") in FORMATS:
+            return FORMATS[schema["format"]]
+        length = max(schema.get("minLength", 0), min(schema.get("maxLength", 8), 8))
+        return "a" * length
+
+    def _number(self, schema: Dict, default: Any) -> Any:
+        value = default
+        if "minimum" in schema:
+            value = max(value, schema["minimum"] + (1 if schema.get("exclusiveMinimum") else 0))
+        if "maximum" in schema:
+            value = min(value, schema["maximum"] - (1 if schema.get("exclusiveMaximum") else 0))
+        return value
+
+    def variants_of(self, schema: Dict, key: str) -> List[Tuple[str, Any]]:
+        """(label, value) of every alternative of oneOf/anyOf ``schema``"""
+        discriminator = schema.get("discriminator")
+        result = []
+        for i, sub in enumerate(schema[key]):
+            value = self.example(sub)
+            label = f"{key}[{i}]"
+            if discriminator is not None and isinstance(value, dict) and "$ref" in sub:
+                name = sub["$ref"].rsplit("/", 1)[-1]
+                mapping = discriminator.get("mapping", {})
+                value[discriminator["propertyName"]] = next(
+                    (k for k, ref in mapping.items() if ref in (sub["$ref"], name)), name
+                )
+                label = f"{key}[{name}]"
+            result.append((label, value))
+        return result
+
+    def boundaries(self, schema: Dict) -> Iterator[Variant]:
+        schema = self.resolve(schema)
+        typ = schema.get("type")
+        if "enum" in schema:
+            for value in schema["enum"]:
+                yield "enum", value, True
+            if typ == "string":
+                yield "enum", "-".join(map(str, schema["enum"])) + "-x", False
+            return
+        for key in ("oneOf", "anyOf"):
+            if key in schema:
+                for label, value in self.variants_of(schema, key):
+                    yield label, value, True
+        if typ in ("integer", "number"):
+            step = 1 if typ == "integer" else 0.5
+            if "minimum" in schema:
+                minimum, exclusive = schema["minimum"], schema.get("exclusiveMinimum", False)
+                yield "minimum", minimum + step if exclusive else minimum, True
+                yield "minimum", minimum if exclusive else minimum - step, False
+            if "maximum" in schema:
+                maximum, exclusive = schema["maximum"], schema.get("exclusiveMaximum", False)
+                yield "maximum", maximum - step if exclusive else maximum, True
+                yield "maximum", maximum if exclusive else maximum + step, False
+            elif typ == "integer" and schema.get("format") == "int32":
+                yield "int32", INT32_MAX, True
+                yield "int32", INT32_MAX + 1, False
+        elif typ == "string" and "pattern" not in schema and schema.get("format") not in FORMATS:
+            if "minLength" in schema:
+                yield "minLength", "a" * schema["minLength"], True
+                if schema["minLength"] > 0:
+                    yield "minLength", "a" * (schema["minLength"] - 1), False
+            if "maxLength" in schema:
+                yield "maxLength", "a" * schema["maxLength"], True
+                yield "maxLength", "a" * (schema["maxLength"] + 1), False
+        elif typ == "array":
+            item = self.example(schema.get("items", {}))
+            if "minItems" in schema:
+                yield "minItems", [item] * schema["minItems"], True
+                if schema["minItems"] > 0:
+                    yield "minItems", [item] * (schema["minItems"] - 1), False
+            if "maxItems" in schema:
+                yield "maxItems", [item] * schema["maxItems"], True
+                yield "maxItems", [item] * (schema["maxItems"] + 1), False
+
+    def operation(self, path: str, method: str, operation: Dict) -> Iterator[Dict]:
+        name = operation.get("operationId", f"{method.upper()} {path}")
+        parameters = []
+        for param in operation.get("parameters", []):
+            param = resolve_parameter(param, self.components)
+            if "schema" in param:
+                parameters.append(param)
+        values = {(p["in"], p["name"]): self.example(p["schema"]) for p in parameters}
+        media_type, body_schema = self._body(operation.get("requestBody"))
+        body = None if body_schema is None else self.example(body_schema)
+
+        def request(
+            kind: str, valid: bool, values: Dict = values, body: Any = body, media_type: Optional[str] = media_type
+        ) -> Dict:
+            encoded = self._encode(path, method, values, media_type, body)
+            return {"operation": name, "kind": kind, "valid": valid, **encoded}
+
+        yield request("valid", True)
+        for param in parameters:
+            key = (param["in"], param["name"])
+            label = f"{param['in']}.{param['name']}"
+            if param.get("required", False) and param["in"] != "path":
+                yield request(f"missing:{label}", False, {k: v for k, v in values.items() if k != key})
+            typ = self.resolve(param["schema"]).get("type")
+            if typ in ("integer", "number", "boolean"):
+                yield request(f"wrong_type:{label}", False, {**values, key: "x"})
+            for kind, value, valid in self.boundaries(param["schema"]):
+                yield request(f"{kind}:{label}", valid, {**values, key: value})
+        if body_schema is None:
+            return
+        if operation["requestBody"].get("required", False):
+            yield request("missing:body", False, body=None)
+        yield request("content_type:body", False, media_type="text/x-corpus")
+        schema = self.resolve(body_schema)
+        for kind, value, valid in self.boundaries(schema):
+            yield request(f"{kind}:body", valid, body=value)
+        if not isinstance(body, dict):
+            return
+        properties = schema.get("properties", {})
+        for prop in schema.get("required", []):
+            if prop in body:
+                yield request(f"missing:body.{prop}", False, body={k: v for k, v in body.items() if k != prop})
+        for prop, prop_schema in properties.items():
+            typ = self.resolve(prop_schema).get("type")
+            if typ in WRONG_TYPE:
+                yield request(f"wrong_type:body.{prop}", False, body={**body, prop: WRONG_TYPE[typ]})
+            for kind, value, valid in self.boundaries(prop_schema):
+                yield request(f"{kind}:body.{prop}", valid, body={**body, prop: value})
+
+    def _body(self, request_body: Optional[Dict]) -> Tuple[Optional[str], Optional[Dict]]:
+        if request_body is None:
+            return None, None
+        content = request_body["content"]
+        for media_type in content:
+            if media_type == "application/json" or media_type.endswith("+json"):
+                return media_type, content[media_type].get("schema", {})
+        if "application/x-www-form-urlencoded" in content:
+            return "application/x-www-form-urlencoded", content["application/x-www-form-urlencoded"].get("schema", {})
+        return None, None
+
+    def _encode(self, path: str, method: str, values: Dict, media_type: Optional[str], body: Any) -> Dict:
+        query: List[Tuple[str, str]] = []
+        headers: Dict[str, str] = {}
+        cookies: Dict[str, str] = {}
+        for (location, name), value in values.items():
+            if location == "path":
+                path = path.replace(f"{{{name}}}", urllib.parse.quote(_to_param(value), safe=""))
+            elif location == "query":
+                query.append((name, _to_param(value)))
+            elif location == "header":
+                headers[name] = _to_param(value)
+            elif location == "cookie":
+                cookies[name] = _to_param(value)
+        encoded: Dict[str, Any] = {"method": method.upper(), "path": path, "query": query}
+        encoded.update(headers=headers, cookies=cookies)
+        if body is not None and media_type is not None:
+            if media_type == "application/x-www-form-urlencoded" and isinstance(body, dict):
+                encoded["body"] = urllib.parse.urlencode({k: _to_param(v) for k, v in body.items()})
+            else:
+                encoded["body"] = json.dumps(body)
+            encoded["headers"] = {"Content-Type": media_type, **headers}
+        return encoded
+
+
+def _to_param(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, list):
+        return ",".join(_to_param(v) for v in value)
+    return str(value)
+
+
+def generate(spec_file: str) -> Iterator[Dict]:
+    spec = SwaggerFile(web.Application(), spec_file).spec
+    generator = Generator(spec)
+    for path, methods in spec["paths"].items():
+        for method, operation in methods.items():
+            if method in ("get", "put", "post", "delete", "options", "head", "patch", "trace"):
+                yield from generator.operation(path, method, operation)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("spec_file", help="spec to generate requests for")
+    parser.add_argument("--output", help="JSON lines file, default stdout")
+    args = parser.parse_args()
+    out = sys.stdout if args.output is None else open(args.output, "w")
+    try:
+        counts: Dict[bool, int] = {True: 0, False: 0}
+        for request in generate(args.spec_file):
+            out.write(json.dumps(request) + "\n")
+            counts[request["valid"]] += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"{counts[True]} valid and {counts[False]} invalid requests", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
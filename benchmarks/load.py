@@ -0,0 +1,314 @@
+"""End-to-end load benchmark: a server built by SwaggerFile from tests/testdata/petstore.yaml
+extended with synthetic routes is driven by a local aiohttp client.
+
+Every scenario is run against a server with validation off and on, the spec endpoint and
+the UI assets do not depend on validation and are run once. RPS and p50/p99 latency are
+printed and written to JSON, pass a previous result with --compare to see the difference.
+
+The client runs in a single process, its own overhead is included in the latency, so the
+numbers are only comparable between runs on the same machine.
+
+python -m benchmarks.load --duration 5 --concurrency 32 --output load.json
+python -m benchmarks.load --compare load.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+import yaml
+from aiohttp import web
+
+import aiohttp_swagger3
+from aiohttp_swagger3 import SwaggerFile, SwaggerUiSettings
+
+PETSTORE = os.path.join(os.path.dirname(__file__), "..", "tests", "testdata", "petstore.yaml")
+# number of parameters of each location of the many_params route
+QUERY_PARAMS = 30
+HEADER_PARAMS = 10
+
+
+def make_spec(extra_routes: int) -> Dict:
+    with open(PETSTORE) as f:
+        spec = yaml.safe_load(f)
+    spec["components"]["schemas"]["Item"] = {
+        "type": "object",
+        "required": ["id", "name", "price"],
+        "properties": {
+            "id": {"type": "integer", "minimum": 0},
+            "name": {"type": "string", "maxLength": 64},
+            "price": {"type": "number", "minimum": 0},
+            "tags": {"type": "array", "items": {"type": "string"}},
+            "attributes": {"type": "object", "additionalProperties": {"type": "string"}},
+        },
+    }
+    ok = {"200": {"description": "OK"}}
+    parameters: List[Dict] = []
+    for i in range(QUERY_PARAMS):
+        schema: Dict[str, Any] = [
+            {"type": "integer", "minimum": 0},
+            {"type": "string", "maxLength": 32},
+            {"type": "boolean"},
+            {"type": "array", "items": {"type": "integer"}},
+            {"type": "string", "enum": ["a", "b", "c"]},
+        ][i % 5]
+        parameters.append({"name": f"q{i}", "in": "query", "required": i % 2 == 0, "schema": schema})
+    for i in range(HEADER_PARAMS):
+        parameters.append({"name": f"x-h{i}", "in": "header", "required": True, "schema": {"type": "integer"}})
+    spec["paths"]["/search/{category}"] = {
+        "get": {
+            "operationId": "search",
+            "parameters": [
+                {"name": "category", "in": "path", "required": True, "schema": {"type": "string"}},
+                *parameters,
+            ],
+            "responses": ok,
+        }
+    }
+    spec["paths"]["/items"] = {
+        "post": {
+            "operationId": "createItems",
+            "requestBody": {
+                "required": True,
+                "content": {
+                    "application/json": {
+                        "schema": {"type": "array", "items": {"$ref": "#/components/schemas/Item"}},
+                    }
+                },
+            },
+            "responses": ok,
+        }
+    }
+    # filler routes make the spec large: routing, startup and the spec endpoint
+    for i in range(extra_routes):
+        spec["paths"][f"/resource{i}/{{id}}"] = {
+            "get": {
+                "operationId": f"getResource{i}",
+                "parameters": [
+                    {"name": "id", "in": "path", "required": True, "schema": {"type": "integer"}},
+                    {"name": "fields", "in": "query", "schema": {"type": "array", "items": {"type": "string"}}},
+                ],
+                "responses": {
+                    "200": {
+                        "description": "OK",
+                        "content": {"application/json": {"schema": {"$ref": "#/components/schemas/Item"}}},
+                    }
+                },
+            }
+        }
+    return spec
+
+
+async def ok(request: web.Request) -> web.Response:
+    return web.json_response({})
+
+
+async def create_items(request: web.Request) -> web.Response:
+    data = request.get("data")
+    # without validation the body is still decoded, the difference is the cost of validation
+    body = data["body"] if data is not None else await request.json()
+    return web.json_response({"items": len(body)})
+
+
+def serve(spec_file: str, validate: bool, port: int, extra_routes: int) -> None:
+    app = web.Application(client_max_size=1024**3)
+    swagger = SwaggerFile(app, spec_file, validate=validate, swagger_ui_settings=SwaggerUiSettings(path="/docs"))
+    swagger.add_routes(
+        [
+            web.get("/pets", ok),
+            web.post("/pets", ok),
+            web.get("/pets/{pet_id}", ok),
+            web.get("/search/{category}", ok),
+            web.post("/items", create_items),
+            *(web.get(f"/resource{i}/{{id}}", ok) for i in range(extra_routes)),
+        ]
+    )
+    web.run_app(app, host="127.0.0.1", port=port, print=None)
+
+
+Request = Tuple[str, str, Dict[str, Any]]
+
+
+def make_scenarios(body_kb: int) -> Dict[str, Tuple[bool, Request]]:
+    """name -> (depends on validation, (method, path, request kwargs))"""
+    query = {f"q{i}": ["1", "value", "true", "1,2,3", "b"][i % 5] for i in range(QUERY_PARAMS)}
+    headers = {f"x-h{i}": str(i) for i in range(HEADER_PARAMS)}
+    item = {"id": 0, "name": "item-name", "price": 9.99, "tags": ["a", "b"], "attributes": {"color": "red"}}
+    count = max(1, body_kb * 1024 // len(json.dumps(item)))
+    body = json.dumps([{**item, "id": i} for i in range(count)]).encode()
+    return {
+        "petstore_list": (True, ("GET", "/pets", {"params": {"limit": "10"}})),
+        "petstore_show": (True, ("GET", "/pets/42", {})),
+        "petstore_create": (True, ("POST", "/pets", {"json": {"id": 1, "name": "cat", "tag": "x"}})),
+        "many_params": (True, ("GET", "/search/books", {"params": query, "headers": headers})),
+        "large_json": (
+            True,
+            ("POST", "/items", {"data": body, "headers": {"Content-Type": "application/json"}}),
+        ),
+        "spec": (False, ("GET", "/docs/swagger.json", {})),
+        "ui_index": (False, ("GET", "/docs/", {})),
+        "ui_asset": (False, ("GET", "/docs/swagger_ui_static/swagger-ui-bundle.js", {})),
+    }
+
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def drive(port: int, request: Request, duration: float, concurrency: int) -> Dict[str, Any]:
+    method, path, kwargs = request
+    url = f"http://127.0.0.1:{port}{path}"
+    latencies: List[float] = []
+    errors = 0
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+
+        async def worker(deadline: float) -> None:
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                async with session.request(method, url, **kwargs) as resp:
+                    await resp.read()
+                    if resp.status >= 300:
+                        errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        # warm up connections and lazily built responses
+        await asyncio.gather(*(worker(time.perf_counter() + 0.2) for _ in range(concurrency)))
+        latencies.clear()
+        errors = 0
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(start + duration) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def start_server(spec_file: str, validate: bool, extra_routes: int) -> Tuple[subprocess.Popen, int]:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    args = ["--serve", spec_file, "--port", str(port), "--extra-routes", str(extra_routes)]
+    if not validate:
+        args.append("--no-validate")
+    proc = subprocess.Popen([sys.executable, "-m", "benchmarks.load", *args])
+    while True:
+        if proc.poll() is not None:
+            raise Exception("server exited")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return proc, port
+        except OSError:
+            time.sleep(0.05)
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    scenarios = make_scenarios(args.body_kb)
+    if args.scenario:
+        scenarios = {name: scenarios[name] for name in args.scenario}
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        spec_file = os.path.join(tmp, "spec.yaml")
+        with open(spec_file, "w") as f:
+            yaml.safe_dump(make_spec(args.extra_routes), f)
+        for validate in (False, True):
+            todo = [(name, request) for name, (depends, request) in scenarios.items() if depends or validate]
+            if not todo:
+                continue
+            proc, port = start_server(spec_file, validate, args.extra_routes)
+            try:
+                for name, request in todo:
+                    result = asyncio.run(drive(port, request, args.duration, args.concurrency))
+                    depends = scenarios[name][0]
+                    result = {"scenario": name, "validation": validate if depends else None, **result}
+                    results.append(result)
+                    print_result(result)
+            finally:
+                proc.send_signal(signal.SIGINT)
+                proc.wait()
+    return {
+        "version": aiohttp_swagger3.__version__,
+        "python": platform.python_version(),
+        "aiohttp": aiohttp.__version__,
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "settings": {
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "body_kb": args.body_kb,
+            "extra_routes": args.extra_routes,
+        },
+        "results": results,
+    }
+
+
+def _key(result: Dict[str, Any]) -> Tuple[str, Optional[bool]]:
+    return result["scenario"], result["validation"]
+
+
+def _label(result: Dict[str, Any]) -> str:
+    validation = {None: "", False: " (off)", True: " (on)"}[result["validation"]]
+    return f"{result['scenario']}{validation}"
+
+
+def print_result(result: Dict[str, Any], previous: Optional[Dict[str, Any]] = None) -> None:
+    line = (
+        f"{_label(result):<24}{result['rps']:>10.1f}{result['p50_ms']:>10.2f}ms"
+        f"{result['p99_ms']:>10.2f}ms{result['errors']:>8}"
+    )
+    if previous is not None:
+        line += f"{(result['rps'] / previous['rps'] - 1) * 100:>+9.1f}%"
+    print(line, flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per scenario")
+    parser.add_argument("--concurrency", type=int, default=32, help="number of concurrent requests")
+    parser.add_argument("--body-kb", type=int, default=1024, help="size of the large JSON body in KB")
+    parser.add_argument("--extra-routes", type=int, default=200, help="number of synthetic filler routes")
+    parser.add_argument("--scenario", action="append", help="run only this scenario, can be repeated")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of a previous run, prints the difference of RPS")
+    parser.add_argument("--serve", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--no-validate", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, not args.no_validate, args.port, args.extra_routes)
+        return
+
+    print(f"{'scenario':<24}{'rps':>10}{'p50':>12}{'p99':>12}{'errors':>8}")
+    report = run(args)
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = {_key(result): result for result in json.load(f)["results"]}
+        print(f"\ncompared to {args.compare}:")
+        print(f"{'scenario':<24}{'rps':>10}{'p50':>12}{'p99':>12}{'errors':>8}{'rps':>10}")
+        for result in report["results"]:
+            print_result(result, previous.get(_key(result)))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Throughput of decoding and validating the same body as JSON, MessagePack and CBOR.
+
+python -m benchmarks.media_types --items 1000 --rounds 200
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from aiohttp_swagger3.context import COMPONENTS
+from aiohttp_swagger3.validators import schema_to_validator
+
+SCHEMA: Dict = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "required": ["id", "name", "price", "tags", "available"],
+        "properties": {
+            "id": {"type": "integer", "format": "int64"},
+            "name": {"type": "string", "maxLength": 64},
+            "price": {"type": "number", "minimum": 0},
+            "tags": {"type": "array", "items": {"type": "string"}},
+            "available": {"type": "boolean"},
+            "owner": {
+                "type": "object",
+                "properties": {"id": {"type": "integer"}, "email": {"type": "string"}},
+            },
+        },
+    },
+}
+
+
+def make_payload(items: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": i,
+            "name": f"item-{i}",
+            "price": i * 1.5,
+            "tags": ["a", "b", "c"],
+            "available": i % 2 == 0,
+            "owner": {"id": i, "email": f"user{i}@example.com"},
+        }
+        for i in range(items)
+    ]
+
+
+def codecs() -> List[Tuple[str, Callable[[Any], bytes], Callable[[bytes], Any]]]:
+    result: List[Tuple[str, Callable[[Any], bytes], Callable[[bytes], Any]]] = [
+        ("application/json", lambda obj: json.dumps(obj).encode(), json.loads)
+    ]
+    try:
+        import msgpack
+    except ImportError:
+        print("msgpack is not installed, skipping")
+    else:
+        result.append(
+            (
+                "application/msgpack",
+                lambda obj: msgpack.packb(obj, use_bin_type=True),
+                lambda data: msgpack.unpackb(data, raw=False),
+            )
+        )
+    try:
+        import cbor2
+    except ImportError:
+        print("cbor2 is not installed, skipping")
+    else:
+        result.append(("application/cbor", cbor2.dumps, cbor2.loads))
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000, help="number of array items in a body")
+    parser.add_argument("--rounds", type=int, default=200, help="number of decoded and validated bodies")
+    args = parser.parse_args()
+
+    COMPONENTS.set({})
+    validator = schema_to_validator(SCHEMA)
+    payload = make_payload(args.items)
+
+    print(f"{'media type':<22}{'body size':>12}{'decode':>12}{'validate':>12}{'bodies/s':>12}{'MB/s':>10}")
+    for media_type, dumps, loads in codecs():
+        data = dumps(payload)
+        decode_time = validate_time = 0.0
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            value = loads(data)
+            decoded = time.perf_counter()
+            validator.validate(value, False)
+            validate_time += time.perf_counter() - decoded
+            decode_time += decoded - start
+        total = decode_time + validate_time
+        print(
+            f"{media_type:<22}{len(data):>12}"
+            f"{decode_time / args.rounds * 1000:>10.3f}ms"
+            f"{validate_time / args.rounds * 1000:>10.3f}ms"
+            f"{args.rounds / total:>12.1f}"
+            f"{len(data) * args.rounds / total / 1024 / 1024:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
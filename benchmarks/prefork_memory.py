@@ -0,0 +1,155 @@
+"""Unique memory (USS) of prefork workers that build the application themselves
+vs workers forked from a parent that preloaded it (run_prefork with an application instance).
+
+Linux only, reads /proc/<pid>/smaps_rollup.
+
+python -m benchmarks.prefork_memory --workers 4 --routes 300
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, List
+
+from aiohttp import web
+
+from aiohttp_swagger3 import SwaggerDocs, run_prefork
+
+DOCSTRING = """
+---
+parameters:
+  - name: item_id
+    in: path
+    required: true
+    schema:
+      type: integer
+  - name: fields
+    in: query
+    schema:
+      type: array
+      items:
+        type: string
+        enum: [id, name, price, tags, owner]
+requestBody:
+  content:
+    application/json:
+      schema:
+        type: object
+        required: [name]
+        properties:
+{properties}
+responses:
+  '200':
+    description: OK.
+"""
+
+PROPERTY = """          field_{route}_{i}:
+            type: string
+            pattern: "^[a-z]+{i}$"
+            maxLength: 64
+"""
+
+
+def make_app(routes: int) -> web.Application:
+    app = web.Application()
+    swagger = SwaggerDocs(app)
+    for route in range(routes):
+
+        async def handler(request: web.Request, item_id: int) -> web.Response:
+            return web.json_response({"id": item_id})
+
+        properties = "".join(PROPERTY.format(route=route, i=i) for i in range(20))
+        handler.__doc__ = DOCSTRING.format(properties="          name:\n            type: string\n" + properties)
+        swagger.add_route("POST", f"/items{route}/{{item_id}}", handler)
+        swagger.add_route("GET", f"/items{route}/{{item_id}}", handler)
+    return app
+
+
+def serve(mode: str, port: int, workers: int, routes: int) -> None:
+    if mode == "preload":
+        gc.disable()
+        run_prefork(make_app(routes), workers=workers, host="127.0.0.1", port=port, print=None)
+    else:
+        run_prefork(lambda: make_app(routes), workers=workers, host="127.0.0.1", port=port, print=None)
+
+
+def memory(pid: int) -> Dict[str, int]:
+    result = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if value.strip().endswith("kB"):
+                result[name] = int(value.split()[0])
+    return {"uss": result["Private_Clean"] + result["Private_Dirty"], "pss": result["Pss"], "rss": result["Rss"]}
+
+
+def children(pid: int) -> List[int]:
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def measure(mode: str, workers: int, routes: int) -> Dict[str, float]:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    cmd = [sys.executable, "-m", "benchmarks.prefork_memory", "--serve", mode, "--port", str(port)]
+    cmd += ["--workers", str(workers), "--routes", str(routes)]
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd)
+    try:
+        while True:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/items0/1", timeout=1).close()
+                break
+            except OSError:
+                if proc.poll() is not None:
+                    raise Exception("server failed to start")
+                time.sleep(0.05)
+        ready = time.perf_counter() - start
+        # every worker has to handle some requests before it is measured
+        for i in range(workers * 50):
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/items{i % routes}/{i}", timeout=5).close()
+        pids = children(proc.pid)
+        usage = [memory(pid) for pid in pids]
+        return {
+            "startup": ready,
+            "uss": sum(u["uss"] for u in usage) / len(usage),
+            "pss": sum(u["pss"] for u in usage) / len(usage),
+            "rss": sum(u["rss"] for u in usage) / len(usage),
+            "total": sum(u["pss"] for u in usage) + memory(proc.pid)["pss"],
+        }
+    finally:
+        os.kill(proc.pid, signal.SIGTERM)
+        proc.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4, help="number of workers")
+    parser.add_argument("--routes", type=int, default=300, help="number of routes in the application")
+    parser.add_argument("--serve", choices=("factory", "preload"), help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, args.workers, args.routes)
+        return
+
+    print(f"{'mode':<10}{'startup':>10}{'USS/worker':>14}{'PSS/worker':>14}{'RSS/worker':>14}{'total PSS':>14}")
+    for mode in ("factory", "preload"):
+        result = measure(mode, args.workers, args.routes)
+        print(
+            f"{mode:<10}{result['startup']:>9.2f}s"
+            f"{result['uss'] / 1024:>11.1f}MiB{result['pss'] / 1024:>11.1f}MiB"
+            f"{result['rss'] / 1024:>11.1f}MiB{result['total'] / 1024:>11.1f}MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
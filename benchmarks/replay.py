@@ -0,0 +1,198 @@
+"""Sends a corpus generated by benchmarks.corpus to an application and reports throughput,
+p50/p90/p99 latency, the mix of statuses and of fields failing validation, and requests whose
+outcome differs from the expected one (a valid request rejected or an invalid one accepted).
+
+Without --url, a local server is started in another process with SwaggerFile built from
+--spec, every operation of the spec answers 200 after validation. Requests are sent in
+the order of the corpus, over and over, or with --valid-share, valid ones are picked with
+this probability and invalid ones otherwise.
+
+python -m benchmarks.replay corpus.jsonl --spec tests/testdata/petstore.yaml --duration 5
+python -m benchmarks.replay corpus.jsonl --url http://127.0.0.1:8080 --header "Authorization: Bearer x"
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import signal
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+from aiohttp import web
+
+from aiohttp_swagger3 import SwaggerFile
+
+from .load import ok, percentile
+
+
+def serve(spec_file: str, port: int) -> None:
+    app = web.Application()
+    swagger = SwaggerFile(app, spec_file)
+    for path, methods in swagger.spec["paths"].items():
+        for method in methods:
+            if method in ("get", "put", "post", "delete", "options", "head", "patch"):
+                swagger.add_route(method.upper(), path, ok)
+    web.run_app(app, host="127.0.0.1", port=port, print=None)
+
+
+def start_server(spec_file: str) -> Tuple[subprocess.Popen, str]:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    proc = subprocess.Popen([sys.executable, "-m", "benchmarks.replay", "--serve", spec_file, "--port", str(port)])
+    while True:
+        if proc.poll() is not None:
+            raise Exception("server exited")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return proc, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.05)
+
+
+def make_picker(corpus: List[Dict], valid_share: Optional[float], seed: int) -> Callable[[], Dict]:
+    if valid_share is None:
+        cycle = itertools.cycle(corpus)
+        return lambda: next(cycle)
+    rnd = random.Random(seed)
+    valid = [request for request in corpus if request["valid"]] or corpus
+    invalid = [request for request in corpus if not request["valid"]] or corpus
+    return lambda: rnd.choice(valid if rnd.random() < valid_share else invalid)
+
+
+def _failed_fields(text: str) -> List[str]:
+    # the body of RequestValidationFailed is "400: {json of errors}"
+    try:
+        errors = json.loads(text.partition(": ")[2])
+    except ValueError:
+        return []
+    return list(errors) if isinstance(errors, dict) else []
+
+
+async def replay(
+    url: str,
+    corpus: List[Dict],
+    duration: float,
+    concurrency: int,
+    valid_share: Optional[float],
+    extra_headers: Dict[str, str],
+    seed: int,
+) -> Dict[str, Any]:
+    pick = make_picker(corpus, valid_share, seed)
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    fields: Counter = Counter()
+    unexpected: Counter = Counter()
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar()) as session:
+
+        async def worker(deadline: float) -> None:
+            while time.perf_counter() < deadline:
+                request = pick()
+                headers = {**request["headers"], **extra_headers}
+                if request["cookies"]:
+                    headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in request["cookies"].items())
+                body = request.get("body")
+                start = time.perf_counter()
+                async with session.request(
+                    request["method"],
+                    url + request["path"],
+                    params=request["query"],
+                    headers=headers,
+                    data=None if body is None else body.encode(),
+                ) as resp:
+                    text = await resp.text()
+                latencies.append(time.perf_counter() - start)
+                statuses[resp.status] += 1
+                if resp.status == 400:
+                    fields.update(_failed_fields(text))
+                if request["valid"] != (resp.status < 400):
+                    unexpected[(request["operation"], request["kind"], resp.status)] += 1
+
+        # warm up connections and lazily built validators
+        await asyncio.gather(*(worker(time.perf_counter() + 0.2) for _ in range(concurrency)))
+        for counter in (statuses, fields, unexpected):
+            counter.clear()
+        latencies.clear()
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(start + duration) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 3),
+        "p90_ms": round(percentile(latencies, 0.9) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "failed_fields": dict(fields.most_common()),
+        "unexpected": [
+            {"operation": operation, "kind": kind, "status": status, "count": count}
+            for (operation, kind, status), count in unexpected.most_common()
+        ],
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    total = report["requests"]
+    print(f"{total} requests, {report['rps']:.1f} rps")
+    print(f"latency p50 {report['p50_ms']:.2f}ms p90 {report['p90_ms']:.2f}ms p99 {report['p99_ms']:.2f}ms")
+    print("statuses: " + ", ".join(f"{s} {c / total:.1%}" for s, c in report["statuses"].items()))
+    failures = sum(report["failed_fields"].values())
+    if failures:
+        mix = list(report["failed_fields"].items())[:10]
+        print("failed validation of: " + ", ".join(f"{name} {count / failures:.1%}" for name, count in mix))
+    for item in report["unexpected"][:10]:
+        print(f"unexpected {item['status']}: {item['operation']} {item['kind']} x{item['count']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", nargs="?", help="JSON lines file written by benchmarks.corpus")
+    parser.add_argument("--spec", help="spec of the local server, if --url is not given")
+    parser.add_argument("--url", help="base URL of a running application")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds to send requests")
+    parser.add_argument("--concurrency", type=int, default=32, help="number of concurrent requests")
+    parser.add_argument("--valid-share", type=float, help="probability of picking a valid request")
+    parser.add_argument("--header", action="append", default=[], help="'Name: value' added to every request")
+    parser.add_argument("--seed", type=int, default=0, help="seed of --valid-share picks")
+    parser.add_argument("--output", help="write the report to this JSON file")
+    parser.add_argument("--serve", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+    if args.corpus is None or (args.url is None) == (args.spec is None):
+        parser.error("a corpus and either --url or --spec are required")
+
+    with open(args.corpus) as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+    extra_headers = dict(header.split(": ", 1) for header in args.header)
+    proc = None
+    url = args.url
+    if url is None:
+        proc, url = start_server(args.spec)
+    try:
+        report = asyncio.run(
+            replay(url, corpus, args.duration, args.concurrency, args.valid_share, extra_headers, args.seed)
+        )
+    finally:
+        if proc is not None:
+            proc.send_signal(signal.SIGINT)
+            proc.wait()
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Time to resolve a request path by aiohttp's UrlDispatcher vs SpecRouter with many routes.
+
+Routes are a third plain paths (/service{i}/status), a third templated paths with
+a distinct prefix (/resource{i}/{id}) and a third templated paths sharing a prefix
+before their first variable (/api/{version}/resource{i}/{id}). The last registered path
+of each kind is resolved, and a path without a route (404).
+
+python -m benchmarks.routing --routes 1000 5000 --rounds 2000
+"""
+
+import argparse
+import asyncio
+import time
+import warnings
+from typing import Dict, List, Optional
+
+from aiohttp import web
+from aiohttp.test_utils import make_mocked_request
+
+from aiohttp_swagger3 import SpecRouter
+
+
+async def handler(request: web.Request) -> web.Response:
+    return web.Response()
+
+
+def make_app(routes: int, router: Optional[web.UrlDispatcher]) -> web.Application:
+    with warnings.catch_warnings():
+        # aiohttp deprecates the router argument, there is no other way to replace the router
+        warnings.filterwarnings("ignore", "router argument is deprecated", DeprecationWarning)
+        app = web.Application() if router is None else web.Application(router=router)
+    for i in range(routes // 3):
+        app.router.add_get(f"/service{i}/status", handler)
+        app.router.add_get(f"/resource{i}/{{id}}", handler)
+        app.router.add_get(f"/api/{{version}}/resource{i}/{{id}}", handler)
+    app.freeze()
+    return app
+
+
+def targets(routes: int) -> Dict[str, str]:
+    last = routes // 3 - 1
+    return {
+        "plain": f"/service{last}/status",
+        "templated": f"/resource{last}/10",
+        "shared prefix": f"/api/v1/resource{last}/10",
+        "not found": "/missing/10",
+    }
+
+
+async def measure(app: web.Application, path: str, rounds: int) -> float:
+    request = make_mocked_request("GET", path, app=app)
+    resolve = app.router.resolve
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await resolve(request)
+    return (time.perf_counter() - start) / rounds
+
+
+async def run(routes: List[int], rounds: int) -> None:
+    print(f"{'routes':>8} {'path':<14} {'UrlDispatcher':>15} {'SpecRouter':>12}")
+    for count in routes:
+        apps = [make_app(count, None), make_app(count, SpecRouter())]
+        for kind, path in targets(count).items():
+            results = [await measure(app, path, rounds) for app in apps]
+            print(f"{count:>8} {kind:<14} {results[0] * 1e6:>13.2f}us {results[1] * 1e6:>10.2f}us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--routes", type=int, nargs="+", default=[1000, 5000], help="numbers of routes")
+    parser.add_argument("--rounds", type=int, default=2000, help="resolutions of every path")
+    args = parser.parse_args()
+    asyncio.run(run(args.routes, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
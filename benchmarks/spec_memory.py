@@ -0,0 +1,93 @@
+"""Memory kept by the same large spec mounted on several sub-applications, with the spec
+loaded into a dict per SwaggerFile and frozen (SwaggerFile(frozen=True)). Every mode is built
+in its own process, growth of its resident memory after all routes are added is reported.
+
+The spec is tests/testdata/petstore.yaml extended with synthetic routes, see benchmarks.load.
+
+Linux only, reads /proc/self/statm.
+
+python -m benchmarks.spec_memory --routes 300 --mounts 5
+"""
+
+import argparse
+import gc
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Tuple
+
+import yaml
+from aiohttp import web
+
+from aiohttp_swagger3 import SwaggerFile
+
+from .load import PETSTORE, create_items, make_spec, ok
+
+
+def rss() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize()
+
+
+def mount(spec_file: str, mounts: int, routes: int, frozen: bool) -> Tuple[int, float]:
+    """Returns bytes kept by ``mounts`` sub-applications and seconds spent building them"""
+    # modules and caches loaded on the first use are not counted
+    SwaggerFile(web.Application(), PETSTORE).add_get("/pets", ok)
+    gc.collect()
+    before = rss()
+    start = time.perf_counter()
+    app = web.Application()
+    for i in range(mounts):
+        subapp = web.Application()
+        swagger = SwaggerFile(subapp, spec_file, frozen=frozen)
+        swagger.add_routes(
+            [
+                web.get("/pets", ok),
+                web.post("/pets", ok),
+                web.get("/pets/{pet_id}", ok),
+                web.get("/search/{category}", ok),
+                web.post("/items", create_items),
+                *(web.get(f"/resource{j}/{{id}}", ok) for j in range(routes)),
+            ]
+        )
+        app.add_subapp(f"/v{i}", subapp)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    # the application is alive until memory is measured
+    kept = rss() - before
+    del app
+    return kept, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--routes", type=int, default=300, help="number of synthetic routes")
+    parser.add_argument("--mounts", type=int, default=5, help="number of sub-applications")
+    parser.add_argument("--child", metavar="SPEC_FILE", help=argparse.SUPPRESS)
+    parser.add_argument("--frozen", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        kept, elapsed = mount(args.child, args.mounts, args.routes, args.frozen)
+        print(f"{'frozen' if args.frozen else 'dict':<8} {kept / 1024**2:>10.1f} {elapsed:>10.2f}")
+        return
+
+    fd, spec_file = tempfile.mkstemp(suffix=".yaml")
+    try:
+        with os.fdopen(fd, "w") as f:
+            yaml.safe_dump(make_spec(args.routes), f)
+        print(f"{os.path.getsize(spec_file) / 1024:.0f} KB spec, {args.mounts} mounts")
+        print(f"{'mode':<8} {'kept MB':>10} {'build s':>10}")
+        for frozen in (False, True):
+            command = [sys.executable, "-m", "benchmarks.spec_memory", "--child", spec_file]
+            command += ["--routes", str(args.routes), "--mounts", str(args.mounts)]
+            subprocess.run(command + ["--frozen"] * frozen, check=True)
+    finally:
+        os.unlink(spec_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -53,4 +53,10 @@ setup(
     ],
     python_requires=">=3.9",
     install_requires=install_requires,
+    extras_require={
+        "msgpack": ["msgpack>=1.0.0"],
+        "cbor": ["cbor2>=5.0.0"],
+        "jwt": ["PyJWT[crypto]>=2.0.0"],
+        "opentelemetry": ["opentelemetry-api>=1.0.0"],
+    },
 )
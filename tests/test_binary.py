@@ -0,0 +1,120 @@
+from aiohttp import web
+
+from aiohttp_swagger3 import BinaryHandler, BinaryStream
+
+from .helpers import error_to_json
+
+
+async def _upload(request, body):
+    """
+    ---
+    requestBody:
+      required: true
+      content:
+        application/octet-stream:
+          schema:
+            type: string
+            format: binary
+            minLength: 2
+            maxLength: 16
+
+    responses:
+      '200':
+        description: OK.
+    """
+    if isinstance(body, memoryview):
+        return web.json_response({"type": "memoryview", "data": body.tobytes().decode()})
+    assert isinstance(body, BinaryStream)
+    data = b"".join([chunk async for chunk in body.iter_chunked(4)])
+    return web.json_response({"type": "stream", "data": data.decode(), "size": body.size})
+
+
+async def _chunks(data: bytes):
+    for i in range(0, len(data), 4):
+        yield data[i : i + 4]
+
+
+async def test_binary_stream(swagger_docs, aiohttp_client):
+    swagger = swagger_docs()
+    swagger.add_route("POST", "/r", _upload)
+
+    client = await aiohttp_client(swagger._app)
+
+    resp = await client.post("/r", data=b"binary-data")
+    assert resp.status == 200
+    assert await resp.json() == {"type": "stream", "data": "binary-data", "size": 11}
+
+    resp = await client.post("/r", data=b"x" * 17)
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"body": "value length should be less than 16"}
+
+    resp = await client.post("/r", data=b"x")
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"body": "value length should be more than 2"}
+
+
+async def test_binary_stream_chunked(swagger_docs, aiohttp_client):
+    swagger = swagger_docs()
+    swagger.add_route("POST", "/r", _upload)
+
+    client = await aiohttp_client(swagger._app)
+
+    headers = {"Content-Type": "application/octet-stream"}
+    resp = await client.post("/r", data=_chunks(b"binary-data"), headers=headers)
+    assert resp.status == 200
+    assert await resp.json() == {"type": "stream", "data": "binary-data", "size": 11}
+
+    resp = await client.post("/r", data=_chunks(b"x" * 32), headers=headers)
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"body": "value length should be less than 16"}
+
+    resp = await client.post("/r", data=_chunks(b"x"), headers=headers)
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"body": "value length should be more than 2"}
+
+
+async def test_binary_buffered(swagger_docs, aiohttp_client):
+    swagger = swagger_docs()
+    swagger.register_media_type_handler("application/octet-stream", BinaryHandler(buffer_size=8))
+    swagger.add_route("POST", "/r", _upload)
+
+    client = await aiohttp_client(swagger._app)
+
+    resp = await client.post("/r", data=b"small")
+    assert resp.status == 200
+    assert await resp.json() == {"type": "memoryview", "data": "small"}
+
+    resp = await client.post("/r", data=b"not so small")
+    assert resp.status == 200
+    assert await resp.json() == {"type": "stream", "data": "not so small", "size": 12}
+
+
+async def test_octet_stream_not_binary(swagger_docs, aiohttp_client):
+    async def handler(request, body):
+        """
+        ---
+        requestBody:
+          required: true
+          content:
+            application/octet-stream:
+              schema:
+                type: string
+                minLength: 2
+
+        responses:
+          '200':
+            description: OK.
+        """
+        return web.json_response({"type": type(body).__name__, "data": body.decode()})
+
+    swagger = swagger_docs()
+    swagger.add_route("POST", "/r", handler)
+
+    client = await aiohttp_client(swagger._app)
+    resp = await client.post("/r", data=b"abc", headers={"Content-Type": "application/octet-stream"})
+    assert resp.status == 200
+    assert await resp.json() == {"type": "bytes", "data": "abc"}
+
+    resp = await client.post("/r", data=b"a", headers={"Content-Type": "application/octet-stream"})
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"body": "value length should be more than 2"}
@@ -0,0 +1,76 @@
+from typing import Dict
+
+import pytest
+from aiohttp import web
+
+from aiohttp_swagger3.handlers import application_json
+
+from .helpers import error_to_json
+
+
+async def handler(request, item_id: int, body: Dict):
+    """
+    ---
+    parameters:
+      - name: item_id
+        in: path
+        required: true
+        schema:
+          type: integer
+      - name: x-token
+        in: header
+        required: true
+        schema:
+          type: string
+    requestBody:
+      required: true
+      content:
+        application/json:
+          schema:
+            type: object
+            required:
+              - name
+            properties:
+              name:
+                type: string
+    responses:
+      '200':
+        description: OK.
+    """
+    return web.json_response(body)
+
+
+@pytest.mark.parametrize(
+    "body_last, expected",
+    [
+        (
+            False,
+            {"item_id": "value should be type of int", "x-token": "is required", "body": {"name": "required property"}},
+        ),
+        (True, {"item_id": "value should be type of int", "x-token": "is required"}),
+    ],
+)
+async def test_invalid_parameters(swagger_docs, aiohttp_client, body_last, expected):
+    swagger = swagger_docs(body_last=body_last)
+    reads = []
+
+    async def counting_json(request):
+        reads.append(request)
+        return await application_json(request)
+
+    swagger.register_media_type_handler("application/json", counting_json)
+    swagger.add_post("/items/{item_id}", handler)
+
+    client = await aiohttp_client(swagger._app)
+    resp = await client.post("/items/a", json={})
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == expected
+    assert len(reads) == (0 if body_last else 1)
+
+    resp = await client.post("/items/1", json={}, headers={"x-token": "t"})
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"body": {"name": "required property"}}
+
+    resp = await client.post("/items/1", json={"name": "item"}, headers={"x-token": "t"})
+    assert resp.status == 200
+    assert await resp.json() == {"name": "item"}
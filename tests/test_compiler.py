@@ -0,0 +1,187 @@
+import importlib
+import sys
+
+import pytest
+import yaml
+from aiohttp import web
+
+from aiohttp_swagger3 import SwaggerFile, ValidatorError
+from aiohttp_swagger3.__main__ import main
+from aiohttp_swagger3.compiler import _ModuleWriter, build_validators
+
+from .helpers import error_to_json
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "compiled", "version": "1.0.0", "x-released": "2020-01-01"},
+    "paths": {
+        "/pets/{pet_id}": {
+            "post": {
+                "parameters": [
+                    {"name": "pet_id", "in": "path", "required": True, "schema": {"type": "integer", "minimum": 1}},
+                    {"$ref": "#/components/parameters/Trace"},
+                    {
+                        "name": "tags",
+                        "in": "query",
+                        "schema": {"type": "array", "items": {"type": "string", "enum": ["a", "b"]}},
+                    },
+                ],
+                "requestBody": {
+                    "required": True,
+                    "content": {
+                        "application/json": {"schema": {"$ref": "#/components/schemas/Pet"}},
+                        "application/x-ndjson": {"x-ndjson-item": {"$ref": "#/components/schemas/Cat"}},
+                    },
+                },
+                "responses": {"200": {"description": "OK"}},
+            }
+        },
+        "/owners": {
+            "get": {
+                "parameters": [{"name": "limit", "in": "query", "schema": {"type": "number", "maximum": 1.5}}],
+                "responses": {"200": {"description": "OK"}},
+            }
+        },
+    },
+    "components": {
+        "parameters": {
+            "Trace": {
+                "name": "x-trace",
+                "in": "header",
+                "schema": {"type": "string", "pattern": "^[a-f0-9]{8}$", "format": "trace", "nullable": True},
+            }
+        },
+        "schemas": {
+            "Pet": {
+                "oneOf": [{"$ref": "#/components/schemas/Cat"}, {"$ref": "#/components/schemas/Dog"}],
+                "discriminator": {"propertyName": "kind", "mapping": {"cat": "#/components/schemas/Cat", "dog": "Dog"}},
+            },
+            "Cat": {
+                "type": "object",
+                "required": ["kind", "name"],
+                "properties": {
+                    "kind": {"type": "string"},
+                    "name": {"type": "string", "maxLength": 8},
+                    "lives": {"type": "integer", "format": "int32", "default": 9},
+                },
+                "additionalProperties": False,
+            },
+            "Dog": {
+                "type": "object",
+                "required": ["kind"],
+                "properties": {
+                    "kind": {"type": "string"},
+                    "friends": {"type": "array", "items": {"$ref": "#/components/schemas/Cat"}},
+                },
+            },
+        },
+    },
+}
+
+
+async def handler(request, pet_id: int, body):
+    return web.json_response({"pet_id": pet_id, "body": body, "data": dict(request["data"])})
+
+
+async def owners(request):
+    return web.json_response(dict(request["data"]))
+
+
+@pytest.fixture
+def compiled(tmp_path, monkeypatch):
+    spec_file = tmp_path / "spec.yaml"
+    spec_file.write_text(yaml.safe_dump(SPEC))
+    main(["compile", str(spec_file), "-o", str(tmp_path / "compiled_spec.py")])
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield str(spec_file), "compiled_spec"
+    sys.modules.pop("compiled_spec", None)
+
+
+def _app(spec_file, **kwargs):
+    app = web.Application()
+    swagger = SwaggerFile(app, spec_file, **kwargs)
+    swagger.add_routes([web.post("/pets/{pet_id}", handler), web.get("/owners", owners)])
+    return app
+
+
+def test_compiled_validators_are_equal(compiled):
+    spec_file, module = compiled
+    with open(spec_file) as f:
+        _, built = build_validators(yaml.safe_load(f))
+    loaded = importlib.import_module(module).load()["operations"]()
+    writer = _ModuleWriter({})
+    assert built.keys() == loaded.keys()
+    for key, operation in built.items():
+        assert [writer._expand(v) for v in operation["parameters"]] == [
+            writer._expand(v) for v in loaded[key]["parameters"]
+        ]
+        assert {k: writer._expand(v) for k, v in operation["body"].items()} == {
+            k: writer._expand(v) for k, v in loaded[key]["body"].items()
+        }
+
+
+def test_compiled_module_shares_components(compiled):
+    spec_file, module = compiled
+    with open(importlib.import_module(module).__file__) as f:
+        source = f.read()
+    assert source.count("Object(") == 2
+    manifest = importlib.import_module(module).load()
+    body = manifest["operations"]()[("post", "/pets/{pet_id}")]["body"]
+    cat = body["application/x-ndjson"].validator
+    assert body["application/json"].validators[0] is cat
+    assert manifest["spec"]["info"]["x-released"] == "2020-01-01"
+
+
+async def test_compiled_spec_file(compiled, aiohttp_client):
+    spec_file, module = compiled
+    client = await aiohttp_client(_app(spec_file, compiled=module))
+
+    resp = await client.post("/pets/1", params={"tags": "a"}, json={"kind": "cat", "name": "tom"})
+    assert resp.status == 200
+    assert await resp.json() == {
+        "pet_id": 1,
+        "body": {"kind": "cat", "name": "tom", "lives": 9},
+        "data": {"pet_id": 1, "tags": ["a"], "body": {"kind": "cat", "name": "tom", "lives": 9}},
+    }
+
+    resp = await client.post(
+        "/pets/0", params={"tags": "c"}, headers={"x-trace": "xyz"}, json={"kind": "dog", "friends": [{"kind": 1}]}
+    )
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {
+        "pet_id": "value should be more than or equal to 1",
+        "tags": {"0": "value should be one of ['a', 'b']"},
+        "x-trace": "value should match regex pattern '^[a-f0-9]{8}$'",
+        "body": "fail to validate oneOf",
+    }
+
+    resp = await client.get("/owners", params={"limit": "2"})
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"limit": "value should be less than or equal to 1.5"}
+
+
+def test_compiled_stale(compiled):
+    spec_file, module = compiled
+    with open(spec_file, "a") as f:
+        f.write("\n")
+    with pytest.raises(Exception, match="compiled_spec is stale"):
+        _app(spec_file, compiled=module)
+
+
+async def test_compiled_string_formats(compiled, aiohttp_client):
+    def trace_validator(value: str) -> None:
+        if value == "00000000":
+            raise ValidatorError("trace must not be empty")
+
+    spec_file, module = compiled
+    app = web.Application()
+    swagger = SwaggerFile(app, spec_file, compiled=module)
+    swagger.register_string_format_validator("trace", trace_validator)
+    swagger.add_routes([web.get("/owners", owners)])
+    # validators of all operations are created with the first route
+    swagger.add_routes([web.post("/pets/{pet_id}", handler)])
+    client = await aiohttp_client(app)
+
+    resp = await client.post("/pets/1", headers={"x-trace": "00000000"}, json={"kind": "cat", "name": "tom"})
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"x-trace": "trace must not be empty"}
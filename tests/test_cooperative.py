@@ -0,0 +1,113 @@
+import asyncio
+from typing import Dict, List
+
+import pytest
+from aiohttp import web
+
+from aiohttp_swagger3 import ValidationBudget
+from aiohttp_swagger3.context import COMPONENTS
+from aiohttp_swagger3.validators import ValidatorError, schema_to_validator
+
+from .helpers import error_to_json
+
+SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "required": ["id"],
+        "properties": {
+            "id": {"type": "integer", "minimum": 0},
+            "tags": {"type": "array", "items": {"type": "string"}},
+            "count": {"type": "integer", "default": 1},
+        },
+        "additionalProperties": {"type": "string"},
+    },
+    "maxItems": 5000,
+}
+
+
+def _validator():
+    COMPONENTS.set({})
+    return schema_to_validator(SCHEMA)
+
+
+async def test_validate_async_yields():
+    validator = _validator()
+    value = [{"id": i, "tags": ["a", "b"], "extra": "x"} for i in range(1000)]
+    ticks = 0
+    done = False
+
+    async def ticker():
+        nonlocal ticks
+        while not done:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    task = asyncio.ensure_future(ticker())
+    await asyncio.sleep(0)
+    result = await validator.validate_async(value, False, ValidationBudget(items=100).start())
+    done = True
+    await task
+    assert result == validator.validate(value, False)
+    assert result[0] == {"id": 0, "tags": ["a", "b"], "extra": "x", "count": 1}
+    assert ticks >= 40
+
+
+@pytest.mark.parametrize(
+    "value,error",
+    [
+        ([{"id": 1}, {"id": -1}], {1: {"id": "value should be more than or equal to 0"}}),
+        ([{"id": 1}, {}], {1: {"id": "required property"}}),
+        ([{"id": 1, "tags": ["a", 1]}], {0: {"tags": {1: "value should be type of str"}}}),
+        ([{"id": 1, "extra": 1}], {0: "value should be type of str"}),
+        ({"id": 1}, "value should be type of list"),
+    ],
+)
+async def test_validate_async_errors(value, error):
+    validator = _validator()
+    with pytest.raises(ValidatorError) as exc_sync:
+        validator.validate(value, False)
+    with pytest.raises(ValidatorError) as exc_async:
+        await validator.validate_async(value, False, ValidationBudget(microseconds=10).start())
+    assert exc_async.value.error == exc_sync.value.error == error
+
+
+def test_validation_budget_required():
+    with pytest.raises(Exception, match="items or microseconds"):
+        ValidationBudget()
+
+
+async def test_cooperative_body(swagger_docs, aiohttp_client):
+    async def handler(request, body: List[Dict]):
+        """
+        ---
+        requestBody:
+          required: true
+          content:
+            application/json:
+              schema:
+                type: array
+                items:
+                  type: object
+                  properties:
+                    id:
+                      type: integer
+
+        responses:
+          '200':
+            description: OK.
+        """
+        return web.json_response({"total": sum(item["id"] for item in body)})
+
+    swagger = swagger_docs(validation_budget=ValidationBudget(items=10))
+    swagger.add_route("POST", "/r", handler)
+
+    client = await aiohttp_client(swagger._app)
+
+    resp = await client.post("/r", json=[{"id": i} for i in range(100)])
+    assert resp.status == 200
+    assert await resp.json() == {"total": 4950}
+
+    resp = await client.post("/r", json=[{"id": 1}, {"id": "2"}])
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"body": {"1": {"id": "value should be type of int"}}}
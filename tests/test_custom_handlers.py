@@ -178,3 +178,83 @@ async def test_asterisk_custom_handlers(swagger_docs, aiohttp_client):
     resp = await client.post("/r", data=data, headers={"content-type": "custom/handler"})
     assert resp.status == 200
     assert (await resp.read()).decode() == data
+
+
+async def test_structured_syntax_suffix(swagger_docs, aiohttp_client):
+    async def handler(request, body: Dict):
+        """
+        ---
+        requestBody:
+          required: true
+          content:
+            application/vnd.api+json:
+              schema:
+                type: object
+                properties:
+                  id:
+                    type: integer
+
+        responses:
+          '200':
+            description: OK.
+
+        """
+        return web.json_response(body)
+
+    swagger = swagger_docs()
+    swagger.add_route("POST", "/r", handler)
+
+    client = await aiohttp_client(swagger._app)
+
+    headers = {"content-type": "application/vnd.api+json; charset=utf-8"}
+    resp = await client.post("/r", data='{"id": 10}', headers=headers)
+    assert resp.status == 200
+    assert await resp.json() == {"id": 10}
+
+    resp = await client.post("/r", json={"id": 10})
+    assert resp.status == 400
+    assert "no handler for application/json" in await resp.text()
+
+
+async def test_wildcard_request_body_media_type(swagger_docs, aiohttp_client):
+    async def custom_handler(request: web.Request) -> Tuple[str, bool]:
+        return request.content_type, True
+
+    async def handler(request, body: str):
+        """
+        ---
+        requestBody:
+          required: true
+          content:
+            application/json:
+              schema:
+                type: object
+            image/*:
+              schema:
+                type: string
+
+        responses:
+          '200':
+            description: OK.
+
+        """
+        return web.Response(text=body if isinstance(body, str) else "json")
+
+    swagger = swagger_docs()
+    swagger.register_media_type_handler("image/*", custom_handler)
+    swagger.add_route("POST", "/r", handler)
+
+    client = await aiohttp_client(swagger._app)
+
+    for _ in range(2):
+        resp = await client.post("/r", data=b"\x00", headers={"content-type": "image/png"})
+        assert resp.status == 200
+        assert await resp.text() == "image/png"
+
+    resp = await client.post("/r", json={})
+    assert resp.status == 200
+    assert await resp.text() == "json"
+
+    resp = await client.post("/r", data=b"\x00", headers={"content-type": "video/mp4"})
+    assert resp.status == 400
+    assert "no handler for video/mp4" in await resp.text()
@@ -57,3 +57,47 @@ async def test_custom_request_key(swagger_docs, aiohttp_client):
     req = "str"
     resp = await client.post("/r/str", headers=headers, params=params, json=req)
     assert resp.status == 200
+
+
+async def test_request_data_mapping(swagger_docs, aiohttp_client):
+    async def handler(request, limit: int):
+        """
+        ---
+        parameters:
+
+          - name: limit
+            in: query
+            schema:
+              type: integer
+
+          - name: offset
+            in: query
+            schema:
+              type: integer
+
+        responses:
+          '200':
+            description: OK.
+        """
+        data = request["data"]
+        assert "offset" not in data
+        assert data.get("offset") is None
+        data["user"] = "admin"
+        data["offset"] = 0
+        assert len(data) == 3
+        del data["offset"]
+        assert "offset" not in data
+        copy = data.copy()
+        assert isinstance(copy, dict)
+        copy["user"] = "guest"
+        assert data["user"] == "admin"
+        return web.json_response(copy)
+
+    swagger = swagger_docs()
+    swagger.add_route("GET", "/r", handler)
+
+    client = await aiohttp_client(swagger._app)
+
+    resp = await client.get("/r", params={"limit": 10})
+    assert resp.status == 200
+    assert await resp.json() == {"limit": 10, "user": "guest"}
@@ -0,0 +1,187 @@
+from typing import Dict
+
+from aiohttp import web
+
+from aiohttp_swagger3 import RequestValidationFailed, SwaggerDocs
+from aiohttp_swagger3.handlers import BinaryHandler
+
+from .helpers import error_to_json
+
+
+async def handler(request, item_id: int, body: Dict):
+    """
+    ---
+    parameters:
+      - name: item_id
+        in: path
+        required: true
+        schema:
+          type: integer
+      - name: x-token
+        in: header
+        required: true
+        schema:
+          type: string
+          format: token
+    requestBody:
+      required: true
+      content:
+        application/json:
+          schema:
+            type: object
+    responses:
+      '200':
+        description: OK.
+    """
+    return web.json_response({"id": item_id, "body": body})
+
+
+async def test_expect(aiohttp_client):
+    reads = []
+
+    # expect handlers run before middlewares, requests rejected by them never get here
+    @web.middleware
+    async def counting(request, handler):
+        reads.append(request)
+        return await handler(request)
+
+    app = web.Application(client_max_size=32, middlewares=[counting])
+    swagger = SwaggerDocs(app, validate_expect=True)
+    tokens = []
+    swagger.register_string_format_validator("token", tokens.append)
+    swagger.add_post("/items/{item_id}", handler)
+
+    client = await aiohttp_client(app)
+    headers = {"x-token": "t"}
+    resp = await client.post("/items/1", json={"a": 1}, headers=headers, expect100=True)
+    assert resp.status == 200
+    assert await resp.json() == {"id": 1, "body": {"a": 1}}
+    assert len(reads) == 1
+    # parameters are not validated again after the body is received
+    assert tokens == ["t"]
+
+    resp = await client.post("/items/a", json={"a": 1}, expect100=True)
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"item_id": "value should be type of int", "x-token": "is required"}
+
+    resp = await client.post("/items/1", data="a", headers={**headers, "Content-Type": "text/plain"}, expect100=True)
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"body": "no handler for text/plain"}
+
+    resp = await client.post("/items/1", json={"a": "a" * 32}, headers=headers, expect100=True)
+    assert resp.status == 413
+    assert len(reads) == 1
+
+    resp = await client.post("/items/1", json={"a": 1}, headers={**headers, "Expect": "x"})
+    assert resp.status == 417
+
+
+async def test_custom_expect_handler(swagger_docs, aiohttp_client):
+    async def expect_handler(request):
+        return web.Response(status=418)
+
+    swagger = swagger_docs()
+    swagger.add_post("/items/{item_id}", handler, expect_handler=expect_handler)
+
+    client = await aiohttp_client(swagger._app)
+    resp = await client.post("/items/1", json={"a": 1}, headers={"x-token": "t"}, expect100=True)
+    assert resp.status == 418
+
+
+async def test_expect_binary_length(swagger_docs, aiohttp_client):
+    async def upload(request, body):
+        """
+        ---
+        requestBody:
+          required: true
+          content:
+            application/octet-stream:
+              schema:
+                type: string
+                format: binary
+                minLength: 2
+                maxLength: 8
+        responses:
+          '200':
+            description: OK.
+        """
+        return web.json_response({"size": len(await body.read())})
+
+    reads = []
+
+    class CountingBinaryHandler(BinaryHandler):
+        async def __call__(self, request, validator):
+            reads.append(request)
+            return await super().__call__(request, validator)
+
+    swagger = swagger_docs(validate_expect=True)
+    swagger.register_media_type_handler("application/octet-stream", CountingBinaryHandler())
+    swagger.add_post("/upload", upload)
+
+    client = await aiohttp_client(swagger._app)
+    headers = {"Content-Type": "application/octet-stream"}
+    resp = await client.post("/upload", data=b"a" * 4, headers=headers, expect100=True)
+    assert resp.status == 200
+    assert await resp.json() == {"size": 4}
+    assert len(reads) == 1
+
+    resp = await client.post("/upload", data=b"a" * 16, headers=headers, expect100=True)
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"body": "value length should be less than 8"}
+
+    resp = await client.post("/upload", data=b"a", headers=headers, expect100=True)
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"body": "value length should be more than 2"}
+    assert len(reads) == 1
+
+
+async def test_expect_through_middlewares(aiohttp_client):
+    @web.middleware
+    async def unprocessable(request, handler):
+        try:
+            return await handler(request)
+        except RequestValidationFailed as e:
+            return web.json_response(e.errors, status=422)
+
+    app = web.Application(middlewares=[unprocessable])
+    swagger = SwaggerDocs(app)
+    swagger.add_post("/items/{item_id}", handler)
+
+    client = await aiohttp_client(app)
+    resp = await client.post("/items/a", json={"a": 1}, headers={"x-token": "t"}, expect100=True)
+    assert resp.status == 422
+    assert await resp.json() == {"item_id": "value should be type of int"}
+
+
+async def test_expect_custom_handler_not_limited(aiohttp_client):
+    async def upload(request, body: int):
+        """
+        ---
+        requestBody:
+          required: true
+          content:
+            video/mp4:
+              schema:
+                type: integer
+        responses:
+          '200':
+            description: OK.
+        """
+        return web.json_response({"size": body})
+
+    async def mp4(request):
+        # streams the body without keeping it in memory
+        size = 0
+        async for chunk in request.content.iter_any():
+            size += len(chunk)
+        return size, False
+
+    app = web.Application(client_max_size=1024)
+    swagger = SwaggerDocs(app, validate_expect=True)
+    swagger.register_media_type_handler("video/mp4", mp4)
+    swagger.add_post("/upload", upload)
+
+    client = await aiohttp_client(app)
+    resp = await client.post("/upload", data=b"a" * 4096, headers={"Content-Type": "video/mp4"}, expect100=True)
+    assert resp.status == 200
+    assert await resp.json() == {"size": 4096}
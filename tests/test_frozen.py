@@ -0,0 +1,108 @@
+from types import MappingProxyType
+from typing import Dict
+
+import pytest
+import yaml
+from aiohttp import web
+
+from aiohttp_swagger3 import SwaggerFile
+from aiohttp_swagger3.frozen import freeze
+
+from .helpers import error_to_json
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "frozen", "version": "1.0.0"},
+    "paths": {
+        "/pets": {
+            "post": {
+                "parameters": [
+                    {"name": "kind", "in": "query", "schema": {"type": "string", "enum": ["cat", "dog"]}},
+                ],
+                "requestBody": {
+                    "required": True,
+                    "content": {
+                        "application/json": {
+                            "schema": {
+                                "oneOf": [{"$ref": "#/components/schemas/Cat"}, {"$ref": "#/components/schemas/Dog"}],
+                                "discriminator": {
+                                    "propertyName": "kind",
+                                    "mapping": {"cat": "#/components/schemas/Cat", "dog": "Dog"},
+                                },
+                            }
+                        }
+                    },
+                },
+                "responses": {"200": {"description": "OK"}},
+            }
+        },
+    },
+    "components": {
+        "schemas": {
+            "Cat": {
+                "type": "object",
+                "required": ["kind"],
+                "properties": {"kind": {"type": "string"}, "name": {"type": "string"}},
+                "additionalProperties": {"type": "string"},
+            },
+            "Dog": {
+                "type": "object",
+                "required": ["kind"],
+                "properties": {"kind": {"type": "string"}, "name": {"type": "string"}},
+            },
+        }
+    },
+}
+
+
+async def create_pet(request, body: Dict):
+    return web.json_response(body)
+
+
+def test_freeze():
+    spec = freeze({"a": {"type": "string"}, "b": [{"type": "string"}, 1, True, 1.0], "c": [True, 1.0, 1]})
+    assert isinstance(spec, MappingProxyType)
+    assert spec["a"] is spec["b"][0]
+    assert spec["b"] == ({"type": "string"}, 1, True, 1.0)
+    assert [type(v) for v in spec["c"]] == [bool, float, int]
+    assert "".join(["ty", "pe"]) in spec["a"]
+    with pytest.raises(TypeError):
+        spec["a"]["type"] = "integer"
+
+
+async def test_frozen_spec_file(tmp_path, swagger_ui_settings, aiohttp_client):
+    spec_file = tmp_path / "spec.yaml"
+    spec_file.write_text(yaml.safe_dump(SPEC))
+
+    main_app = web.Application()
+    swaggers = []
+    for version in ("v1", "v2"):
+        app = web.Application()
+        swagger = SwaggerFile(app, str(spec_file), frozen=True, swagger_ui_settings=swagger_ui_settings())
+        swagger.add_post("/pets", create_pet)
+        swaggers.append(swagger)
+        main_app.add_subapp(f"/{version}", app)
+    assert swaggers[0].spec is swaggers[1].spec
+    cat = swaggers[0].spec["components"]["schemas"]["Cat"]["properties"]
+    assert cat["kind"] is cat["name"]
+
+    client = await aiohttp_client(main_app)
+    for version in ("v1", "v2"):
+        resp = await client.post(f"/{version}/pets", params={"kind": "cat"}, json={"kind": "cat", "name": "tom"})
+        assert resp.status == 200
+        assert await resp.json() == {"kind": "cat", "name": "tom"}
+
+    resp = await client.post("/v1/pets", params={"kind": "cow"}, json={"kind": "dog", "name": 1})
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {
+        "kind": "value should be one of ['cat', 'dog']",
+        "body": "fail to validate oneOf",
+    }
+
+    resp = await client.get("/v2/docs/swagger.json")
+    assert resp.status == 200
+    served = await resp.json()
+    # references of discriminator mappings are normalized without changing the spec
+    schema = served["paths"]["/pets"]["post"]["requestBody"]["content"]["application/json"]["schema"]
+    assert schema["discriminator"]["mapping"] == {"cat": "#/components/schemas/Cat", "dog": "Dog"}
+    assert served["components"] == SPEC["components"]
@@ -0,0 +1,72 @@
+import subprocess
+import sys
+from typing import Set
+
+import pytest
+
+# modules that are loaded only when the feature that needs them is used
+DEFERRED = {
+    "yaml",
+    "fastjsonschema",
+    "rfc3339_validator",
+    "jwt",
+    "opentelemetry",
+    "msgpack",
+    "cbor2",
+    "aiohttp_swagger3.ui_settings",
+    "aiohttp_swagger3.index_templates",
+}
+
+
+def _imported(statement: str) -> Set[str]:
+    """Names of modules imported by ``statement`` in a fresh interpreter, from ``-X importtime``"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True, check=True
+    )
+    return {
+        line.rsplit("|", 1)[1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and "|" in line
+    }
+
+
+def test_import_package():
+    imported = _imported("import aiohttp_swagger3")
+    assert "aiohttp_swagger3" in imported
+    assert "aiohttp" not in imported
+    assert not any(name.startswith("aiohttp_swagger3.") for name in imported)
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "from aiohttp_swagger3 import SwaggerDocs",
+        "from aiohttp_swagger3 import SwaggerFile",
+        "from aiohttp_swagger3 import *",
+    ],
+)
+def test_import_deferred(statement):
+    imported = _imported(statement)
+    assert "aiohttp_swagger3.swagger" in imported
+    loaded = {name for name in imported if name in DEFERRED or name.split(".")[0] in DEFERRED}
+    if statement.endswith("*"):
+        # star import needs every exported name, UI settings included
+        loaded -= {"aiohttp_swagger3.ui_settings"}
+    assert not loaded
+
+
+def test_lazy_attributes():
+    import aiohttp_swagger3
+
+    assert "SwaggerUiSettings" in dir(aiohttp_swagger3)
+    assert aiohttp_swagger3.SwaggerUiSettings is aiohttp_swagger3.ui_settings.SwaggerUiSettings
+    with pytest.raises(AttributeError, match="has no attribute 'Missing'"):
+        aiohttp_swagger3.Missing
+
+
+def test_optional_decoders_deferred():
+    imported = _imported(
+        "from aiohttp import web; from aiohttp_swagger3 import SwaggerDocs; SwaggerDocs(web.Application())"
+    )
+    assert "msgpack" not in imported
+    assert "cbor2" not in imported
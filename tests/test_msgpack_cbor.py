@@ -0,0 +1,79 @@
+from typing import Dict
+
+import pytest
+from aiohttp import web
+
+from .helpers import error_to_json
+
+msgpack = pytest.importorskip("msgpack")
+cbor2 = pytest.importorskip("cbor2")
+
+
+def _msgpack_dumps(obj):
+    return msgpack.packb(obj, use_bin_type=True)
+
+
+@pytest.mark.parametrize(
+    "content_type,dumps",
+    [
+        ("application/msgpack", _msgpack_dumps),
+        ("application/x-msgpack", _msgpack_dumps),
+        ("application/cbor", cbor2.dumps),
+    ],
+)
+async def test_msgpack_and_cbor(swagger_docs, aiohttp_client, content_type, dumps):
+    async def handler(request, body: Dict):
+        """
+        ---
+        requestBody:
+          required: true
+          content:
+            application/msgpack:
+              schema:
+                $ref: "#/components/schemas/Upload"
+            application/x-msgpack:
+              schema:
+                $ref: "#/components/schemas/Upload"
+            application/cbor:
+              schema:
+                $ref: "#/components/schemas/Upload"
+
+        responses:
+          '200':
+            description: OK.
+
+        """
+        return web.json_response({"name": body["name"], "size": body["size"], "data": body["data"].hex()})
+
+    swagger = swagger_docs()
+    swagger.spec["components"] = {
+        "schemas": {
+            "Upload": {
+                "type": "object",
+                "required": ["name", "size", "data"],
+                "properties": {
+                    "name": {"type": "string"},
+                    "size": {"type": "integer"},
+                    "data": {"type": "string", "format": "binary"},
+                },
+            }
+        }
+    }
+    swagger.add_route("POST", "/r", handler)
+
+    client = await aiohttp_client(swagger._app)
+    headers = {"Content-Type": content_type}
+
+    body = {"name": "file", "size": 3, "data": b"\x00\x01\x02"}
+    resp = await client.post("/r", data=dumps(body), headers=headers)
+    assert resp.status == 200
+    assert await resp.json() == {"name": "file", "size": 3, "data": "000102"}
+
+    body = {"name": "file", "size": "3", "data": b"\x00"}
+    resp = await client.post("/r", data=dumps(body), headers=headers)
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"body": {"size": "value should be type of int"}}
+
+    resp = await client.post("/r", data=b"\xc1", headers=headers)
+    assert resp.status == 400
+    assert "body" in error_to_json(await resp.text())
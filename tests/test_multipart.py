@@ -0,0 +1,235 @@
+from typing import Dict
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from aiohttp_swagger3 import MultipartFormDataHandler, StreamingMediaTypeHandler, SwaggerDocs
+
+from .helpers import error_to_json
+
+
+def _form(**fields) -> aiohttp.MultipartWriter:
+    writer = aiohttp.MultipartWriter("form-data")
+    for name, value in fields.items():
+        for item in value if isinstance(value, list) else [value]:
+            part = writer.append(item)
+            if isinstance(item, bytes):
+                part.set_content_disposition("form-data", name=name, filename=f"{name}.bin")
+            else:
+                part.set_content_disposition("form-data", name=name)
+    return writer
+
+
+async def _upload_handler(request, body: Dict):
+    """
+    ---
+    requestBody:
+      required: true
+      content:
+        multipart/form-data:
+          schema:
+            type: object
+            required:
+              - id
+              - file
+            additionalProperties: false
+            properties:
+              id:
+                type: integer
+              tag:
+                type: string
+                maxLength: 5
+              mode:
+                type: string
+                default: fast
+              file:
+                type: string
+                format: binary
+                maxLength: 16
+              attachments:
+                type: array
+                maxItems: 2
+                items:
+                  type: string
+                  format: binary
+
+    responses:
+      '200':
+        description: OK.
+    """
+    files = {}
+    for name in ("file", "attachments"):
+        items = body.get(name, [])
+        for field in items if isinstance(items, list) else [items]:
+            assert isinstance(field, web.FileField)
+            files.setdefault(name, []).append([field.filename, field.file.read().decode()])
+            field.file.close()
+    return web.json_response({"id": body["id"], "tag": body.get("tag"), "mode": body["mode"], "files": files})
+
+
+async def test_multipart_form_data(swagger_docs, aiohttp_client):
+    swagger = swagger_docs()
+    swagger.add_route("POST", "/r", _upload_handler)
+
+    client = await aiohttp_client(swagger._app)
+
+    resp = await client.post("/r", data=_form(id="10", tag="pets", file=b"content"))
+    assert resp.status == 200
+    assert await resp.json() == {
+        "id": 10,
+        "tag": "pets",
+        "mode": "fast",
+        "files": {"file": [["file.bin", "content"]]},
+    }
+
+    resp = await client.post("/r", data=_form(id="10", file=b"content", attachments=[b"a", b"b"]))
+    assert resp.status == 200
+    assert (await resp.json())["files"]["attachments"] == [["attachments.bin", "a"], ["attachments.bin", "b"]]
+
+
+async def test_multipart_form_data_errors(swagger_docs, aiohttp_client):
+    swagger = swagger_docs()
+    swagger.add_route("POST", "/r", _upload_handler)
+
+    client = await aiohttp_client(swagger._app)
+
+    resp = await client.post("/r", data=_form(id="ten", file=b"content"))
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"body": {"id": "value should be type of int"}}
+
+    resp = await client.post("/r", data=_form(id="10", tag="too long"))
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"body": {"tag": "value length should be less than 5"}}
+
+    resp = await client.post("/r", data=_form(id="10", tag="x" * 21))
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"body": {"tag": "value length should be less than 5"}}
+
+    resp = await client.post("/r", data=_form(id="10", file=b"x" * 17))
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"body": {"file": "value length should be less than 16"}}
+
+    resp = await client.post("/r", data=_form(id="10", file=b"x", attachments=[b"a", b"b", b"c"]))
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"body": {"attachments": "number or items must be less than 2"}}
+
+    resp = await client.post("/r", data=_form(id="10", file=b"x", unknown="value"))
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"body": {"unknown": "additional property not allowed"}}
+
+    resp = await client.post("/r", data=_form(id="10"))
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"body": {"file": "required property"}}
+
+
+async def test_multipart_form_data_spooling(swagger_docs, aiohttp_client):
+    async def handler(request, body: Dict):
+        """
+        ---
+        requestBody:
+          required: true
+          content:
+            multipart/form-data:
+              schema:
+                type: object
+                properties:
+                  file:
+                    type: string
+                    format: binary
+
+        responses:
+          '200':
+            description: OK.
+
+        """
+        file = body["file"].file
+        rolled = file._rolled
+        size = len(file.read())
+        file.close()
+        return web.json_response({"rolled": rolled, "size": size})
+
+    swagger = swagger_docs()
+    swagger.register_media_type_handler("multipart/form-data", MultipartFormDataHandler(spool_threshold=1024))
+    swagger.add_route("POST", "/r", handler)
+
+    client = await aiohttp_client(swagger._app)
+
+    resp = await client.post("/r", data=_form(file=b"x" * 100))
+    assert resp.status == 200
+    assert await resp.json() == {"rolled": False, "size": 100}
+
+    resp = await client.post("/r", data=_form(file=b"x" * 100_000))
+    assert resp.status == 200
+    assert await resp.json() == {"rolled": True, "size": 100_000}
+
+
+async def test_multipart_form_data_limits(aiohttp_client):
+    async def handler(request, body: Dict):
+        """
+        ---
+        requestBody:
+          required: true
+          content:
+            multipart/form-data:
+              schema:
+                type: object
+                properties:
+                  file:
+                    type: string
+                    format: binary
+
+        responses:
+          '200':
+            description: OK.
+        """
+        body["file"].file.close()
+        return web.json_response(sorted(body))
+
+    app = web.Application(client_max_size=1024)
+    swagger = SwaggerDocs(app)
+    swagger.add_route("POST", "/r", handler)
+
+    client = await aiohttp_client(app)
+
+    # files are not kept in memory, so they are not limited by client_max_size
+    resp = await client.post("/r", data=_form(file=b"x" * 2048, a="x" * 500, b="x" * 500))
+    assert resp.status == 200
+    assert await resp.json() == ["a", "b", "file"]
+
+    resp = await client.post("/r", data=_form(file=b"x", a="x" * 500, b="x" * 500, c="x" * 500))
+    assert resp.status == 413
+
+    resp = await client.post("/r", data=_form(file=b"x", tags=["x"] * 1000))
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"body": "number of parts must be less than 1000"}
+
+
+async def test_multipart_form_data_not_object(swagger_docs):
+    async def handler(request, body: Dict):
+        """
+        ---
+        requestBody:
+          required: true
+          content:
+            multipart/form-data:
+              schema:
+                type: string
+
+        responses:
+          '200':
+            description: OK.
+        """
+        return web.json_response({})
+
+    swagger = swagger_docs()
+    with pytest.raises(Exception, match="schema of a multipart/form-data body must be an object"):
+        swagger.add_post("/upload", handler)
+
+
+def test_streaming_handler_without_call():
+    class Handler(StreamingMediaTypeHandler):
+        pass
+
+    with pytest.raises(TypeError):
+        Handler()
@@ -0,0 +1,105 @@
+from aiohttp import web
+
+from aiohttp_swagger3 import NDJSONHandler, NDJSONStream
+
+from .helpers import error_to_json
+
+HEADERS = {"Content-Type": "application/x-ndjson"}
+
+
+async def _ingest(request, body: NDJSONStream):
+    """
+    ---
+    requestBody:
+      required: true
+      content:
+        application/x-ndjson:
+          schema:
+            type: array
+            minItems: 1
+            maxItems: 3
+            items:
+              type: object
+              required:
+                - id
+              properties:
+                id:
+                  type: integer
+
+    responses:
+      '200':
+        description: OK.
+    """
+    items = [item async for item in body]
+    return web.json_response({"items": items, "errors": body.errors})
+
+
+async def test_ndjson(swagger_docs, aiohttp_client):
+    swagger = swagger_docs()
+    swagger.add_route("POST", "/r", _ingest)
+
+    client = await aiohttp_client(swagger._app)
+
+    resp = await client.post("/r", data=b'{"id": 1}\n\n{"id": 2}\n{"id": 3}', headers=HEADERS)
+    assert resp.status == 200
+    assert await resp.json() == {"items": [{"id": 1}, {"id": 2}, {"id": 3}], "errors": {}}
+
+    resp = await client.post("/r", data=b'{"id": 1}\n{"id": "2"}\n', headers=HEADERS)
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"body": {"1": {"id": "value should be type of int"}}}
+
+    resp = await client.post("/r", data=b'{"id": 1}\n{"id":\n', headers=HEADERS)
+    assert resp.status == 400
+    assert "1" in error_to_json(await resp.text())["body"]
+
+    resp = await client.post("/r", data=b'{"id": 1}\n{"id": 2}\n{"id": 3}\n{"id": 4}\n', headers=HEADERS)
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"body": "number or items must be less than 3"}
+
+    resp = await client.post("/r", data=b"\n", headers=HEADERS)
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"body": "number or items must be more than 1"}
+
+
+async def test_ndjson_collect_errors(swagger_docs, aiohttp_client):
+    swagger = swagger_docs()
+    swagger.register_media_type_handler("application/x-ndjson", NDJSONHandler(fail_fast=False, max_line_size=32))
+    swagger.add_route("POST", "/r", _ingest)
+
+    client = await aiohttp_client(swagger._app)
+
+    resp = await client.post("/r", data=b'{"id": 1}\n{}\n{"id": 3}\n', headers=HEADERS)
+    assert resp.status == 200
+    assert await resp.json() == {"items": [{"id": 1}, {"id": 3}], "errors": {"1": {"id": "required property"}}}
+
+    resp = await client.post("/r", data=b'{"id": 1}\n{"id": "' + b"1" * 64 + b'"}\n', headers=HEADERS)
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"body": {"1": "line length should be less than 32"}}
+
+
+async def test_ndjson_item_schema(swagger_docs, aiohttp_client):
+    async def handler(request, body: NDJSONStream):
+        """
+        ---
+        requestBody:
+          required: true
+          content:
+            application/x-ndjson:
+              x-ndjson-item:
+                type: integer
+
+        responses:
+          '200':
+            description: OK.
+
+        """
+        return web.json_response({"sum": sum([item async for item in body])})
+
+    swagger = swagger_docs()
+    swagger.add_route("POST", "/r", handler)
+
+    client = await aiohttp_client(swagger._app)
+
+    resp = await client.post("/r", data=b"1\n2\n3\n", headers=HEADERS)
+    assert resp.status == 200
+    assert await resp.json() == {"sum": 6}
@@ -0,0 +1,187 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict
+
+import pytest
+from aiohttp import web
+
+from aiohttp_swagger3 import ValidatorError
+
+from .helpers import error_to_json
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.calls = 0
+
+    def submit(self, *args, **kwargs):
+        self.calls += 1
+        return super().submit(*args, **kwargs)
+
+
+class RecordingProcessPoolExecutor(ProcessPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        self.sent = []
+
+    def submit(self, fn, *args, **kwargs):
+        self.sent.append(args)
+        return super().submit(fn, *args, **kwargs)
+
+
+async def _handler(request, body: Dict):
+    """
+    ---
+    requestBody:
+      required: true
+      content:
+        application/json:
+          schema:
+            type: object
+            required:
+              - email
+            properties:
+              email:
+                type: string
+                format: email
+              tags:
+                type: array
+                items:
+                  type: string
+
+    responses:
+      '200':
+        description: OK.
+    """
+    return web.json_response(body)
+
+
+async def test_offload_threshold(swagger_docs, aiohttp_client):
+    executor = CountingExecutor()
+    swagger = swagger_docs(offload_threshold=64, offload_executor=executor)
+    swagger.add_route("POST", "/r", _handler)
+    swagger.add_route("POST", "/inline", _handler, offload_threshold=1024 * 1024)
+
+    client = await aiohttp_client(swagger._app)
+
+    body = {"email": "a@b.cd"}
+    resp = await client.post("/r", json=body)
+    assert resp.status == 200
+    assert await resp.json() == body
+    assert executor.calls == 0
+
+    body = {"email": "a@b.cd", "tags": ["tag"] * 20}
+    resp = await client.post("/r", json=body)
+    assert resp.status == 200
+    assert await resp.json() == body
+    assert executor.calls == 1
+
+    resp = await client.post("/r", json={"email": "wrong", "tags": ["tag"] * 20})
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"body": {"email": "value should be valid email"}}
+    assert executor.calls == 2
+
+    resp = await client.post("/r", data=b"{" * 100, headers={"Content-Type": "application/json"})
+    assert resp.status == 400
+    assert "body" in error_to_json(await resp.text())
+    assert executor.calls == 3
+
+    resp = await client.post("/inline", json=body)
+    assert resp.status == 200
+    assert executor.calls == 3
+    executor.shutdown()
+
+
+async def test_offload_process_pool(swagger_docs, aiohttp_client):
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        swagger = swagger_docs(offload_threshold=0, offload_executor=executor)
+        swagger.add_route("POST", "/r", _handler)
+
+        client = await aiohttp_client(swagger._app)
+
+        body = {"email": "a@b.cd", "tags": ["a", "b"]}
+        resp = await client.post("/r", json=body)
+        assert resp.status == 200
+        assert await resp.json() == body
+
+        resp = await client.post("/r", json={"email": "wrong"})
+        assert resp.status == 400
+        assert error_to_json(await resp.text()) == {"body": {"email": "value should be valid email"}}
+
+
+async def test_offload_process_pool_sends_validator_once(swagger_docs, aiohttp_client):
+    with RecordingProcessPoolExecutor() as executor:
+        swagger = swagger_docs(offload_threshold=0, offload_executor=executor)
+        swagger.add_route("POST", "/r", _handler)
+
+        client = await aiohttp_client(swagger._app)
+
+        body = {"email": "a@b.cd"}
+        for _ in range(3):
+            resp = await client.post("/r", json=body)
+            assert resp.status == 200
+            assert await resp.json() == body
+
+        # the spawned worker misses the validator once, then only the key and the body are sent
+        assert [len(args) for args in executor.sent] == [3, 4, 3, 3]
+
+
+async def test_offload_process_pool_unpicklable(swagger_docs):
+    def code_validator(value: str) -> None:
+        if value != "code":
+            raise ValidatorError("value should be code")
+
+    async def handler(request, body: Dict):
+        """
+        ---
+        requestBody:
+          required: true
+          content:
+            application/json:
+              schema:
+                type: string
+                format: code
+
+        responses:
+          '200':
+            description: OK.
+        """
+        return web.json_response(body)
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        swagger = swagger_docs(offload_threshold=0, offload_executor=executor)
+        swagger.register_string_format_validator("code", code_validator)
+        with pytest.raises(Exception, match="validator of application/json body cannot be sent to offload_executor"):
+            swagger.add_route("POST", "/r", handler)
+
+
+@pytest.mark.parametrize("threshold", [None, 0])
+async def test_offload_urlencoded(swagger_docs, aiohttp_client, threshold):
+    async def handler(request, body: Dict):
+        """
+        ---
+        requestBody:
+          required: true
+          content:
+            application/x-www-form-urlencoded:
+              schema:
+                type: object
+                properties:
+                  number:
+                    type: integer
+
+        responses:
+          '200':
+            description: OK.
+        """
+        return web.json_response(body)
+
+    swagger = swagger_docs(offload_threshold=threshold)
+    swagger.add_route("POST", "/r", handler)
+
+    client = await aiohttp_client(swagger._app)
+
+    resp = await client.post("/r", data={"number": "10"})
+    assert resp.status == 200
+    assert await resp.json() == {"number": 10}
@@ -0,0 +1,85 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="fork is not available")
+
+SERVER = """
+import os
+import sys
+
+from aiohttp import web
+
+from aiohttp_swagger3 import SwaggerDocs, run_prefork
+
+
+async def handler(request, number: int):
+    '''
+    ---
+    parameters:
+      - name: number
+        in: query
+        required: true
+        schema:
+          type: integer
+
+    responses:
+      '200':
+        description: OK.
+    '''
+    return web.json_response({"number": number, "pid": os.getpid()})
+
+
+def make_app():
+    app = web.Application()
+    swagger = SwaggerDocs(app, validation_only=True)
+    swagger.add_get("/r", handler)
+    return app
+
+
+app = make_app() if sys.argv[2] == "preload" else make_app
+run_prefork(app, workers=2, host="127.0.0.1", port=int(sys.argv[1]), print=None)
+"""
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get(url):
+    with urllib.request.urlopen(url, timeout=1) as resp:
+        return resp.status, resp.read()
+
+
+@pytest.mark.parametrize("mode", ["preload", "factory"])
+def test_run_prefork(mode):
+    port = _free_port()
+    proc = subprocess.Popen([sys.executable, "-c", SERVER, str(port), mode])
+    try:
+        url = f"http://127.0.0.1:{port}/r?number="
+        for _ in range(100):
+            try:
+                status, body = _get(f"{url}1")
+                break
+            except OSError:
+                time.sleep(0.1)
+        else:
+            pytest.fail("server did not start")
+        assert status == 200
+        assert b'"number": 1' in body
+
+        with pytest.raises(urllib.error.HTTPError) as exc:
+            _get(f"{url}x")
+        assert exc.value.code == 400
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=10) == 0
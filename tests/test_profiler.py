@@ -0,0 +1,76 @@
+import fastjsonschema
+import yaml
+
+from aiohttp_swagger3 import swagger_route, validators
+from aiohttp_swagger3.__main__ import main
+from aiohttp_swagger3.profiler import StartupProfiler, build_spec_file_app
+
+
+def test_startup_profiler():
+    originals = (yaml.safe_load, fastjsonschema.compile, validators.schema_to_validator)
+    with StartupProfiler() as profiler:
+        build_spec_file_app("tests/testdata/petstore.yaml")
+    assert (yaml.safe_load, fastjsonschema.compile, validators.schema_to_validator) == originals
+    assert swagger_route.schema_to_validator is validators.schema_to_validator
+
+    assert profiler.phases["yaml load"].calls == 1
+    assert profiler.phases["meta-schema compile"].calls == 1
+    assert profiler.phases["spec validation"].calls == 1
+    assert profiler.phases["validators"].calls == 3
+    assert profiler.phases["UI registration"].calls == 1
+    assert profiler.phases["meta-schema compile"].memory > 0
+    assert set(profiler.operations) == {"GET /pets", "POST /pets", "GET /pets/{pet_id}"}
+    assert profiler.schemas["#/components/schemas/Pet"].calls == 1
+    assert profiler.total.seconds >= sum(m.seconds for m in profiler.phases.values())
+
+    report = profiler.report(top=2)
+    assert "top 2 operations" in report
+    assert "#/components/schemas/Pet" in report
+
+
+def test_profile_spec_file(capsys):
+    main(["profile", "tests/testdata/petstore.yaml", "--ui", "none", "--no-memory", "--top", "1"])
+    out = capsys.readouterr().out
+    assert "meta-schema compile" in out
+    assert "top 1 operations" in out
+    assert "UI registration                                        0" in out
+
+
+def test_profile_app(tmp_path, monkeypatch, capsys):
+    (tmp_path / "profiled_app.py").write_text(
+        '''
+from aiohttp import web
+
+from aiohttp_swagger3 import SwaggerDocs
+
+
+async def handler(request, q: int):
+    """
+    ---
+    parameters:
+      - name: q
+        in: query
+        schema:
+          type: integer
+    responses:
+      '200':
+        description: OK.
+    """
+
+
+def create_app():
+    app = web.Application()
+    swagger = SwaggerDocs(app)
+    swagger.add_get("/a", handler)
+    swagger.add_post("/b", handler)
+    return app
+'''
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    main(["profile", "--app", "profiled_app:create_app"])
+    out = capsys.readouterr().out
+    assert "GET /a" in out
+    assert "POST /b" in out
+    assert "HEAD /a" in out
+    # the initial spec and every route added by SwaggerDocs validate the whole spec
+    assert "spec validation                                        4" in out
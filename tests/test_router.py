@@ -0,0 +1,126 @@
+import pathlib
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import make_mocked_request
+
+from aiohttp_swagger3 import SpecRouter, SwaggerFile
+
+# aiohttp deprecates the router argument, the only way to use SpecRouter
+pytestmark = pytest.mark.filterwarnings("ignore:router argument is deprecated:DeprecationWarning")
+
+PATHS = [
+    "/",
+    "/pets",
+    "/pets/",
+    "/pets/1",
+    "/pets/mine",
+    "/pets/1/toys",
+    "/pets/1/toys/2",
+    "/pets/1/toys/2/",
+    "/pets//toys",
+    "/owners/1/pets/mine",
+    "/owners/1/pets/2",
+    "/files/a/b.txt",
+    "/static/test_router.py",
+    "/numbers/12",
+    "/numbers/ab",
+    "/report.json",
+    "/sub/x",
+    "/sub/pets/1",
+    "/a/b/c",
+    "/unknown",
+    "/pets/%2F",
+    "/pets/a%2Fb",
+    "/pets/a%2Fb/toys/2",
+]
+
+
+async def handler(request):
+    return web.Response()
+
+
+def _build(router):
+    app = web.Application(router=router) if router is not None else web.Application()
+    app.router.add_get("/", handler)
+    app.router.add_get("/pets", handler)
+    app.router.add_post("/pets", handler)
+    app.router.add_get("/pets/{pet_id}", handler, name="pet")
+    app.router.add_get("/pets/mine", handler)
+    app.router.add_get("/pets/{pet_id}/toys/{toy_id}", handler)
+    # the same prefix before the first variable, aiohttp resolves them in order of registration
+    app.router.add_get("/owners/{owner_id}/pets/mine", handler)
+    app.router.add_get("/owners/{owner_id}/pets/{pet_id}", handler)
+    app.router.add_get("/files/{tail:.*}", handler)
+    app.router.add_static("/static", pathlib.Path(__file__).parent)
+    app.router.add_get("/numbers/{n:\\d+}", handler)
+    app.router.add_get("/report.{format}", handler)
+    app.router.add_get("/a/{x}/c", handler)
+    app.router.add_get("/{z}/b/c", handler)
+    sub = web.Application()
+    sub.router.add_get("/x", handler)
+    sub.router.add_get("/pets/{pet_id}", handler)
+    app.add_subapp("/sub", sub)
+    app.freeze()
+    return app
+
+
+def _describe(match_info):
+    if match_info.http_exception is not None:
+        return match_info.http_exception.status
+    return match_info.route.resource.canonical, dict(match_info)
+
+
+@pytest.mark.parametrize("method", ["GET", "POST"])
+async def test_same_as_url_dispatcher(method):
+    expected_app = _build(None)
+    app = _build(SpecRouter())
+    for path in PATHS:
+        expected = await expected_app.router.resolve(make_mocked_request(method, path, app=expected_app))
+        match_info = await app.router.resolve(make_mocked_request(method, path, app=app))
+        assert _describe(match_info) == _describe(expected), path
+
+
+async def test_segment_without_variable_wins():
+    app = web.Application(router=SpecRouter())
+    app.router.add_get("/owners/{owner_id}/pets/{pet_id}", handler)
+    app.router.add_get("/owners/{owner_id}/pets/mine", handler)
+    app.freeze()
+    match_info = await app.router.resolve(make_mocked_request("GET", "/owners/1/pets/mine", app=app))
+    assert _describe(match_info) == ("/owners/{owner_id}/pets/mine", {"owner_id": "1"})
+    match_info = await app.router.resolve(make_mocked_request("GET", "/owners/1/cats/mine", app=app))
+    assert _describe(match_info) == 404
+
+
+async def test_quoted_slash(aiohttp_client):
+    async def get_one_pet(request):
+        return web.json_response(dict(request.match_info))
+
+    app = web.Application(router=SpecRouter())
+    app.router.add_get("/pets/{pet_id}", get_one_pet)
+
+    client = await aiohttp_client(app)
+    resp = await client.get("/pets/a%2Fb")
+    assert resp.status == 200
+    assert await resp.json() == {"pet_id": "a/b"}
+
+
+async def test_spec_router(aiohttp_client):
+    async def get_one_pet(request, pet_id: int):
+        return web.json_response({"id": pet_id})
+
+    app = web.Application(router=SpecRouter())
+    swagger = SwaggerFile(app, "tests/testdata/petstore.yaml")
+    swagger.add_routes([web.get("/pets/{pet_id}", get_one_pet, name="pet")])
+
+    client = await aiohttp_client(app)
+    resp = await client.get("/pets/1")
+    assert resp.status == 200
+    assert await resp.json() == {"id": 1}
+
+    resp = await client.get("/pets/a")
+    assert resp.status == 400
+
+    resp = await client.post("/pets/1")
+    assert resp.status == 405
+    assert app.router["pet"].url_for(pet_id="2").path == "/pets/2"
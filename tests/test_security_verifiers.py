@@ -0,0 +1,204 @@
+import asyncio
+import json
+import time
+
+import pytest
+from aiohttp import web
+
+from aiohttp_swagger3 import JWTVerifier, ValidatorError
+
+from .helpers import error_to_json
+
+
+async def _handler(request):
+    """
+    ---
+    security:
+      - bearerAuth: []
+      - apiKeyHeaderAuth: []
+
+    responses:
+      '200':
+        description: OK.
+
+    """
+    return web.json_response({k: v for k, v in request["data"].items() if k in ("bearerAuth", "apiKeyHeaderAuth")})
+
+
+async def test_security_verifier(swagger_docs_with_components, aiohttp_client):
+    calls = []
+
+    async def verify(token):
+        calls.append(token)
+        await asyncio.sleep(0.01)
+        if token != "good":
+            raise ValidatorError("invalid token")
+        return {"sub": "user"}
+
+    swagger = swagger_docs_with_components()
+    swagger.register_security_verifier("bearerAuth", verify)
+    swagger.register_security_verifier("apiKeyHeaderAuth", lambda key: {"key": key})
+    swagger.add_route("GET", "/r", _handler)
+
+    client = await aiohttp_client(swagger._app)
+
+    headers = {"Authorization": "Bearer good"}
+    responses = await asyncio.gather(*(client.get("/r", headers=headers) for _ in range(5)))
+    for resp in responses:
+        assert resp.status == 200
+        assert await resp.json() == {"bearerAuth": {"sub": "user"}}
+    assert calls == ["good"]
+
+    resp = await client.get("/r", headers=headers)
+    assert resp.status == 200
+    assert calls == ["good"]
+
+    resp = await client.get("/r", headers={"Authorization": "Bearer bad"})
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"authorization": "invalid token"}
+    resp = await client.get("/r", headers={"Authorization": "Bearer bad"})
+    assert resp.status == 400
+    assert calls == ["good", "bad"]
+
+    resp = await client.get("/r", headers={"Authorization": "Bearer bad", "X-API-KEY": "key"})
+    assert resp.status == 200
+    assert await resp.json() == {"apiKeyHeaderAuth": {"key": "key"}}
+
+
+async def test_security_verifier_rejects_every_alternative(swagger_docs_with_components, aiohttp_client):
+    def verify_token(token):
+        raise ValidatorError("invalid token")
+
+    def verify_key(key):
+        if key != "good":
+            raise ValidatorError("invalid key")
+        return {"key": key}
+
+    swagger = swagger_docs_with_components()
+    swagger.register_security_verifier("bearerAuth", verify_token)
+    swagger.register_security_verifier("apiKeyHeaderAuth", verify_key)
+    swagger.add_route("GET", "/r", _handler)
+
+    client = await aiohttp_client(swagger._app)
+
+    resp = await client.get("/r", headers={"Authorization": "Bearer bad", "X-API-KEY": "bad"})
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"x-api-key": "invalid key"}
+
+    resp = await client.get("/r", headers={"Authorization": "Basic dXNlcjpwYXNz", "X-API-KEY": "bad"})
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"x-api-key": "invalid key"}
+
+    resp = await client.get("/r", headers={"Authorization": "Basic dXNlcjpwYXNz"})
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"authorization": "no auth has been provided"}
+
+    resp = await client.get("/r", headers={"Authorization": "Bearer bad", "X-API-KEY": "good"})
+    assert resp.status == 200
+    assert await resp.json() == {"apiKeyHeaderAuth": {"key": "good"}}
+
+
+async def test_security_verifier_rejects_every_alternative_collect_all(swagger_docs_with_components, aiohttp_client):
+    def verify_key(key):
+        if key != "good":
+            raise ValidatorError("invalid key")
+        return {"key": key}
+
+    swagger = swagger_docs_with_components(collect_all_credentials=True)
+    swagger.register_security_verifier("bearerAuth", lambda token: {"sub": token})
+    swagger.register_security_verifier("apiKeyHeaderAuth", verify_key)
+    swagger.add_route("GET", "/r", _handler)
+
+    client = await aiohttp_client(swagger._app)
+
+    resp = await client.get("/r", headers={"Authorization": "Basic dXNlcjpwYXNz", "X-API-KEY": "bad"})
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"x-api-key": "invalid key"}
+
+    resp = await client.get("/r", headers={"Authorization": "Basic dXNlcjpwYXNz"})
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"authorization": "no auth has been provided"}
+
+    resp = await client.get("/r", headers={"Authorization": "Bearer token", "X-API-KEY": "good"})
+    assert resp.status == 200
+    assert await resp.json() == {"bearerAuth": {"sub": "token"}, "apiKeyHeaderAuth": {"key": "good"}}
+
+
+async def test_security_verifier_single_scheme(swagger_docs_with_components, aiohttp_client):
+    async def handler(request):
+        """
+        ---
+        security:
+          - bearerAuth: []
+
+        responses:
+          '200':
+            description: OK.
+
+        """
+        return web.json_response(request["data"]["bearerAuth"])
+
+    def verify(token):
+        if token != "good":
+            raise ValidatorError("invalid token")
+        return {"sub": "user"}
+
+    swagger = swagger_docs_with_components()
+    swagger.register_security_verifier("bearerAuth", verify, ttl=0)
+    swagger.add_route("GET", "/r", handler)
+
+    client = await aiohttp_client(swagger._app)
+
+    resp = await client.get("/r", headers={"Authorization": "Bearer good"})
+    assert resp.status == 200
+    assert await resp.json() == {"sub": "user"}
+
+    resp = await client.get("/r", headers={"Authorization": "Bearer bad"})
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"authorization": "invalid token"}
+
+
+async def test_jwt_verifier(swagger_docs_with_components, aiohttp_client, tmp_path):
+    jwt = pytest.importorskip("jwt")
+    rsa = pytest.importorskip("cryptography.hazmat.primitives.asymmetric.rsa")
+
+    async def handler(request):
+        """
+        ---
+        security:
+          - bearerAuth: []
+
+        responses:
+          '200':
+            description: OK.
+
+        """
+        return web.json_response({"sub": request["data"]["bearerAuth"]["sub"]})
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(key.public_key()))
+    jwk.update({"kid": "k1", "alg": "RS256", "use": "sig"})
+    jwks_file = tmp_path / "jwks.json"
+    jwks_file.write_text(json.dumps({"keys": [jwk]}))
+
+    swagger = swagger_docs_with_components()
+    swagger.register_security_verifier("bearerAuth", JWTVerifier(str(jwks_file), audience="api"))
+    swagger.add_route("GET", "/r", handler)
+
+    client = await aiohttp_client(swagger._app)
+
+    claims = {"sub": "user", "aud": "api", "exp": int(time.time()) + 60}
+    token = jwt.encode(claims, key, algorithm="RS256", headers={"kid": "k1"})
+    resp = await client.get("/r", headers={"Authorization": f"Bearer {token}"})
+    assert resp.status == 200
+    assert await resp.json() == {"sub": "user"}
+
+    token = jwt.encode({**claims, "aud": "other"}, key, algorithm="RS256", headers={"kid": "k1"})
+    resp = await client.get("/r", headers={"Authorization": f"Bearer {token}"})
+    assert resp.status == 400
+    assert error_to_json(await resp.text())["authorization"].startswith("invalid token")
+
+    token = jwt.encode(claims, key, algorithm="RS256", headers={"kid": "k2"})
+    resp = await client.get("/r", headers={"Authorization": f"Bearer {token}"})
+    assert resp.status == 400
+    assert error_to_json(await resp.text()) == {"authorization": "unknown signing key"}
@@ -1,6 +1,8 @@
+import pytest
 from aiohttp import web
 
 from aiohttp_swagger3 import ValidatorError
+from aiohttp_swagger3.validators import String
 
 from .helpers import error_to_json
 
@@ -118,3 +120,61 @@ async def test_override_default_string_format(swagger_docs, aiohttp_client):
     assert resp.status == 400
     error = error_to_json(await resp.text())
     assert error == {"ip": "invalid ipv4 address"}
+
+
+async def _code_handler(request, code: str):
+    """
+    ---
+    parameters:
+
+      - name: code
+        in: query
+        required: true
+        schema:
+          type: string
+          format: code
+
+    responses:
+      '200':
+        description: OK.
+
+    """
+    return web.json_response({"code": code})
+
+
+async def test_string_formats_of_instances(swagger_docs, aiohttp_client):
+    def prefix_validator(prefix: str):
+        def validator(value: str) -> None:
+            if not value.startswith(prefix):
+                raise ValidatorError(f"value should start with {prefix}")
+
+        return validator
+
+    main_app = web.Application()
+    for prefix in ("a", "b"):
+        swagger = swagger_docs()
+        swagger.register_string_format_validator("code", prefix_validator(prefix))
+        swagger.add_route("GET", "/r", _code_handler)
+        main_app.add_subapp(f"/{prefix}", swagger._app)
+
+    client = await aiohttp_client(main_app)
+
+    for prefix, other in (("a", "b"), ("b", "a")):
+        resp = await client.get(f"/{prefix}/r", params={"code": f"{prefix}1"})
+        assert resp.status == 200
+        assert await resp.json() == {"code": f"{prefix}1"}
+
+        resp = await client.get(f"/{prefix}/r", params={"code": f"{other}1"})
+        assert resp.status == 400
+        assert error_to_json(await resp.text()) == {"code": f"value should start with {prefix}"}
+
+
+async def test_register_string_format_after_routes(swagger_docs):
+    swagger = swagger_docs()
+    swagger.add_route("GET", "/r", _code_handler)
+    with pytest.raises(Exception, match="string format validators must be registered before routes are added"):
+        swagger.register_string_format_validator("code", lambda value: None)
+
+
+def test_string_format_outside_of_instance():
+    assert String(pattern=None, format="email").format_validator is None
@@ -0,0 +1,174 @@
+from typing import Any, Dict, List, Optional
+
+import pytest
+from aiohttp import web
+
+from aiohttp_swagger3 import OpenTelemetryTracer, Tracer
+
+
+class RecordingTracer(Tracer):
+    __slots__ = ("spans",)
+
+    def __init__(self) -> None:
+        self.spans: List[Dict[str, Any]] = []
+
+    def start_span(self, name: str, attributes: Dict[str, Any], parent: Optional[Any] = None) -> Any:
+        span = {"name": name, "parent": parent and parent["name"], "attributes": dict(attributes), "ended": False}
+        self.spans.append(span)
+        return span
+
+    def end_span(self, span: Any, attributes: Dict[str, Any]) -> None:
+        span["attributes"].update(attributes)
+        span["ended"] = True
+
+    def by_name(self) -> Dict[str, Dict[str, Any]]:
+        return {span["name"]: span for span in self.spans}
+
+
+async def _handler(request, q: int, body: Dict):
+    """
+    ---
+    operationId: createItem
+    parameters:
+      - name: q
+        in: query
+        required: true
+        schema:
+          type: integer
+      - name: id
+        in: path
+        required: true
+        schema:
+          type: integer
+
+    requestBody:
+      required: true
+      content:
+        application/json:
+          schema:
+            type: object
+            required:
+              - name
+            properties:
+              name:
+                type: string
+
+    responses:
+      '200':
+        description: OK.
+    """
+    return web.json_response()
+
+
+async def test_tracing_spans(swagger_docs, aiohttp_client):
+    tracer = RecordingTracer()
+    swagger = swagger_docs(tracer=tracer)
+    swagger.add_route("POST", "/r/{id}", _handler)
+
+    client = await aiohttp_client(swagger._app)
+
+    resp = await client.post("/r/1", params={"q": "1"}, json={"name": "a"})
+    assert resp.status == 200
+    assert [span["name"] for span in tracer.spans] == [
+        "openapi.validate",
+        "openapi.validate.query",
+        "openapi.validate.body",
+        "openapi.validate.body.decode",
+        "openapi.validate.body.schema",
+        "openapi.validate.path",
+    ]
+    spans = tracer.by_name()
+    assert all(span["ended"] for span in tracer.spans)
+    assert spans["openapi.validate"]["parent"] is None
+    assert spans["openapi.validate.query"]["parent"] == "openapi.validate"
+    assert spans["openapi.validate.body.decode"]["parent"] == "openapi.validate.body"
+    assert spans["openapi.validate.body.schema"]["parent"] == "openapi.validate.body"
+    assert spans["openapi.validate"]["attributes"] == {
+        "openapi.operation_id": "createItem",
+        "http.route": "/r/{id}",
+        "http.request.method": "POST",
+        "openapi.validation.error_count": 0,
+    }
+    assert spans["openapi.validate.body.decode"]["attributes"]["openapi.media_type"] == "application/json"
+
+    tracer.spans.clear()
+    resp = await client.post("/r/x", params={"q": "y"}, json={})
+    assert resp.status == 400
+    spans = tracer.by_name()
+    assert spans["openapi.validate"]["attributes"]["openapi.validation.error_count"] == 3
+    assert spans["openapi.validate.query"]["attributes"]["openapi.validation.error_count"] == 1
+    assert spans["openapi.validate.body"]["attributes"]["openapi.validation.error_count"] == 1
+    assert spans["openapi.validate.body.decode"]["attributes"]["openapi.validation.error_count"] == 0
+    assert spans["openapi.validate.body.schema"]["attributes"]["openapi.validation.error_count"] == 1
+    assert spans["openapi.validate.path"]["attributes"]["openapi.validation.error_count"] == 1
+
+    tracer.spans.clear()
+    resp = await client.post("/r/1", params={"q": "1"}, data="{", headers={"Content-Type": "application/json"})
+    assert resp.status == 400
+    spans = tracer.by_name()
+    assert spans["openapi.validate.body.decode"]["attributes"]["openapi.validation.error_count"] == 1
+    assert "openapi.validate.body.schema" not in spans
+
+
+async def test_tracing_auth_failure(swagger_docs_with_components, aiohttp_client):
+    async def handler(request):
+        """
+        ---
+        security:
+          - bearerAuth: []
+
+        responses:
+          '200':
+            description: OK.
+        """
+        return web.json_response()
+
+    tracer = RecordingTracer()
+    swagger = swagger_docs_with_components(tracer=tracer)
+    swagger.add_route("GET", "/r", handler)
+
+    client = await aiohttp_client(swagger._app)
+
+    resp = await client.get("/r")
+    assert resp.status == 400
+    assert [span["name"] for span in tracer.spans] == ["openapi.validate", "openapi.validate.auth"]
+    assert all(span["ended"] for span in tracer.spans)
+    assert all(span["attributes"]["openapi.validation.error_count"] == 1 for span in tracer.spans)
+
+
+def test_tracer_without_end_span():
+    class PartialTracer(Tracer):
+        def start_span(self, name: str, attributes: Dict[str, Any], parent: Optional[Any] = None) -> Any:
+            return None
+
+    with pytest.raises(TypeError):
+        PartialTracer()
+
+
+async def test_opentelemetry_tracer(swagger_docs, aiohttp_client):
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+    from opentelemetry.trace import StatusCode
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+
+    swagger = swagger_docs(tracer=OpenTelemetryTracer(provider.get_tracer("test")))
+    swagger.add_route("POST", "/r/{id}", _handler)
+
+    client = await aiohttp_client(swagger._app)
+
+    resp = await client.post("/r/x", params={"q": "1"}, json={"name": "a"})
+    assert resp.status == 400
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    root = spans["openapi.validate"]
+    assert root.parent is None
+    assert root.attributes["openapi.operation_id"] == "createItem"
+    assert root.status.status_code == StatusCode.ERROR
+    assert spans["openapi.validate.path"].parent.span_id == root.context.span_id
+    assert spans["openapi.validate.path"].status.status_code == StatusCode.ERROR
+    assert spans["openapi.validate.query"].status.status_code == StatusCode.UNSET
+    assert spans["openapi.validate.body.schema"].parent.span_id == spans["openapi.validate.body"].context.span_id
@@ -0,0 +1,165 @@
+import uuid
+
+import pytest
+from aiohttp import web
+
+from aiohttp_swagger3 import SpecRouter, SwaggerDocs
+from aiohttp_swagger3.router import segment_pattern
+from aiohttp_swagger3.validators import String
+
+# aiohttp deprecates the router argument, the only way to use SpecRouter
+pytestmark = pytest.mark.filterwarnings("ignore:router argument is deprecated:DeprecationWarning")
+
+
+async def get_one_pet(request, pet_id: int):
+    return web.json_response({"id": pet_id})
+
+
+async def get_item(request, item_id: int):
+    """
+    ---
+    parameters:
+      - name: item_id
+        in: path
+        required: true
+        schema:
+          type: integer
+    responses:
+      '200':
+        description: OK.
+    """
+    return web.json_response({"id": item_id})
+
+
+async def get_item_by_kind(request, kind: str):
+    """
+    ---
+    parameters:
+      - name: kind
+        in: path
+        required: true
+        schema:
+          type: string
+          enum: [new, used]
+    responses:
+      '200':
+        description: OK.
+    """
+    return web.json_response({"kind": kind})
+
+
+async def get_order(request, order_id: str, code: str):
+    """
+    ---
+    parameters:
+      - name: order_id
+        in: path
+        required: true
+        schema:
+          type: string
+          format: uuid
+      - name: code
+        in: path
+        required: true
+        schema:
+          type: string
+          pattern: '^[A-Z]{2}[0-9]+$'
+    responses:
+      '200':
+        description: OK.
+    """
+    return web.json_response({"order_id": order_id, "code": code})
+
+
+async def test_spec_file(swagger_file, aiohttp_client):
+    swagger = swagger_file(typed_path_params=True)
+    route = swagger.add_get("/pets/{pet_id}", get_one_pet, name="pet")
+    assert route.resource.get_info()["pattern"].pattern == "/pets/(?P<pet_id>\\s*[+-]?\\d(?:_?\\d)*\\s*)"
+
+    client = await aiohttp_client(swagger._app)
+    for path, pet_id in (("/pets/-1", -1), ("/pets/+5", 5), ("/pets/1_0", 10), ("/pets/%201", 1)):
+        resp = await client.get(path)
+        assert resp.status == 200, path
+        assert await resp.json() == {"id": pet_id}
+
+    for path in ("/pets/a", "/pets/1__0", "/pets/_1"):
+        resp = await client.get(path)
+        assert resp.status == 404, path
+    resp = await client.head("/pets/a")
+    assert resp.status == 404
+    assert swagger._app.router["pet"].url_for(pet_id="2").path == "/pets/2"
+
+
+async def test_spec_file_untyped(swagger_file, aiohttp_client):
+    swagger = swagger_file()
+    swagger.add_get("/pets/{pet_id}", get_one_pet)
+
+    client = await aiohttp_client(swagger._app)
+    resp = await client.get("/pets/a")
+    assert resp.status == 400
+
+
+@pytest.mark.parametrize("router", [None, SpecRouter])
+async def test_disambiguation(router, aiohttp_client):
+    app = web.Application() if router is None else web.Application(router=router())
+    swagger = SwaggerDocs(app, typed_path_params=True)
+    swagger.add_routes(
+        [
+            web.get("/items/{item_id}", get_item),
+            web.get("/items/{kind}", get_item_by_kind),
+            web.get("/orders/{order_id}/{code}", get_order),
+        ]
+    )
+
+    client = await aiohttp_client(app)
+    resp = await client.get("/items/10")
+    assert resp.status == 200
+    assert await resp.json() == {"id": 10}
+
+    resp = await client.get("/items/used")
+    assert resp.status == 200
+    assert await resp.json() == {"kind": "used"}
+
+    resp = await client.get("/items/old")
+    assert resp.status == 404
+
+    order_id = str(uuid.uuid4())
+    resp = await client.get(f"/orders/{order_id}/AB12")
+    assert resp.status == 200
+    assert await resp.json() == {"order_id": order_id, "code": "AB12"}
+
+    for path in (f"/orders/{order_id}/ab12", f"/orders/{order_id}/AB", "/orders/1/AB12"):
+        resp = await client.get(path)
+        assert resp.status == 404, path
+
+    resp = await client.post("/items/10")
+    assert resp.status == 405
+
+
+def test_spec_router_indexes_typed_variables():
+    app = web.Application(router=SpecRouter())
+    swagger = SwaggerDocs(app, typed_path_params=True)
+    swagger.add_get("/items/{item_id}", get_item)
+    app.freeze()
+    assert not app.router._opaque
+    assert app.router._trie.static["items"].variable.resources
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [
+        "[a-z]+",
+        "^[a-z]+",
+        "^a$|^b$",
+        "^a|b$",
+        "^a\\$",
+        "(?i)^a$",
+        "^a{1}}$",
+    ],
+)
+def test_pattern_not_used(pattern):
+    assert segment_pattern(String(pattern=pattern)) is None
+
+
+def test_pattern():
+    assert segment_pattern(String(pattern="^(a|b)[0-9]{2,}$")) == "(?=(?:(a|b)[0-9]{2,})(?:/|$))[^/]+"
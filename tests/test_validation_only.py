@@ -0,0 +1,82 @@
+from typing import Dict
+
+import pytest
+from aiohttp import web
+
+from aiohttp_swagger3.context import COMPONENTS
+from aiohttp_swagger3.routes import _SWAGGER_SPECIFICATION
+
+
+async def get_one_pet(request, pet_id: int):
+    return web.json_response({"id": pet_id})
+
+
+async def create_pet(request, body: Dict):
+    return web.json_response(body, status=201)
+
+
+async def test_spec_file_validation_only(swagger_file, aiohttp_client):
+    swagger = swagger_file(validation_only=True)
+    swagger.add_routes([web.get("/pets/{pet_id}", get_one_pet), web.post("/pets", create_pet)])
+    assert _SWAGGER_SPECIFICATION not in swagger._app
+    assert COMPONENTS.get(None) is None
+    assert swagger.spec["paths"]
+
+    client = await aiohttp_client(swagger._app)
+    assert swagger.spec_released
+    assert swagger.spec == {}
+
+    resp = await client.get("/pets/1")
+    assert resp.status == 200
+    assert await resp.json() == {"id": 1}
+
+    resp = await client.get("/pets/a")
+    assert resp.status == 400
+
+    resp = await client.post("/pets", json={"id": 10, "name": "pet"})
+    assert resp.status == 201
+
+    resp = await client.post("/pets", json={"id": 10})
+    assert resp.status == 400
+
+    with pytest.raises(Exception, match="routes cannot be added after the spec is released"):
+        swagger.add_get("/pets", get_one_pet)
+
+
+async def test_docs_validation_only(swagger_docs, aiohttp_client):
+    async def handler(request, q: int):
+        """
+        ---
+        parameters:
+          - name: q
+            in: query
+            required: true
+            schema:
+              type: integer
+        responses:
+          '200':
+            description: OK.
+        """
+        return web.json_response({"q": q})
+
+    swagger = swagger_docs(validation_only=True)
+    swagger.add_get("/r", handler)
+    # released before workers are forked
+    swagger.release_spec()
+    assert _SWAGGER_SPECIFICATION not in swagger._app
+    assert not hasattr(swagger, "spec_validate")
+    with pytest.raises(Exception, match="routes cannot be added after the spec is released"):
+        swagger.add_post("/r", handler)
+
+    client = await aiohttp_client(swagger._app)
+    resp = await client.get("/r", params={"q": "10"})
+    assert resp.status == 200
+    assert await resp.json() == {"q": 10}
+
+    resp = await client.get("/r")
+    assert resp.status == 400
+
+
+async def test_validation_only_without_ui(swagger_file, swagger_ui_settings):
+    with pytest.raises(Exception, match="UI cannot be served in validation only mode"):
+        swagger_file(validation_only=True, swagger_ui_settings=swagger_ui_settings())
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Dict
+
+from aiohttp import web
+
+from aiohttp_swagger3 import ValidationWatchdog
+
+
+def _slow(value: str) -> None:
+    time.sleep(0.01)
+
+
+async def _handler(request, body: Dict):
+    """
+    ---
+    parameters:
+      - name: q
+        in: query
+        schema:
+          type: array
+          items:
+            type: string
+            format: slow
+
+    requestBody:
+      required: true
+      content:
+        application/json:
+          schema:
+            type: object
+            properties:
+              items:
+                type: array
+                items:
+                  type: object
+                  properties:
+                    fast:
+                      type: string
+                    slow:
+                      type: string
+                      format: slow
+
+    responses:
+      '200':
+        description: OK.
+    """
+    return web.json_response()
+
+
+async def test_validation_watchdog(swagger_docs, aiohttp_client, caplog):
+    swagger = swagger_docs(validation_watchdog=ValidationWatchdog(0.005, interval=0))
+    swagger.register_string_format_validator("slow", _slow)
+    swagger.add_route("POST", "/r", _handler)
+
+    client = await aiohttp_client(swagger._app)
+
+    with caplog.at_level(logging.WARNING, logger="aiohttp_swagger3"):
+        resp = await client.post("/r", json={"items": [{"fast": "a"}, {"fast": "b", "slow": "c"}]})
+        assert resp.status == 200
+        resp = await client.post("/r", params={"q": "a,b"}, json={})
+        assert resp.status == 200
+        resp = await client.post("/r", json={})
+        assert resp.status == 200
+
+    assert len(caplog.records) == 2
+    report = caplog.records[0].slow_validation
+    assert report["operation"] == "POST /r"
+    assert report["phase"] == "body"
+    assert report["path"] == "body/items/1/slow"
+    assert report["validator"] == "String"
+    assert report["duration"] >= 0.005
+    assert report["body_size"] > 0
+    assert report["suppressed"] == 0
+
+    report = caplog.records[1].slow_validation
+    assert report["phase"] == "query"
+    assert report["path"] in ("query/q/0", "query/q/1")
+
+
+async def test_validation_watchdog_rate_limit(swagger_docs, aiohttp_client, caplog):
+    watchdog = ValidationWatchdog(0.005, interval=3600)
+    swagger = swagger_docs(validation_watchdog=watchdog)
+    swagger.register_string_format_validator("slow", _slow)
+    swagger.add_route("POST", "/r", _handler)
+
+    client = await aiohttp_client(swagger._app)
+
+    with caplog.at_level(logging.WARNING, logger="aiohttp_swagger3"):
+        for _ in range(3):
+            resp = await client.post("/r", json={"items": [{"slow": "c"}]})
+            assert resp.status == 200
+
+    assert len(caplog.records) == 1
+    watchdog._next_report = 0
+    with caplog.at_level(logging.WARNING, logger="aiohttp_swagger3"):
+        resp = await client.post("/r", json={"items": [{"slow": "c"}]})
+    assert caplog.records[1].slow_validation["suppressed"] == 2
+
+
+async def test_validation_watchdog_slow_upload(swagger_docs, aiohttp_client, caplog):
+    swagger = swagger_docs(validation_watchdog=ValidationWatchdog(0.05, interval=0))
+    swagger.add_route("POST", "/r", _handler)
+
+    client = await aiohttp_client(swagger._app)
+
+    async def slow_body():
+        for chunk in json.dumps({"items": [{"fast": "a"}] * 10}).encode().partition(b","):
+            await asyncio.sleep(0.1)
+            yield chunk
+
+    with caplog.at_level(logging.WARNING, logger="aiohttp_swagger3"):
+        resp = await client.post("/r", data=slow_body(), headers={"Content-Type": "application/json"})
+        assert resp.status == 200
+
+    # waiting for the body is not validation
+    assert not caplog.records